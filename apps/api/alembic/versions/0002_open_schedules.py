@@ -0,0 +1,34 @@
+"""Precomputed open schedules for shelters and resources
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+TABLES = ("shelters", "resources")
+
+
+def upgrade() -> None:
+    # int4multirange needs PostgreSQL 14+; IF NOT EXISTS covers tables created from the models
+    for table in TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS open_schedule int4multirange")
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_open_schedule ON {table} USING gist (open_schedule)")
+
+    # Parsing the free-text hours needs the app's parser, so existing rows are filled by
+    # scripts/backfill_schedules.py after upgrading; until then they are left out of open_now results
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_open_schedule")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS open_schedule")
@@ -0,0 +1,29 @@
+"""Feed ids and record hashes for imported shelters
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS covers tables created from the models
+    op.execute("ALTER TABLE shelters ADD COLUMN IF NOT EXISTS external_id text")
+    op.execute("ALTER TABLE shelters ADD COLUMN IF NOT EXISTS source_hash text")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_shelters_external_id ON shelters (external_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_shelters_external_id")
+    op.execute("ALTER TABLE shelters DROP COLUMN IF EXISTS source_hash")
+    op.execute("ALTER TABLE shelters DROP COLUMN IF EXISTS external_id")
@@ -0,0 +1,128 @@
+"""Partition status_changes by month and add availability rollups
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+# Months created past the current one; the history maintenance job keeps extending this
+PARTITIONS_AHEAD = 3
+
+COLUMNS = "id, shelter_id, category, prev_available, new_available, changed_by, changed_at"
+
+ROLLUP_COLUMNS = """
+    shelter_id uuid NOT NULL REFERENCES shelters(id) ON DELETE CASCADE,
+    category varchar NOT NULL,
+    samples integer NOT NULL,
+    min_available integer NOT NULL,
+    max_available integer NOT NULL,
+    sum_available integer NOT NULL,
+    avg_available double precision GENERATED ALWAYS AS (sum_available::float8 / samples) STORED,
+    last_available integer NOT NULL
+"""
+
+
+def month_start(moment: date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_ddl(month: date) -> str:
+    # Same naming and UTC month bounds as the maintenance job's partitions
+    return (
+        f"CREATE TABLE IF NOT EXISTS status_changes_y{month.year}m{month.month:02d} PARTITION OF status_changes "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def _create_status_changes(partitioned: bool) -> None:
+    op.execute(f"""
+        CREATE TABLE status_changes (
+            id uuid NOT NULL,
+            shelter_id uuid NOT NULL REFERENCES shelters(id),
+            category varchar NOT NULL CHECK (category IN ('MEN', 'WOMEN', 'FAMILY', 'YOUTH', 'MIXED')),
+            prev_available integer NOT NULL,
+            new_available integer NOT NULL,
+            changed_by uuid NOT NULL REFERENCES staff(id),
+            changed_at timestamptz NOT NULL DEFAULT now(),
+            PRIMARY KEY {"(id, changed_at)" if partitioned else "(id)"}
+        ){" PARTITION BY RANGE (changed_at)" if partitioned else ""}
+    """)
+    op.execute("CREATE INDEX ix_status_changes_changed_at ON status_changes (changed_at)")
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    kind = conn.execute(sa.text("SELECT relkind FROM pg_class WHERE relname = 'status_changes'")).scalar()
+
+    if kind == "r":
+        # Swap the plain table for a partitioned one and copy the history across
+        op.execute("ALTER TABLE status_changes RENAME TO status_changes_unpartitioned")
+        op.execute("ALTER TABLE status_changes_unpartitioned RENAME CONSTRAINT status_changes_pkey TO status_changes_unpartitioned_pkey")
+        op.execute("DROP INDEX IF EXISTS idx_status_changes_changed_at")
+        op.execute("DROP INDEX IF EXISTS ix_status_changes_changed_at")
+        _create_status_changes(partitioned=True)
+
+        # Partitions must exist before the copy, or every row lands in the default partition
+        oldest = conn.execute(sa.text("SELECT min(changed_at) FROM status_changes_unpartitioned")).scalar()
+        if oldest is not None:
+            month = month_start(oldest.date())
+            while month < month_start(date.today()):
+                op.execute(partition_ddl(month))
+                month = add_months(month, 1)
+
+        op.execute(f"""
+            INSERT INTO status_changes ({COLUMNS})
+            SELECT id, shelter_id, category, prev_available, new_available, changed_by, COALESCE(changed_at, now())
+            FROM status_changes_unpartitioned
+        """)
+        op.execute("DROP TABLE status_changes_unpartitioned")
+
+    # Current and upcoming months; the maintenance job keeps extending this
+    month = month_start(date.today())
+    for offset in range(PARTITIONS_AHEAD + 1):
+        op.execute(partition_ddl(add_months(month, offset)))
+    op.execute("CREATE TABLE IF NOT EXISTS status_changes_default PARTITION OF status_changes DEFAULT")
+
+    op.execute(f"""
+        CREATE TABLE IF NOT EXISTS status_rollups_hourly (
+            bucket timestamptz NOT NULL,
+            {ROLLUP_COLUMNS},
+            PRIMARY KEY (bucket, shelter_id, category)
+        )
+    """)
+    op.execute(f"""
+        CREATE TABLE IF NOT EXISTS status_rollups_daily (
+            day date NOT NULL,
+            {ROLLUP_COLUMNS},
+            PRIMARY KEY (day, shelter_id, category)
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS status_rollups_daily")
+    op.execute("DROP TABLE IF EXISTS status_rollups_hourly")
+
+    op.execute("ALTER TABLE status_changes RENAME TO status_changes_partitioned")
+    op.execute("ALTER TABLE status_changes_partitioned RENAME CONSTRAINT status_changes_pkey TO status_changes_partitioned_pkey")
+    op.execute("ALTER INDEX ix_status_changes_changed_at RENAME TO ix_status_changes_partitioned_changed_at")
+    _create_status_changes(partitioned=False)
+    op.execute(f"INSERT INTO status_changes ({COLUMNS}) SELECT {COLUMNS} FROM status_changes_partitioned")
+    op.execute("DROP TABLE status_changes_partitioned CASCADE")
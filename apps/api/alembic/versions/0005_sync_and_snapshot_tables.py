@@ -0,0 +1,49 @@
+"""Change sequence and sync tombstones
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ("shelters", "shelter_status", "resources")
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS covers tables created from the models
+    op.execute("CREATE SEQUENCE IF NOT EXISTS change_seq")
+
+    # Backfill before NOT NULL so existing rows get a position in the sync order
+    for table in SYNCED_TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS change_seq bigint")
+        op.execute(f"UPDATE {table} SET change_seq = nextval('change_seq') WHERE change_seq IS NULL")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN change_seq SET DEFAULT nextval('change_seq')")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN change_seq SET NOT NULL")
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_change_seq ON {table} (change_seq)")
+
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS sync_tombstones (
+            change_seq bigint PRIMARY KEY DEFAULT nextval('change_seq'),
+            entity varchar NOT NULL,
+            entity_id uuid NOT NULL,
+            deleted_at timestamptz DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS ix_sync_tombstones_entity ON sync_tombstones (entity, entity_id)")
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS sync_tombstones")
+    for table in SYNCED_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_change_seq")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS change_seq")
+    op.execute("DROP SEQUENCE IF EXISTS change_seq")
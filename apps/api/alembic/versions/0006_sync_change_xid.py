@@ -0,0 +1,32 @@
+"""Writing transaction id on synced rows
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+SYNCED_TABLES = ("shelters", "shelter_status", "resources", "sync_tombstones")
+
+
+def upgrade() -> None:
+    # Existing rows are committed, so 0 never matches a later token's xmin
+    for table in SYNCED_TABLES:
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS change_xid bigint NOT NULL DEFAULT 0")
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN change_xid SET DEFAULT pg_current_xact_id()::text::bigint")
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_change_xid ON {table} (change_xid)")
+
+
+def downgrade() -> None:
+    for table in SYNCED_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_change_xid")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS change_xid")
@@ -0,0 +1,34 @@
+"""Backfilled geography locations with GIST indexes
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-20 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+LOCATED_TABLES = ("shelters", "resources")
+
+
+def upgrade() -> None:
+    # ST_DWithin and <-> filter on the location column, which the lon/lat expression indexes don't cover
+    for table in LOCATED_TABLES:
+        op.execute(
+            f"UPDATE {table} "
+            f"SET location = ST_SetSRID(ST_MakePoint(lon::float8, lat::float8), 4326)::geography "
+            f"WHERE location IS NULL AND lat IS NOT NULL AND lon IS NOT NULL"
+        )
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_location_geog ON {table} USING GIST (location)")
+
+
+def downgrade() -> None:
+    for table in LOCATED_TABLES:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_location_geog")
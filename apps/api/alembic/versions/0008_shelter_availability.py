@@ -0,0 +1,81 @@
+"""Per-shelter availability snapshot
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS shelter_availability (
+            shelter_id uuid PRIMARY KEY REFERENCES shelters(id) ON DELETE CASCADE,
+            categories jsonb NOT NULL,
+            open_categories varchar[] NOT NULL,
+            has_closed_category boolean NOT NULL,
+            effective_status varchar NOT NULL,
+            beds_available integer NOT NULL,
+            stale_at timestamptz,
+            open_until timestamptz,
+            refreshed_at timestamptz DEFAULT now()
+        )
+    """)
+    op.execute("CREATE INDEX IF NOT EXISTS idx_shelter_availability_categories ON shelter_availability USING gin (categories)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_shelter_availability_open_categories ON shelter_availability USING gin (open_categories)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_shelter_availability_open_until ON shelter_availability (open_until)")
+
+    # Same shape as the snapshot refresh as of this revision, with statuses going stale after
+    # 12 hours; the API rebuilds the snapshot on startup, so later changes to either still apply
+    op.execute("""
+        INSERT INTO shelter_availability (
+            shelter_id, categories, open_categories, has_closed_category,
+            effective_status, beds_available, stale_at, open_until, refreshed_at
+        )
+        SELECT
+            s.shelter_id,
+            jsonb_object_agg(s.category, jsonb_build_object(
+                'id', s.id,
+                'beds_total', s.beds_total,
+                'beds_available', s.beds_available,
+                'beds_held', COALESCE(h.held, 0),
+                'status', s.status,
+                'notes', s.notes,
+                'last_updated', s.last_updated,
+                'stale_at', s.last_updated + interval '12 hours'
+            )),
+            COALESCE(array_agg(s.category) FILTER (WHERE s.status IN ('OPEN', 'LIMITED')), '{}'),
+            bool_or(s.status NOT IN ('OPEN', 'LIMITED')),
+            CASE
+                WHEN bool_or(s.status = 'OPEN') THEN 'OPEN'
+                WHEN bool_or(s.status = 'LIMITED') THEN 'LIMITED'
+                WHEN bool_or(s.status = 'FULL') THEN 'FULL'
+                ELSE 'UNKNOWN'
+            END,
+            SUM(s.beds_available),
+            MIN(s.last_updated + interval '12 hours') FILTER (WHERE s.status IN ('OPEN', 'LIMITED')),
+            MAX(s.last_updated + interval '12 hours') FILTER (WHERE s.status IN ('OPEN', 'LIMITED')),
+            now()
+        FROM shelter_status s
+        LEFT JOIN (
+            SELECT shelter_id, category, SUM(qty) AS held
+            FROM holds
+            WHERE status = 'ACTIVE'
+            GROUP BY shelter_id, category
+        ) h ON h.shelter_id = s.shelter_id AND h.category = s.category
+        GROUP BY s.shelter_id
+        ON CONFLICT (shelter_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS shelter_availability")
@@ -0,0 +1,26 @@
+"""Indexes behind the shelter list version token
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # init.sql creates the first one on fresh databases; migrated ones may lack it
+    op.execute("CREATE INDEX IF NOT EXISTS idx_shelter_status_last_updated ON shelter_status (last_updated)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_shelter_availability_refreshed_at ON shelter_availability (refreshed_at)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_shelter_availability_refreshed_at")
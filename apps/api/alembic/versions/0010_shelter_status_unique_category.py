@@ -0,0 +1,40 @@
+"""One status row per shelter category
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the most recently updated row per shelter/category before adding the upsert target
+    op.execute("""
+        DELETE FROM shelter_status s
+        USING shelter_status newer
+        WHERE s.shelter_id = newer.shelter_id
+          AND s.category = newer.category
+          AND (s.last_updated, s.id::text) < (newer.last_updated, newer.id::text)
+    """)
+    op.execute("""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_shelter_status_shelter_category') THEN
+                ALTER TABLE shelter_status
+                    ADD CONSTRAINT uq_shelter_status_shelter_category UNIQUE (shelter_id, category);
+            END IF;
+        END $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE shelter_status DROP CONSTRAINT IF EXISTS uq_shelter_status_shelter_category")
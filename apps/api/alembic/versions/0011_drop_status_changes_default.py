@@ -0,0 +1,55 @@
+"""Move status_changes default partition rows into monthly partitions and drop it
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-21 09:00:00.000000
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, shelter_id, category, prev_available, new_available, changed_by, changed_at"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_ddl(month: date) -> str:
+    # Same naming and UTC month bounds as the maintenance job's partitions
+    return (
+        f"CREATE TABLE IF NOT EXISTS status_changes_y{month.year}m{month.month:02d} PARTITION OF status_changes "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def upgrade() -> None:
+    # A default partition rules out DETACH PARTITION CONCURRENTLY, which history retention relies on
+    conn = op.get_bind()
+    if conn.execute(sa.text("SELECT to_regclass('status_changes_default')")).scalar() is None:
+        return
+
+    op.execute("ALTER TABLE status_changes DETACH PARTITION status_changes_default")
+    months = conn.execute(sa.text("""
+        SELECT DISTINCT date_trunc('month', changed_at AT TIME ZONE 'UTC')::date
+        FROM status_changes_default
+    """)).scalars().all()
+    for month in months:
+        op.execute(partition_ddl(month))
+
+    op.execute(f"INSERT INTO status_changes ({COLUMNS}) SELECT {COLUMNS} FROM status_changes_default")
+    op.execute("DROP TABLE status_changes_default")
+
+
+def downgrade() -> None:
+    op.execute("CREATE TABLE IF NOT EXISTS status_changes_default PARTITION OF status_changes DEFAULT")
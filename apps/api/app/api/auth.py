@@ -1,7 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import Optional
+from uuid import UUID
 import os
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
@@ -17,6 +19,34 @@ JWT_SECRET = os.getenv("JWT_SECRET", "your-super-secret-jwt-key-change-in-produc
 MAGIC_LINK_SECRET = os.getenv("MAGIC_LINK_SECRET", "your-magic-link-secret-key")
 MAGIC_LINK_BASE_URL = os.getenv("MAGIC_LINK_BASE_URL", "http://localhost:3000/verify")
 
+bearer = HTTPBearer()
+
+
+async def get_current_staff(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer),
+    db: AsyncSession = Depends(get_db)
+) -> Staff:
+    """
+    Resolve the staff member from a bearer JWT issued by /auth/verify
+    """
+    try:
+        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=["HS256"])
+        staff_id = UUID(payload.get("sub"))
+    except (JWTError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid token"
+        )
+    
+    staff = await db.get(Staff, staff_id)
+    if not staff:
+        raise HTTPException(
+            status_code=401,
+            detail="Staff member not found"
+        )
+    
+    return staff
+
 
 @router.post("/magic-link", response_model=MagicLinkResponse)
 async def send_magic_link_email(
@@ -0,0 +1,42 @@
+import os
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse, JSONResponse
+
+from app.services.bundle import BUNDLE_DIR, BUNDLE_NAME_RE, read_manifest
+
+router = APIRouter()
+
+# Bundle names are content hashes, so the files never change once written
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+@router.get("/latest")
+async def latest_bundle():
+    """
+    Manifest pointing at the newest directory bundle; cached briefly so CDNs pick up rebuilds
+    """
+    manifest = read_manifest()
+    if manifest is None:
+        raise HTTPException(status_code=404, detail="No bundle has been built yet")
+
+    return JSONResponse(
+        {**manifest, "url": f"/bundle/{manifest['file']}"},
+        headers={"Cache-Control": "public, max-age=60"},
+    )
+
+
+@router.get("/{name}")
+async def get_bundle(name: str):
+    """
+    Serve a bundle file as gzip-encoded JSON with immutable caching
+    """
+    path = os.path.join(BUNDLE_DIR, name)
+    if not BUNDLE_NAME_RE.match(name) or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Bundle not found")
+
+    return FileResponse(
+        path,
+        media_type="application/json",
+        headers={"Content-Encoding": "gzip", "Cache-Control": IMMUTABLE},
+    )
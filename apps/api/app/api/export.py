@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.api.auth import get_current_staff
+from app.database import AsyncSessionLocal
+from app.models import Staff
+from app.services.export import (
+    EXPORT_FORMATS,
+    EXPORT_TABLES,
+    encode_rows,
+    export_columns,
+    parquet_available,
+    stream_rows,
+    supports_since,
+)
+
+router = APIRouter()
+
+
+@router.get("/{table}")
+async def export_table(
+    table: str,
+    format: str = Query("ndjson", regex="^(ndjson|csv|parquet)$"),
+    since: Optional[datetime] = Query(None, description="Only rows updated at or after this time"),
+    staff: Staff = Depends(get_current_staff),
+):
+    """
+    Stream a full table dump (shelters, statuses or status_changes) as NDJSON, CSV or Parquet
+    """
+    if table not in EXPORT_TABLES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export table. Use one of: {', '.join(EXPORT_TABLES)}"
+        )
+
+    if since is not None and not supports_since(table):
+        raise HTTPException(
+            status_code=400,
+            detail=f"'since' is not supported for {table}; use /sync for incremental shelter changes"
+        )
+
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires the 'pyarrow' package")
+
+    async def body():
+        # The stream outlives the request dependencies, so it owns its session
+        async with AsyncSessionLocal() as session:
+            batches = stream_rows(session, table, since=since)
+            async for chunk in encode_rows(format, export_columns(table), batches):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{format}"'},
+    )
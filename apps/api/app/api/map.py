@@ -0,0 +1,57 @@
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.services.cache import response_cache
+from app.services.clusters import cluster_index, data_version, sync_cluster_index
+from app.services.serialization import dumps
+
+router = APIRouter()
+
+
+@router.get("/clusters")
+async def get_clusters(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat"),
+    zoom: int = Query(..., ge=0, le=22, description="Map zoom level"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Shelter and resource clusters in view at a zoom level, with bed totals per category
+    Clusters with a count of 1 carry the point's id so the map can draw a marker
+    """
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+    except ValueError:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid bbox format. Use 'min_lon,min_lat,max_lon,max_lat'"
+        )
+    if not all(math.isfinite(v) for v in (min_lon, min_lat, max_lon, max_lat)):
+        raise HTTPException(status_code=400, detail="bbox values must be finite numbers")
+    if min_lon > max_lon or min_lat > max_lat:
+        raise HTTPException(status_code=400, detail="bbox minimums must not exceed maximums")
+
+    # Bridged events arrive asynchronously, so catch the tree up to the change log every time;
+    # the body then reflects exactly the position it was synced to
+    await sync_cluster_index(db)
+
+    # Key on the covered cells, so nearby viewports at the same zoom share an entry, and on that
+    # change log position, which means the same data on every worker sharing a Redis cache;
+    # writes still in flight at that position invalidate the cache when they commit
+    box = (min_lon, min_lat, max_lon, max_lat)
+    level = min(zoom, cluster_index.max_zoom)
+    cache_key = response_cache.make_key("clusters", {
+        "zoom": level,
+        "cells": ",".join(map(str, cluster_index.cell_range(box, level))),
+        "version": cluster_index.token[0] if cluster_index.token else await data_version(db),
+    })
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json", headers={"X-Cache": "HIT"})
+
+    body = dumps({"zoom": level, "clusters": cluster_index.clusters(box, level)})
+    await response_cache.set(cache_key, body)
+
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "MISS"})
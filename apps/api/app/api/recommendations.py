@@ -0,0 +1,69 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.services.events import event_bus
+from app.services.geo import parse_coordinates
+from app.services.recommend import DEFAULT_WEIGHTS, nearby_candidates, parse_weights, recommend_shelters
+from app.services.serialization import dumps
+from app.services.spatial_index import build_spatial_indexes, shelter_index
+
+router = APIRouter()
+
+
+@router.get("/")
+async def get_recommendations(
+    near: str = Query(..., description="lat,lon coordinates"),
+    radius_km: float = Query(15.0, ge=0.1, le=100.0, description="Candidate pool radius"),
+    k: int = Query(5, ge=1, le=50, description="Number of shelters to return"),
+    category: Optional[str] = Query(None, regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$"),
+    has_id: bool = Query(True, description="False favours shelters that don't require ID"),
+    pet_friendly: bool = Query(False, description="Client has a pet"),
+    ada_accessible: bool = Query(False, description="Client needs an accessible shelter"),
+    lgbtq_friendly: bool = Query(False, description="Client wants an LGBTQ-friendly shelter"),
+    language: Optional[str] = Query(None, max_length=50, description="Preferred language"),
+    weights: Optional[str] = Query(None, description="Factor weights, e.g. 'distance=1,availability=4'"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Best shelters for a client, ranked on distance, beds, category, needs, curfew and freshness
+    Each result carries the per-factor scores behind its rank
+    """
+    try:
+        origin = parse_coordinates(near)
+    except (ValueError, AttributeError):
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid coordinates format. Use 'lat,lon'"
+        )
+
+    try:
+        factor_weights = parse_weights(weights, DEFAULT_WEIGHTS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # This worker's index only sees other processes' writes while the event bridge is listening
+    if event_bus.shared:
+        if not shelter_index.ready:
+            await build_spatial_indexes(db)
+        candidates = shelter_index.within(*origin, radius_km)
+    else:
+        candidates = await nearby_candidates(db, *origin, radius_km)
+
+    ranked = await recommend_shelters(
+        db,
+        candidates,
+        radius_km=radius_km,
+        k=k,
+        weights=factor_weights,
+        category=category,
+        has_id=has_id,
+        pet_friendly=pet_friendly,
+        ada_accessible=ada_accessible,
+        lgbtq_friendly=lgbtq_friendly,
+        language=language,
+    )
+
+    return Response(content=dumps({"weights": factor_weights, "items": ranked}), media_type="application/json")
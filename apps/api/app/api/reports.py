@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.auth import get_current_staff
+from app.database import get_db
+from app.models import Staff
+from app.services.history import availability_report
+from app.services.serialization import dumps
+
+router = APIRouter()
+
+# Longest range one request may cover, per granularity
+MAX_REPORT_RANGE = {"hour": timedelta(days=31), "day": timedelta(days=400)}
+
+
+@router.get("/availability")
+async def get_availability_report(
+    granularity: str = Query("day", regex="^(hour|day)$"),
+    start: Optional[datetime] = Query(None, description="Defaults to 7 days before end"),
+    end: Optional[datetime] = Query(None, description="Defaults to now"),
+    shelter_id: Optional[UUID] = Query(None),
+    category: Optional[str] = Query(None, regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$"),
+    staff: Staff = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Hourly or daily min/max/avg bed availability, read from the rollup tables
+    Staff see their own shelter; admins can see any or all shelters
+    """
+    end = end or datetime.now(timezone.utc)
+    start = start or end - timedelta(days=7)
+    # Naive datetimes are UTC, as elsewhere in the API
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end - start > MAX_REPORT_RANGE[granularity]:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Range too long for {granularity} granularity (max {MAX_REPORT_RANGE[granularity].days} days)"
+        )
+
+    if staff.role != "ADMIN":
+        if shelter_id is not None and shelter_id != staff.shelter_id:
+            raise HTTPException(status_code=403, detail="Not allowed to view this shelter")
+        shelter_id = staff.shelter_id
+        if shelter_id is None:
+            raise HTTPException(status_code=403, detail="Staff account is not assigned to a shelter")
+
+    rows = await availability_report(
+        db,
+        granularity,
+        start,
+        end,
+        shelter_ids=[shelter_id] if shelter_id is not None else None,
+        category=category,
+    )
+
+    body = dumps({"granularity": granularity, "start": start, "end": end, "rows": rows})
+    return Response(content=body, media_type="application/json")
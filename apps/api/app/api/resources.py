@@ -1,29 +1,116 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional, List
+from sqlalchemy import func, select, tuple_
+from typing import Any, Dict, Optional, List, Tuple, Union
+from datetime import datetime
 from decimal import Decimal
+import numpy as np
 
 from app.database import get_db
 from app.models import Resource
+from app.schemas.common import PaginatedResponse
 from app.schemas.resource import ResourceResponse
-from app.services.geo import calculate_distance
+from app.services.binary import MSGPACK_MEDIA_TYPE, RESOURCE_FIELDS, pack_rows, wants_msgpack
+from app.services.cache import response_cache
+from app.services.events import event_bus
+from app.services.geo import (
+    coordinate_array,
+    geography_point,
+    haversine_distances,
+    parse_coordinates,
+    postgis_enabled,
+)
+from app.services.hours import minute_of_week
+from app.services.pagination import (
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    Keyset,
+    after_keyset,
+    fetch_candidates,
+    keyset_candidates,
+    next_cursor,
+    parse_cursor,
+)
+from app.services.search import memory_matches, set_search_threshold, trigram_search, use_pg_trgm
+from app.services.schedules import open_at_criteria
+from app.services.serialization import dumps, response_columns, row_dicts
+from app.services.spatial_index import resource_index
+from app.services.versioning import resource_version
 
 router = APIRouter()
 
+_RESOURCE_COLUMNS = response_columns(Resource, ResourceResponse)
 
-@router.get("/", response_model=List[ResourceResponse])
-async def get_resources(
-    type: Optional[str] = Query(None, regex="^(FOOD|SHOWER|HEALTH|LEGAL|EMPLOYMENT|HYGIENE|COOLING|WARMING|SAFE_PARKING)$"),
-    near: Optional[str] = Query(None, description="lat,lon coordinates"),
-    radius_km: float = Query(10.0, ge=0.1, le=50.0),
-    neighborhood: Optional[str] = Query(None),
-    db: AsyncSession = Depends(get_db)
-):
+
+async def _find_resources(
+    db: AsyncSession,
+    *,
+    origin: Optional[Tuple[Decimal, Decimal]],
+    radius_km: float,
+    type: Optional[str],
+    neighborhood: Optional[str],
+    q: Optional[str] = None,
+    open_minute: Optional[int] = None,
+    open_now: bool = True,
+    after: Optional[Keyset] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     """
-    Get resources with optional filtering and distance sorting
+    Query resources matching the filters, sorted by distance when an origin is given
+    A q search without an origin sorts by relevance instead
+    open_minute (minute of the week) keeps resources whose schedule is open, or closed with open_now=False
+    With a limit, rows are keyset-paginated on (distance or -relevance, id), or id alone
     """
-    query = select(Resource)
+    # Text search runs in Postgres via pg_trgm, or against the in-process trigram index
+    columns = list(_RESOURCE_COLUMNS)
+    matches = None
+    if q:
+        if use_pg_trgm(db):
+            await set_search_threshold(db)
+            search_criteria, relevance = trigram_search(Resource, q)
+            columns.append(relevance.label("relevance"))
+        else:
+            matches = await memory_matches(db, Resource, q)
+    rank_in_sql = bool(q) and matches is None
+    
+    query = select(*columns)
+    
+    # Prefer the in-memory spatial index, then PostGIS, then Haversine in Python; the index only
+    # sees other processes' writes through the event bridge, so it is skipped while that is down
+    use_index = origin is not None and resource_index.ready and event_bus.shared
+    use_postgis = origin is not None and not use_index and postgis_enabled(db)
+    if use_index:
+        # Only the candidates past the cursor, in (distance, id) order; fetched a page at a time below
+        ordered = keyset_candidates(resource_index.within(*origin, radius_km), after)
+        nearby = {key: distance for distance, key in ordered}
+    elif use_postgis:
+        point = geography_point(*origin)
+        distance_expr = func.ST_Distance(Resource.location, point) / 1000
+        query = (
+            select(*columns, distance_expr.label("distance_km"))
+            .where(func.ST_DWithin(Resource.location, point, radius_km * 1000))
+        )
+        if limit is None:
+            query = query.order_by(Resource.location.op("<->")(point))
+        else:
+            if after is not None:
+                query = query.where(tuple_(distance_expr, Resource.id) > tuple_(after[0], after[1]))
+            query = query.order_by(distance_expr, Resource.id).limit(limit)
+    elif origin is None and rank_in_sql:
+        if after is not None:
+            query = query.where(tuple_(-relevance, Resource.id) > tuple_(after[0], after[1]))
+        query = query.order_by(relevance.desc(), Resource.id)
+        if limit is not None:
+            query = query.limit(limit)
+    elif origin is None and not q and limit is not None:
+        if after is not None:
+            query = query.where(Resource.id > after[1])
+        query = query.order_by(Resource.id).limit(limit)
+    
+    if rank_in_sql:
+        query = query.where(search_criteria)
+    elif matches is not None:
+        query = query.where(Resource.id.in_(matches))
     
     if type:
         query = query.where(Resource.type == type)
@@ -31,28 +118,130 @@ async def get_resources(
     if neighborhood:
         query = query.where(Resource.neighborhood.ilike(f"%{neighborhood}%"))
     
-    result = await db.execute(query)
-    resources = result.scalars().all()
+    if open_minute is not None:
+        query = query.where(open_at_criteria(Resource, open_minute, open_now))
+    
+    if use_index:
+        filtered = bool(q or type or neighborhood or open_minute is not None)
+        resources = await fetch_candidates(db, query, Resource.id, ordered, limit, filtered)
+    else:
+        result = await db.execute(query)
+        resources = row_dicts(result.mappings())
+    
+    if matches is not None:
+        for resource in resources:
+            resource["relevance"] = matches[resource["id"]]
+        if origin is None:
+            resources.sort(key=lambda x: (-x["relevance"], x["id"]))
+            if after is not None:
+                resources = [resources[i] for i in after_keyset([(-r["relevance"], r["id"]) for r in resources], after)]
     
-    # Calculate distances and sort if coordinates provided
+    # Calculate distances and sort if coordinates provided; PostGIS rows arrive filtered and ordered
+    if origin is not None and not use_postgis:
+        if use_index:
+            distances = np.array([nearby[r["id"]] for r in resources], dtype=np.float64)
+        else:
+            distances = haversine_distances(*origin, coordinate_array(resources))
+        
+        # Filter by radius, then sort by distance with id as the tiebreaker
+        within = np.flatnonzero(distances <= radius_km)
+        for i in within:
+            resources[i]["distance_km"] = float(distances[i])
+        resources = sorted((resources[i] for i in within), key=lambda x: (x["distance_km"], x["id"]))
+        
+        if after is not None and not use_index:
+            resources = [resources[i] for i in after_keyset([(r["distance_km"], r["id"]) for r in resources], after)]
+    
+    if limit is not None:
+        resources = resources[:limit]
+    
+    return resources
+
+
+@router.get("/", response_model=Union[List[ResourceResponse], PaginatedResponse[ResourceResponse]])
+async def get_resources(
+    type: Optional[str] = Query(None, regex="^(FOOD|SHOWER|HEALTH|LEGAL|EMPLOYMENT|HYGIENE|COOLING|WARMING|SAFE_PARKING)$"),
+    near: Optional[str] = Query(None, description="lat,lon coordinates"),
+    radius_km: float = Query(10.0, ge=0.1, le=50.0),
+    neighborhood: Optional[str] = Query(None),
+    q: Optional[str] = Query(None, min_length=2, max_length=100, description="Search names, neighborhoods, addresses and notes"),
+    open_now: Optional[bool] = Query(None, description="Filter by posted hours right now"),
+    open_at: Optional[datetime] = Query(None, description="Filter by posted hours at this time (local if no offset)"),
+    per_page: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    accept: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get resources with optional filtering and distance sorting
+    Passing per_page or cursor returns a keyset-paginated PaginatedResponse
+    Send 'Accept: application/x-msgpack' for the compact binary encoding
+    """
+    origin = None
     if near:
         try:
-            lat_str, lon_str = near.split(',')
-            lat, lon = Decimal(lat_str.strip()), Decimal(lon_str.strip())
-            
-            for resource in resources:
-                resource.distance_km = calculate_distance(lat, lon, resource.lat, resource.lon)
-            
-            # Sort by distance
-            resources.sort(key=lambda x: x.distance_km or float('inf'))
-            
-            # Filter by radius
-            resources = [r for r in resources if r.distance_km <= radius_km]
-            
+            origin = parse_coordinates(near)
         except (ValueError, AttributeError):
             raise HTTPException(
                 status_code=400,
                 detail="Invalid coordinates format. Use 'lat,lon'"
             )
     
-    return resources
+    # open_at alone means open at that time; open_now=false flips either to closed
+    open_minute = None
+    if open_now is not None or open_at is not None:
+        open_minute = minute_of_week(open_at)
+    
+    media_type = MSGPACK_MEDIA_TYPE if wants_msgpack(accept) else "application/json"
+    paginate = per_page is not None or cursor is not None
+    page_size = per_page or PAGE_SIZE_DEFAULT
+    try:
+        after = parse_cursor(cursor, ranked=origin is not None or bool(q))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    cache_key = response_cache.make_key("resources", {
+        "near": origin,
+        "radius_km": radius_km if origin else None,
+        "type": type,
+        "neighborhood": neighborhood,
+        "q": q,
+        "open_minute": open_minute,
+        "open_now": open_now,
+        "per_page": page_size if paginate else None,
+        "cursor": cursor,
+        "format": media_type,
+        # Writes on any worker move this, so stale per-worker entries are never read again
+        "version": await resource_version(db),
+    })
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type=media_type, headers={"Vary": "Accept", "X-Cache": "HIT"})
+    
+    resources = await _find_resources(
+        db,
+        origin=origin,
+        radius_km=radius_km,
+        type=type,
+        neighborhood=neighborhood,
+        q=q,
+        open_minute=open_minute,
+        open_now=open_now is not False,
+        after=after,
+        limit=page_size + 1 if paginate else None,
+    )
+    
+    page = {}
+    if paginate:
+        page = {"next_cursor": next_cursor(resources, page_size), "per_page": page_size}
+        resources = resources[:page_size]
+    
+    if media_type == MSGPACK_MEDIA_TYPE:
+        body = pack_rows(RESOURCE_FIELDS, resources, **page)
+    elif paginate:
+        body = dumps({"items": resources, **page})
+    else:
+        body = dumps(resources)
+    await response_cache.set(cache_key, body)
+    
+    return Response(content=body, media_type=media_type, headers={"Vary": "Accept", "X-Cache": "MISS"})
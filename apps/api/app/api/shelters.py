@@ -1,42 +1,147 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_, or_
-from sqlalchemy.orm import selectinload
-from typing import Optional, List
+from sqlalchemy import select, func, and_, or_, tuple_
+from typing import Any, Dict, Optional, List, Tuple, Union
+from datetime import datetime, timezone
 from decimal import Decimal
 from uuid import UUID
+import numpy as np
 
 from app.database import get_db
-from app.models import Shelter, ShelterStatus
+from app.models import Shelter, ShelterAvailability
+from app.schemas.common import PaginatedResponse
 from app.schemas.shelter import (
+    ShelterForecastResponse,
     ShelterResponse, 
     ShelterStatusResponse,
     ShelterStatusUpdate
 )
-from app.services.availability import apply_conservatism_rule
-from app.services.geo import calculate_distance, get_neighborhood
+from app.services.binary import (
+    MSGPACK_MEDIA_TYPE,
+    SHELTER_FIELDS,
+    SHELTER_FORECAST_FIELDS,
+    STATUS_FIELDS,
+    pack_rows,
+    wants_msgpack,
+)
+from app.services.cache import response_cache
+from app.services.events import event_bus
+from app.services.forecast import ensure_forecaster, forecaster
+from app.services.geo import (
+    coordinate_array,
+    geography_point,
+    get_neighborhood,
+    haversine_distances,
+    parse_coordinates,
+    postgis_enabled,
+)
+from app.services.hours import LOCAL_TIMEZONE, minute_of_week
+from app.services.pagination import (
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    Keyset,
+    after_keyset,
+    fetch_candidates,
+    keyset_candidates,
+    next_cursor,
+    parse_cursor,
+)
+from app.services.search import memory_matches, set_search_threshold, trigram_search, use_pg_trgm
+from app.services.schedules import open_at_criteria
+from app.services.serialization import dumps, response_columns, row_dicts
+from app.services.snapshot import availability_match_criteria, snapshot_statuses
+from app.services.spatial_index import shelter_index
+from app.services.versioning import is_not_modified, status_version, version_headers
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[ShelterResponse])
-async def get_shelters(
-    near: Optional[str] = Query(None, description="lat,lon coordinates"),
-    radius_km: float = Query(10.0, ge=0.1, le=50.0),
-    open: Optional[bool] = Query(None, description="Filter by open status"),
-    category: Optional[str] = Query(None, regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$"),
-    neighborhood: Optional[str] = Query(None),
-    pet_friendly: Optional[bool] = Query(None),
-    ada_accessible: Optional[bool] = Query(None),
-    lgbtq_friendly: Optional[bool] = Query(None),
-    db: AsyncSession = Depends(get_db)
-):
+_SHELTER_COLUMNS = response_columns(Shelter, ShelterResponse)
+
+
+async def _find_shelters(
+    db: AsyncSession,
+    *,
+    origin: Optional[Tuple[Decimal, Decimal]],
+    radius_km: float,
+    open: Optional[bool],
+    category: Optional[str],
+    neighborhood: Optional[str],
+    pet_friendly: Optional[bool],
+    ada_accessible: Optional[bool],
+    lgbtq_friendly: Optional[bool],
+    q: Optional[str] = None,
+    open_minute: Optional[int] = None,
+    open_now: bool = True,
+    after: Optional[Keyset] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
     """
-    Get shelters with optional filtering and distance sorting
+    Query shelters matching the filters, sorted by distance when an origin is given
+    A q search without an origin sorts by relevance instead
+    open_minute (minute of the week) keeps shelters whose schedule is open, or closed with open_now=False
+    With a limit, rows are keyset-paginated on (distance or -relevance, id), or id alone
     """
-    query = select(Shelter).options(selectinload(Shelter.statuses))
+    # Prefer the in-memory spatial index, then PostGIS, then Haversine in Python; the index only
+    # sees other processes' writes through the event bridge, so it is skipped while that is down
+    use_index = origin is not None and shelter_index.ready and event_bus.shared
+    use_postgis = origin is not None and not use_index and postgis_enabled(db)
+    
+    # Text search runs in Postgres via pg_trgm, or against the in-process trigram index
+    columns = list(_SHELTER_COLUMNS)
+    matches = None
+    if q:
+        if use_pg_trgm(db):
+            await set_search_threshold(db)
+            search_criteria, relevance = trigram_search(Shelter, q)
+            columns.append(relevance.label("relevance"))
+        else:
+            matches = await memory_matches(db, Shelter, q)
+    rank_in_sql = bool(q) and matches is None
     
-    # Apply filters
+    if use_index:
+        # Only the candidates past the cursor, in (distance, id) order; fetched a page at a time below
+        ordered = keyset_candidates(shelter_index.within(*origin, radius_km), after)
+        nearby = {key: distance for distance, key in ordered}
+        query = select(*columns)
+    elif use_postgis:
+        point = geography_point(*origin)
+        distance_expr = func.ST_Distance(Shelter.location, point) / 1000
+        query = (
+            select(*columns, distance_expr.label("distance_km"))
+            .where(func.ST_DWithin(Shelter.location, point, radius_km * 1000))
+        )
+        if limit is None:
+            query = query.order_by(Shelter.location.op("<->")(point))
+        else:
+            if after is not None:
+                query = query.where(tuple_(distance_expr, Shelter.id) > tuple_(after[0], after[1]))
+            query = query.order_by(distance_expr, Shelter.id).limit(limit)
+    else:
+        query = select(*columns)
+        if origin is None and rank_in_sql:
+            if after is not None:
+                query = query.where(tuple_(-relevance, Shelter.id) > tuple_(after[0], after[1]))
+            query = query.order_by(relevance.desc(), Shelter.id)
+            if limit is not None:
+                query = query.limit(limit)
+        elif origin is None and not q and limit is not None:
+            if after is not None:
+                query = query.where(Shelter.id > after[1])
+            query = query.order_by(Shelter.id).limit(limit)
+    
+    if rank_in_sql:
+        query = query.where(search_criteria)
+    elif matches is not None:
+        query = query.where(Shelter.id.in_(matches))
+    
+    # Category/open filters read the availability snapshot instead of every status row
+    if category or open is not None:
+        query = query.join(
+            ShelterAvailability, ShelterAvailability.shelter_id == Shelter.id
+        ).where(availability_match_criteria(category, open))
+    
+    # Apply filters    
     if neighborhood:
         query = query.where(Shelter.neighborhood.ilike(f"%{neighborhood}%"))
     
@@ -49,51 +154,181 @@ async def get_shelters(
     if lgbtq_friendly is not None:
         query = query.where(Shelter.lgbtq_friendly == lgbtq_friendly)
     
-    result = await db.execute(query)
-    shelters = result.scalars().all()
+    if open_minute is not None:
+        query = query.where(open_at_criteria(Shelter, open_minute, open_now))
     
-    # Apply conservatism rule to statuses
-    for shelter in shelters:
-        for status in shelter.statuses:
-            apply_conservatism_rule(status)
+    # Plain Core rows; list responses never touch ORM entities or their relationships
+    if use_index:
+        filtered = bool(
+            q or category or open is not None or neighborhood or open_minute is not None
+            or pet_friendly is not None or ada_accessible is not None or lgbtq_friendly is not None
+        )
+        shelters = await fetch_candidates(db, query, Shelter.id, ordered, limit, filtered)
+    else:
+        result = await db.execute(query)
+        shelters = row_dicts(result.mappings())
     
-    # Filter by category and open status
-    if category or open is not None:
-        filtered_shelters = []
+    if matches is not None:
+        for shelter in shelters:
+            shelter["relevance"] = matches[shelter["id"]]
+        if origin is None:
+            shelters.sort(key=lambda x: (-x["relevance"], x["id"]))
+            if after is not None:
+                shelters = [shelters[i] for i in after_keyset([(-s["relevance"], s["id"]) for s in shelters], after)]
+    
+    if use_index:
         for shelter in shelters:
-            matching_statuses = [
-                s for s in shelter.statuses
-                if (category is None or s.category == category) and
-                   (open is None or (open and s.status in ['OPEN', 'LIMITED']) or 
-                    (not open and s.status in ['FULL', 'UNKNOWN']))
-            ]
-            if matching_statuses:
-                shelter.statuses = matching_statuses
-                filtered_shelters.append(shelter)
-        shelters = filtered_shelters
-    
-    # Calculate distances and sort if coordinates provided
+            shelter["distance_km"] = nearby[shelter["id"]]
+        shelters.sort(key=lambda x: (x["distance_km"], x["id"]))
+    
+    # Fall back to Haversine in Python for backends without PostGIS
+    if origin is not None and not (use_index or use_postgis):
+        distances = haversine_distances(*origin, coordinate_array(shelters))
+        
+        # Filter by radius, then sort by distance with id as the tiebreaker
+        within = np.flatnonzero(distances <= radius_km)
+        for i in within:
+            shelters[i]["distance_km"] = float(distances[i])
+        shelters = sorted((shelters[i] for i in within), key=lambda x: (x["distance_km"], x["id"]))
+        
+        if after is not None:
+            shelters = [shelters[i] for i in after_keyset([(s["distance_km"], s["id"]) for s in shelters], after)]
+    
+    if limit is not None:
+        shelters = shelters[:limit]
+    
+    return shelters
+
+
+@router.get("/", response_model=Union[List[ShelterResponse], PaginatedResponse[ShelterResponse]])
+async def get_shelters(
+    near: Optional[str] = Query(None, description="lat,lon coordinates"),
+    radius_km: float = Query(10.0, ge=0.1, le=50.0),
+    open: Optional[bool] = Query(None, description="Filter by open status"),
+    category: Optional[str] = Query(None, regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$"),
+    neighborhood: Optional[str] = Query(None),
+    pet_friendly: Optional[bool] = Query(None),
+    ada_accessible: Optional[bool] = Query(None),
+    lgbtq_friendly: Optional[bool] = Query(None),
+    q: Optional[str] = Query(None, min_length=2, max_length=100, description="Search names, neighborhoods, addresses and intake notes"),
+    open_now: Optional[bool] = Query(None, description="Filter by posted hours and curfew right now"),
+    open_at: Optional[datetime] = Query(None, description="Filter by posted hours and curfew at this time (local if no offset)"),
+    forecast_at: Optional[datetime] = Query(None, description="Attach per-category bed forecasts for this time (local if no offset)"),
+    per_page: Optional[int] = Query(None, ge=1, le=PAGE_SIZE_MAX, description="Page size; enables cursor pagination"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page"),
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get shelters with optional filtering and distance sorting
+    Passing per_page or cursor returns a keyset-paginated PaginatedResponse
+    Send 'Accept: application/x-msgpack' for the compact binary encoding
+    open_now/open_at check the precomputed weekly schedule, separately from bed status
+    forecast_at adds each shelter's expected beds and chance of a bed at that hour
+    """
+    origin = None
     if near:
         try:
-            lat_str, lon_str = near.split(',')
-            lat, lon = Decimal(lat_str.strip()), Decimal(lon_str.strip())
-            
-            for shelter in shelters:
-                shelter.distance_km = calculate_distance(lat, lon, shelter.lat, shelter.lon)
-            
-            # Sort by distance
-            shelters.sort(key=lambda x: x.distance_km or float('inf'))
-            
-            # Filter by radius
-            shelters = [s for s in shelters if s.distance_km <= radius_km]
-            
+            origin = parse_coordinates(near)
         except (ValueError, AttributeError):
             raise HTTPException(
                 status_code=400,
                 detail="Invalid coordinates format. Use 'lat,lon'"
             )
     
-    return shelters
+    # open_at alone means open at that time; open_now=false flips either to closed
+    open_minute = None
+    if open_now is not None or open_at is not None:
+        open_minute = minute_of_week(open_at)
+    
+    # Forecasts are weekly profiles, so only the hour of the week matters for caching
+    forecast_hour = None
+    if forecast_at is not None:
+        await ensure_forecaster(db)
+        forecast_hour = minute_of_week(forecast_at) // 60
+    
+    media_type = MSGPACK_MEDIA_TYPE if wants_msgpack(accept) else "application/json"
+    paginate = per_page is not None or cursor is not None
+    page_size = per_page or PAGE_SIZE_DEFAULT
+    try:
+        after = parse_cursor(cursor, ranked=origin is not None or bool(q))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    params = {
+        "near": origin,
+        "radius_km": radius_km if origin else None,
+        "open": open,
+        "category": category,
+        "neighborhood": neighborhood,
+        "pet_friendly": pet_friendly,
+        "ada_accessible": ada_accessible,
+        "lgbtq_friendly": lgbtq_friendly,
+        "q": q,
+        "open_minute": open_minute,
+        "open_now": open_now,
+        "forecast_hour": forecast_hour,
+        "forecast_version": forecaster.version if forecast_hour is not None else None,
+        "per_page": page_size if paginate else None,
+        "cursor": cursor,
+        "format": media_type,
+    }
+    
+    # Answer polling clients from a cheap version token before running the full query
+    etag, last_modified = await status_version(db, filters=f"{response_cache.make_key('shelters', params)}|{near}")
+    if open_minute is not None or forecast_hour is not None:
+        # Results change with the clock, not with writes, so only the ETag can validate them
+        last_modified = None
+    headers = {**version_headers(etag, last_modified), "Vary": "Accept"}
+    if is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
+    
+    # Keyed on the version too, so a worker whose entry outlived a write can't serve it under the new ETag
+    cache_key = response_cache.make_key("shelters", {**params, "version": etag})
+    cached = await response_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type=media_type, headers={**headers, "X-Cache": "HIT"})
+    
+    shelters = await _find_shelters(
+        db,
+        origin=origin,
+        radius_km=radius_km,
+        open=open,
+        category=category,
+        neighborhood=neighborhood,
+        pet_friendly=pet_friendly,
+        ada_accessible=ada_accessible,
+        lgbtq_friendly=lgbtq_friendly,
+        q=q,
+        open_minute=open_minute,
+        open_now=open_now is not False,
+        after=after,
+        limit=page_size + 1 if paginate else None,
+    )
+    
+    page = {}
+    if paginate:
+        page = {"next_cursor": next_cursor(shelters, page_size), "per_page": page_size}
+        shelters = shelters[:page_size]
+    
+    fields = SHELTER_FIELDS
+    if forecast_hour is not None:
+        forecasts = forecaster.for_shelters((shelter["id"] for shelter in shelters), forecast_at)
+        for shelter in shelters:
+            shelter["forecast"] = forecasts[shelter["id"]]
+        fields = SHELTER_FORECAST_FIELDS
+    
+    if media_type == MSGPACK_MEDIA_TYPE:
+        body = pack_rows(fields, shelters, **page)
+    elif paginate:
+        body = dumps({"items": shelters, **page})
+    else:
+        body = dumps(shelters)
+    await response_cache.set(cache_key, body)
+    
+    return Response(content=body, media_type=media_type, headers={**headers, "X-Cache": "MISS"})
 
 
 @router.get("/{shelter_id}", response_model=ShelterResponse)
@@ -104,37 +339,79 @@ async def get_shelter(
     """
     Get a specific shelter by ID
     """
-    query = select(Shelter).options(selectinload(Shelter.statuses)).where(Shelter.id == shelter_id)
+    query = select(Shelter).where(Shelter.id == shelter_id)
     result = await db.execute(query)
     shelter = result.scalar_one_or_none()
     
     if not shelter:
         raise HTTPException(status_code=404, detail="Shelter not found")
     
-    # Apply conservatism rule
-    for status in shelter.statuses:
-        apply_conservatism_rule(status)
-    
     return shelter
 
 
+@router.get("/{shelter_id}/forecast", response_model=ShelterForecastResponse)
+async def get_shelter_forecast(
+    shelter_id: UUID,
+    start: Optional[datetime] = Query(None, description="First forecast hour (local if no offset); defaults to the current hour"),
+    hours: int = Query(24, ge=1, le=168),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Hourly expected beds and chance of at least one bed, per category
+    Fitted from recent status history by day of week and hour of day
+    """
+    await ensure_forecaster(db)
+    if shelter_id not in forecaster:
+        exists = await db.scalar(select(Shelter.id).where(Shelter.id == shelter_id))
+        if exists is None:
+            raise HTTPException(status_code=404, detail="Shelter not found")
+    
+    if start is None:
+        start = datetime.now(LOCAL_TIMEZONE)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=LOCAL_TIMEZONE)
+    # Step in UTC so the hours stay an hour apart across DST changes
+    start = start.replace(minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+    
+    body = dumps({
+        "shelter_id": shelter_id,
+        "trained_at": forecaster.trained_at,
+        "categories": forecaster.hourly(shelter_id, start, hours),
+    })
+    return Response(content=body, media_type="application/json")
+
+
 @router.get("/{shelter_id}/status", response_model=List[ShelterStatusResponse])
 async def get_shelter_status(
     shelter_id: UUID,
+    response: Response,
+    accept: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Get status for all categories of a specific shelter
     """
-    query = select(ShelterStatus).where(ShelterStatus.shelter_id == shelter_id)
-    result = await db.execute(query)
-    statuses = result.scalars().all()
+    binary = wants_msgpack(accept)
+    etag, last_modified = await status_version(db, filters="msgpack" if binary else "", shelter_id=shelter_id)
+    headers = {**version_headers(etag, last_modified), "Vary": "Accept"}
+    if last_modified is not None and is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+        return Response(status_code=304, headers=headers)
     
-    if not statuses:
-        raise HTTPException(status_code=404, detail="Shelter status not found")
+    response.headers.update(headers)
     
-    # Apply conservatism rule
-    for status in statuses:
-        apply_conservatism_rule(status)
+    snapshot = await db.get(ShelterAvailability, shelter_id)
+    
+    if not snapshot:
+        raise HTTPException(status_code=404, detail="Shelter status not found")
     
+    # Conservatism rule is applied from the snapshot's per-category staleness expiry
+    statuses = snapshot_statuses(snapshot)
+    if binary:
+        return Response(
+            content=pack_rows(STATUS_FIELDS, statuses),
+            media_type=MSGPACK_MEDIA_TYPE,
+            headers=headers,
+        )
     return statuses
@@ -1,6 +1,73 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from uuid import UUID
+
+from app.api.auth import get_current_staff
+from app.database import get_db
+from app.models import Staff
+from app.schemas.hold import HoldCreate, HoldResponse
+from app.schemas.shelter import ShelterStatusBulkUpdate, ShelterStatusBulkResponse
+from app.services.holds import InsufficientBedsError, cancel_hold, create_hold
+from app.services.status_updates import apply_bulk_status_updates
 
 router = APIRouter()
 
 # Staff endpoints for shelter management
-# TODO: Implement staff shelter management endpoints
+
+
+@router.post("/status/bulk", response_model=ShelterStatusBulkResponse)
+async def bulk_update_status(
+    update: ShelterStatusBulkUpdate,
+    staff: Staff = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Update bed counts for many shelter/category pairs in a single transaction
+    Invalid items are reported individually; valid items are still applied
+    """
+    results = await apply_bulk_status_updates(db, staff, update.items)
+    succeeded = sum(1 for r in results if r.success)
+    
+    return ShelterStatusBulkResponse(
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        results=results,
+    )
+
+
+@router.post("/holds", response_model=HoldResponse, status_code=201)
+async def place_hold(
+    request: HoldCreate,
+    staff: Staff = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Reserve beds for a client; beds are returned when the hold expires or is cancelled
+    """
+    try:
+        return await create_hold(
+            db, staff, request.shelter_id, request.category, request.qty, request.minutes
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except InsufficientBedsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.delete("/holds/{hold_id}", response_model=HoldResponse)
+async def release_hold(
+    hold_id: UUID,
+    staff: Staff = Depends(get_current_staff),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Cancel an active hold and return its beds
+    """
+    try:
+        return await cancel_hold(db, staff, hold_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+
+from app.services.events import Subscription, event_bus, format_sse
+from app.services.geo import parse_coordinates
+
+router = APIRouter()
+
+# Seconds between SSE keepalive comments so proxies don't drop idle streams
+KEEPALIVE_SECONDS = 15
+
+
+def _build_subscription(
+    category: Optional[str],
+    bbox: Optional[str],
+    near: Optional[str],
+    radius_km: float,
+    opened_only: bool,
+) -> Subscription:
+    subscription = Subscription(category=category, radius_km=radius_km, opened_only=opened_only)
+
+    if bbox:
+        try:
+            min_lon, min_lat, max_lon, max_lat = (float(v) for v in bbox.split(","))
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid bbox format. Use 'min_lon,min_lat,max_lon,max_lat'"
+            )
+        subscription.bbox = (min_lon, min_lat, max_lon, max_lat)
+
+    if near:
+        try:
+            lat, lon = parse_coordinates(near)
+        except (ValueError, AttributeError):
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid coordinates format. Use 'lat,lon'"
+            )
+        subscription.near = (float(lat), float(lon))
+
+    return subscription
+
+
+@router.get("/availability")
+async def stream_availability(
+    request: Request,
+    category: Optional[str] = Query(None, regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$"),
+    bbox: Optional[str] = Query(None, description="min_lon,min_lat,max_lon,max_lat"),
+    near: Optional[str] = Query(None, description="lat,lon coordinates"),
+    radius_km: float = Query(10.0, ge=0.1, le=50.0),
+    opened_only: bool = Query(False, description="Only send events where beds opened"),
+):
+    """
+    Server-Sent Events stream of bed availability deltas
+    """
+    subscription = event_bus.subscribe(
+        _build_subscription(category, bbox, near, radius_km, opened_only)
+    )
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    payload = await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(payload)
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/availability/ws")
+async def stream_availability_ws(
+    websocket: WebSocket,
+    category: Optional[str] = Query(None, regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$"),
+    bbox: Optional[str] = Query(None),
+    near: Optional[str] = Query(None),
+    radius_km: float = Query(10.0, ge=0.1, le=50.0),
+    opened_only: bool = Query(False),
+):
+    """
+    WebSocket variant of the availability stream
+    """
+    try:
+        subscription = _build_subscription(category, bbox, near, radius_km, opened_only)
+    except HTTPException as e:
+        await websocket.close(code=1008, reason=e.detail)
+        return
+
+    await websocket.accept()
+    event_bus.subscribe(subscription)
+
+    # Race the next event against the client's next frame, so a quiet subscription still
+    # notices a disconnect, like the SSE loop's is_disconnected check
+    receive = asyncio.ensure_future(websocket.receive())
+    event = None
+    try:
+        while True:
+            event = asyncio.ensure_future(subscription.queue.get())
+            done, _ = await asyncio.wait({receive, event}, return_when=asyncio.FIRST_COMPLETED)
+
+            if receive in done:
+                if receive.result()["type"] == "websocket.disconnect":
+                    break
+                # Clients have nothing to send; ignore stray frames
+                receive = asyncio.ensure_future(websocket.receive())
+
+            if event in done:
+                payload = event.result()
+                await websocket.send_text(json.dumps(
+                    {key: value for key, value in payload.items() if key != "origin"}
+                ))
+            else:
+                event.cancel()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_bus.unsubscribe(subscription)
+        for task in (receive, event):
+            if task is not None and not task.done():
+                task.cancel()
@@ -0,0 +1,32 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.services.serialization import dumps
+from app.services.sync import changes_since, parse_sync_token
+
+router = APIRouter()
+
+
+@router.get("/")
+async def sync(
+    since: Optional[str] = Query(None, description="Token from the previous sync; omit for a full download"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Delta sync: shelters, statuses and resources changed or deleted after the token
+    Keep calling with the returned token while has_more is true
+    """
+    try:
+        since_seq, since_xmin = parse_sync_token(since)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    payload = await changes_since(db, since_seq, since_xmin)
+    return Response(
+        content=dumps(payload),
+        media_type="application/json",
+        headers={"Cache-Control": "no-store"},
+    )
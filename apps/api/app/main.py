@@ -3,15 +3,30 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
+import asyncio
+import logging
 from dotenv import load_dotenv
 from datetime import datetime
 
-from app.database import get_db
-from app.api import shelters, resources, auth, staff, alerts, push
+from app.database import get_db, AsyncSessionLocal, DATABASE_URL
+from app.api import shelters, resources, auth, staff, alerts, push, stream, export, sync, bundle, map, reports, recommendations
 from app.services.availability import apply_conservatism_rule
+from app.services.bundle import BUNDLE_INTERVAL_SECONDS, run_bundle_builder
+from app.services.cache import response_cache
+from app.services.clusters import build_cluster_index
+from app.services.events import EVENT_BRIDGE, PostgresEventBridge, event_bus
+from app.services.forecast import FORECAST_RETRAIN_SECONDS, run_forecast_trainer
+from app.services.history import HISTORY_MAINTENANCE_INTERVAL_SECONDS, run_history_maintenance
+from app.services.holds import run_hold_sweeper
+from app.services import index_refresh  # noqa: F401  applies "records" events to the in-memory indexes
+from app.services.snapshot import rebuild_availability_snapshot
+from app.services.search import build_search_indexes, use_pg_trgm
+from app.services.spatial_index import build_spatial_indexes
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="ShelterLink API",
     description="LA County shelter and resource finder API",
@@ -40,6 +55,91 @@ app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(staff.router, prefix="/staff", tags=["staff"])
 app.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
 app.include_router(push.router, prefix="/push", tags=["push"])
+app.include_router(stream.router, prefix="/stream", tags=["stream"])
+app.include_router(export.router, prefix="/export", tags=["export"])
+app.include_router(sync.router, prefix="/sync", tags=["sync"])
+app.include_router(bundle.router, prefix="/bundle", tags=["bundle"])
+app.include_router(map.router, prefix="/map", tags=["map"])
+app.include_router(reports.router, prefix="/reports", tags=["reports"])
+app.include_router(recommendations.router, prefix="/recommendations", tags=["recommendations"])
+
+event_bridge = None
+background_tasks = []
+
+
+@app.on_event("startup")
+async def startup():
+    """
+    Warm in-memory indexes and the availability snapshot before serving traffic
+    """
+    # Share availability events between workers over LISTEN/NOTIFY; started before the indexes
+    # load so writes made during the build still reach them
+    global event_bridge
+    if EVENT_BRIDGE == "postgres" and DATABASE_URL.startswith("postgresql"):
+        event_bridge = PostgresEventBridge(
+            event_bus, DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://")
+        )
+        try:
+            await event_bridge.start()
+        except Exception as e:
+            logger.warning(f"Event bridge failed to start: {e}")
+            event_bridge = None
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            await build_spatial_indexes(session)
+    except Exception as e:
+        # Routers fall back to database distance queries until the index is built
+        logger.warning(f"Spatial index build failed: {e}")
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            await build_cluster_index(session)
+    except Exception as e:
+        # /map/clusters builds the tree on first request instead
+        logger.warning(f"Map cluster index build failed: {e}")
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            # Only needed when search can't run on pg_trgm
+            if not use_pg_trgm(session):
+                await build_search_indexes(session)
+    except Exception as e:
+        logger.warning(f"Search index build failed: {e}")
+    
+    try:
+        async with AsyncSessionLocal() as session:
+            await rebuild_availability_snapshot(session)
+    except Exception as e:
+        logger.warning(f"Availability snapshot rebuild failed: {e}")
+    
+    background_tasks.append(asyncio.create_task(run_hold_sweeper(AsyncSessionLocal)))
+    
+    # Set BUNDLE_INTERVAL_SECONDS=0 where a separate job publishes bundles to the CDN
+    if BUNDLE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_bundle_builder(AsyncSessionLocal)))
+    
+    # Fits in the background; forecast requests train on demand when this is off
+    if FORECAST_RETRAIN_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_forecast_trainer(AsyncSessionLocal)))
+    
+    # Set HISTORY_MAINTENANCE_INTERVAL_SECONDS=0 where scripts/maintain_history.py runs from cron
+    if HISTORY_MAINTENANCE_INTERVAL_SECONDS > 0:
+        background_tasks.append(asyncio.create_task(run_history_maintenance(AsyncSessionLocal)))
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Stop background tasks and release connections
+    """
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    background_tasks.clear()
+    
+    if event_bridge is not None:
+        await event_bridge.stop()
 
 
 @app.get("/", tags=["root"])
@@ -61,6 +161,14 @@ async def health_check():
     }
 
 
+@app.get("/cache/stats", tags=["health"])
+async def cache_stats():
+    """
+    Response cache hit/miss counters
+    """
+    return response_cache.stats()
+
+
 @app.post("/feedback", tags=["feedback"])
 async def submit_feedback(
     message: str,
@@ -4,6 +4,9 @@ from .staff import Staff
 from .status_change import StatusChange
 from .hold import Hold
 from .translation import TranslationString
+from .availability import ShelterAvailability
+from .sync import SyncTombstone
+from .status_rollup import StatusRollupHourly, StatusRollupDaily
 
 __all__ = [
     "Shelter",
@@ -13,4 +16,8 @@ __all__ = [
     "StatusChange",
     "Hold",
     "TranslationString",
+    "ShelterAvailability",
+    "SyncTombstone",
+    "StatusRollupHourly",
+    "StatusRollupDaily",
 ]
@@ -0,0 +1,35 @@
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB, ARRAY
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ShelterAvailability(Base):
+    """
+    Denormalized current-availability snapshot, one row per shelter
+    Maintained incrementally by app.services.snapshot on status and hold writes
+    """
+    __tablename__ = "shelter_availability"
+
+    shelter_id = Column(UUID(as_uuid=True), ForeignKey("shelters.id", ondelete="CASCADE"), primary_key=True)
+    # {category: {id, beds_total, beds_available, beds_held, status, notes, last_updated, stale_at}}
+    categories = Column(JSONB, nullable=False, default=dict)
+    open_categories = Column(ARRAY(String), nullable=False, default=list)
+    has_closed_category = Column(Boolean, nullable=False, default=False)
+    effective_status = Column(String, nullable=False, default="UNKNOWN")
+    beds_available = Column(Integer, nullable=False, default=0)
+    # Earliest and latest points at which an open category goes stale
+    stale_at = Column(DateTime(timezone=True))
+    open_until = Column(DateTime(timezone=True))
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("idx_shelter_availability_categories", "categories", postgresql_using="gin"),
+        Index("idx_shelter_availability_open_categories", "open_categories", postgresql_using="gin"),
+        Index("idx_shelter_availability_open_until", "open_until"),
+        # Newest refresh, for the list ETag
+        Index("idx_shelter_availability_refreshed_at", "refreshed_at"),
+    )
+
+    def __repr__(self):
+        return f"<ShelterAvailability(shelter_id={self.shelter_id}, effective_status='{self.effective_status}')>"
@@ -1,8 +1,9 @@
-from sqlalchemy import Column, String, Text, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID, NUMERIC
+from sqlalchemy import Column, String, Text, CheckConstraint, Index
+from sqlalchemy.dialects.postgresql import INT4MULTIRANGE, UUID, NUMERIC
 from geoalchemy2 import Geography
 import uuid
 from app.database import Base
+from app.models.sync import change_seq_column, change_xid_column
 
 
 class Resource(Base):
@@ -24,9 +25,25 @@ class Resource(Base):
     hours = Column(Text)
     phone = Column(Text)
     notes = Column(Text)
+    change_seq = change_seq_column()
+    change_xid = change_xid_column()
+
+    # Parsed weekly opening hours as minute-of-week ranges (Monday 00:00 local = 0); NULL when hours can't be parsed
+    open_schedule = Column(INT4MULTIRANGE)
 
     # PostGIS geography column for spatial queries
-    location = Column(Geography('POINT', srid=4326))
+    location = Column(Geography('POINT', srid=4326, spatial_index=False))
+
+    # pg_trgm indexes back ?q= search and make neighborhood ILIKE '%x%' indexable
+    __table_args__ = tuple(
+        Index(f"ix_resources_{name}_trgm", name, postgresql_using="gin", postgresql_ops={name: "gin_trgm_ops"})
+        for name in ("name", "neighborhood", "address", "notes")
+    ) + (
+        # GiST index answers open_now / open_at containment checks
+        Index("ix_resources_open_schedule", "open_schedule", postgresql_using="gist"),
+        # Backs ST_DWithin radius filters and <-> nearest ordering
+        Index("ix_resources_location_geog", "location", postgresql_using="gist"),
+    )
 
     def __repr__(self):
         return f"<Resource(id={self.id}, name='{self.name}', type='{self.type}', neighborhood='{self.neighborhood}')>"
@@ -1,10 +1,11 @@
-from sqlalchemy import Column, String, Boolean, Time, Text, ARRAY, Integer, DateTime, ForeignKey, CheckConstraint
-from sqlalchemy.dialects.postgresql import UUID, NUMERIC
+from sqlalchemy import Column, String, Boolean, Time, Text, ARRAY, Integer, DateTime, ForeignKey, CheckConstraint, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import INT4MULTIRANGE, UUID, NUMERIC
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from geoalchemy2 import Geography
 import uuid
 from app.database import Base
+from app.models.sync import change_seq_column, change_xid_column
 
 
 class Shelter(Base):
@@ -26,6 +27,15 @@ class Shelter(Base):
     curfew_time = Column(Time)
     intake_notes = Column(Text)
     languages = Column(ARRAY(String))
+    change_seq = change_seq_column()
+    change_xid = change_xid_column()
+
+    # Parsed weekly opening hours as minute-of-week ranges (Monday 00:00 local = 0); NULL when hours can't be parsed
+    open_schedule = Column(INT4MULTIRANGE)
+
+    # Set for shelters imported from external feeds: the feed record's id and a digest of its imported values
+    external_id = Column(Text)
+    source_hash = Column(Text)
 
     # Relationships
     statuses = relationship("ShelterStatus", back_populates="shelter", cascade="all, delete-orphan")
@@ -33,7 +43,20 @@ class Shelter(Base):
     holds = relationship("Hold", back_populates="shelter", cascade="all, delete-orphan")
 
     # PostGIS geography column for spatial queries
-    location = Column(Geography('POINT', srid=4326))
+    location = Column(Geography('POINT', srid=4326, spatial_index=False))
+
+    # pg_trgm indexes back ?q= search and make neighborhood ILIKE '%x%' indexable
+    __table_args__ = tuple(
+        Index(f"ix_shelters_{name}_trgm", name, postgresql_using="gin", postgresql_ops={name: "gin_trgm_ops"})
+        for name in ("name", "neighborhood", "address", "intake_notes")
+    ) + (
+        # GiST index answers open_now / open_at containment checks
+        Index("ix_shelters_open_schedule", "open_schedule", postgresql_using="gist"),
+        # Backs ST_DWithin radius filters and <-> nearest ordering
+        Index("ix_shelters_location_geog", "location", postgresql_using="gist"),
+        # Conflict target for feed imports; NULL for shelters created by staff
+        Index("ix_shelters_external_id", "external_id", unique=True),
+    )
 
     def __repr__(self):
         return f"<Shelter(id={self.id}, name='{self.name}', neighborhood='{self.neighborhood}')>"
@@ -58,9 +81,18 @@ class ShelterStatus(Base):
     )
     last_updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     notes = Column(Text)
+    change_seq = change_seq_column()
+    change_xid = change_xid_column()
 
     # Relationships
     shelter = relationship("Shelter", back_populates="statuses")
 
+    # One status row per shelter/category; also the conflict target for bulk upserts
+    __table_args__ = (
+        UniqueConstraint("shelter_id", "category", name="uq_shelter_status_shelter_category"),
+        # Newest update and next status to go stale, for the list ETag
+        Index("idx_shelter_status_last_updated", "last_updated"),
+    )
+
     def __repr__(self):
         return f"<ShelterStatus(shelter_id={self.shelter_id}, category='{self.category}', status='{self.status}')>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, CheckConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -7,6 +7,10 @@ from app.database import Base
 
 
 class StatusChange(Base):
+    """
+    Append-only bed-count history, range-partitioned by month on changed_at
+    Partitions are created ahead and retired by app.services.history
+    """
     __tablename__ = "status_changes"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -19,11 +23,18 @@ class StatusChange(Base):
     prev_available = Column(Integer, nullable=False)
     new_available = Column(Integer, nullable=False)
     changed_by = Column(UUID(as_uuid=True), ForeignKey("staff.id"), nullable=False)
-    changed_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Partition key, so it must be part of the primary key
+    changed_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
     # Relationships
     shelter = relationship("Shelter", back_populates="status_changes")
     staff = relationship("Staff")
 
+    # The only secondary index; reports read the rollup tables instead of scanning history
+    __table_args__ = (
+        Index("ix_status_changes_changed_at", "changed_at"),
+        {"postgresql_partition_by": "RANGE (changed_at)"},
+    )
+
     def __repr__(self):
         return f"<StatusChange(shelter_id={self.shelter_id}, category='{self.category}', prev={self.prev_available}, new={self.new_available})>"
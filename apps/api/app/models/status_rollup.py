@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Computed, Date, DateTime, Float, ForeignKey, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+from app.database import Base
+
+
+class _RollupColumns:
+    """
+    Per-shelter, per-category availability aggregates over the bed counts recorded in a bucket
+    Sums and sample counts are kept so hourly buckets add up exactly into daily ones
+    """
+    shelter_id = Column(UUID(as_uuid=True), ForeignKey("shelters.id", ondelete="CASCADE"), primary_key=True)
+    category = Column(String, primary_key=True)
+    samples = Column(Integer, nullable=False)
+    min_available = Column(Integer, nullable=False)
+    max_available = Column(Integer, nullable=False)
+    sum_available = Column(Integer, nullable=False)
+    avg_available = Column(Float, Computed("sum_available::float8 / samples", persisted=True))
+    # Bed count at the end of the bucket
+    last_available = Column(Integer, nullable=False)
+
+
+class StatusRollupHourly(_RollupColumns, Base):
+    __tablename__ = "status_rollups_hourly"
+
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+
+    def __repr__(self):
+        return f"<StatusRollupHourly(bucket={self.bucket}, shelter_id={self.shelter_id}, category='{self.category}')>"
+
+
+class StatusRollupDaily(_RollupColumns, Base):
+    __tablename__ = "status_rollups_daily"
+
+    # Calendar day in LOCAL_TIMEZONE
+    day = Column(Date, primary_key=True)
+
+    def __repr__(self):
+        return f"<StatusRollupDaily(day={self.day}, shelter_id={self.shelter_id}, category='{self.category}')>"
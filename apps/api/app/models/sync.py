@@ -0,0 +1,57 @@
+from sqlalchemy import Column, String, BigInteger, DateTime, Index, Sequence, literal_column, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from app.database import Base
+
+# Shared, monotonically increasing change counter behind the /sync tokens
+CHANGE_SEQ = Sequence("change_seq", metadata=Base.metadata)
+
+# Id of the writing transaction (xid8 as bigint); sequence values are handed out before commit,
+# so sync re-checks rows from transactions that were still in flight when the last token was issued
+CURRENT_XACT_ID = literal_column("pg_current_xact_id()::text::bigint")
+
+
+def change_seq_column() -> Column:
+    """
+    change_seq column for a synced table: assigned on insert and bumped on every update
+    """
+    return Column(
+        BigInteger,
+        server_default=CHANGE_SEQ.next_value(),
+        onupdate=CHANGE_SEQ.next_value(),
+        nullable=False,
+        index=True,
+    )
+
+
+def change_xid_column() -> Column:
+    """
+    change_xid column for a synced table: the transaction that last wrote the row
+    """
+    return Column(
+        BigInteger,
+        server_default=text("pg_current_xact_id()::text::bigint"),
+        onupdate=CURRENT_XACT_ID,
+        nullable=False,
+        index=True,
+    )
+
+
+class SyncTombstone(Base):
+    """
+    Record of a deleted synced row so delta sync can tell clients to drop it
+    """
+    __tablename__ = "sync_tombstones"
+
+    change_seq = Column(BigInteger, CHANGE_SEQ, primary_key=True)
+    change_xid = change_xid_column()
+    entity = Column(String, nullable=False)
+    entity_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_entity", "entity", "entity_id"),
+    )
+
+    def __repr__(self):
+        return f"<SyncTombstone(entity='{self.entity}', entity_id={self.entity_id}, change_seq={self.change_seq})>"
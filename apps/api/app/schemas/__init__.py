@@ -1,6 +1,7 @@
-from .shelter import ShelterCreate, ShelterUpdate, ShelterResponse, ShelterStatusCreate, ShelterStatusUpdate, ShelterStatusResponse
+from .shelter import ShelterCreate, ShelterUpdate, ShelterResponse, ShelterStatusCreate, ShelterStatusUpdate, ShelterStatusResponse, ShelterStatusBulkItem, ShelterStatusBulkUpdate, ShelterStatusBulkResult, ShelterStatusBulkResponse
 from .resource import ResourceCreate, ResourceUpdate, ResourceResponse
 from .staff import StaffCreate, StaffResponse, StaffLogin
+from .hold import HoldCreate, HoldResponse
 from .common import PaginatedResponse, LocationQuery
 
 __all__ = [
@@ -10,12 +11,18 @@ __all__ = [
     "ShelterStatusCreate",
     "ShelterStatusUpdate",
     "ShelterStatusResponse",
+    "ShelterStatusBulkItem",
+    "ShelterStatusBulkUpdate",
+    "ShelterStatusBulkResult",
+    "ShelterStatusBulkResponse",
     "ResourceCreate",
     "ResourceUpdate",
     "ResourceResponse",
     "StaffCreate",
     "StaffResponse",
     "StaffLogin",
+    "HoldCreate",
+    "HoldResponse",
     "PaginatedResponse",
     "LocationQuery",
 ]
@@ -13,10 +13,8 @@ class LocationQuery(BaseModel):
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
-    page: int
+    next_cursor: Optional[str] = Field(None, description="Opaque keyset cursor; null on the last page")
     per_page: int
-    pages: int
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from datetime import datetime
+from uuid import UUID
+
+
+class HoldCreate(BaseModel):
+    shelter_id: UUID
+    category: str = Field(..., regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$")
+    qty: int = Field(1, ge=1, le=50)
+    minutes: int = Field(60, ge=5, le=24 * 60)
+
+
+class HoldResponse(BaseModel):
+    id: UUID
+    shelter_id: UUID
+    category: str
+    qty: int
+    created_by: UUID
+    expires_at: datetime
+    status: str
+
+    class Config:
+        from_attributes = True
@@ -35,6 +35,7 @@ class ResourceUpdate(BaseModel):
 class ResourceResponse(ResourceBase):
     id: UUID
     distance_km: Optional[float] = None
+    relevance: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Dict, Optional, List
 from decimal import Decimal
 from datetime import time, datetime
 from uuid import UUID
@@ -45,9 +45,16 @@ class ShelterUpdate(BaseModel):
     languages: Optional[List[str]] = Field(None, max_items=10)
 
 
+class CategoryForecast(BaseModel):
+    beds_expected: float
+    p_available: float = Field(..., ge=0, le=1)
+
+
 class ShelterResponse(ShelterBase):
     id: UUID
     distance_km: Optional[float] = None
+    relevance: Optional[float] = None
+    forecast: Optional[Dict[str, CategoryForecast]] = None
 
     class Config:
         from_attributes = True
@@ -85,3 +92,37 @@ class ShelterStatusResponse(ShelterStatusBase):
 
     class Config:
         from_attributes = True
+
+
+class ShelterStatusBulkItem(ShelterStatusUpdate):
+    shelter_id: UUID
+    category: str = Field(..., regex="^(MEN|WOMEN|FAMILY|YOUTH|MIXED)$")
+
+
+class ShelterStatusBulkUpdate(BaseModel):
+    items: List[ShelterStatusBulkItem] = Field(..., min_items=1, max_items=500)
+
+
+class ShelterStatusBulkResult(BaseModel):
+    index: int
+    shelter_id: UUID
+    category: str
+    success: bool
+    error: Optional[str] = None
+    status: Optional[ShelterStatusResponse] = None
+
+
+class ShelterStatusBulkResponse(BaseModel):
+    succeeded: int
+    failed: int
+    results: List[ShelterStatusBulkResult]
+
+
+class ShelterForecastPoint(CategoryForecast):
+    at: datetime
+
+
+class ShelterForecastResponse(BaseModel):
+    shelter_id: UUID
+    trained_at: Optional[datetime] = None
+    categories: Dict[str, List[ShelterForecastPoint]]
@@ -1,6 +1,11 @@
 from datetime import datetime, timedelta
 from app.models import ShelterStatus
 
+# Open/limited statuses older than this are downgraded to UNKNOWN
+STALE_AFTER = timedelta(hours=12)
+
+OPEN_STATUSES = ('OPEN', 'LIMITED')
+
 
 def apply_conservatism_rule(status: ShelterStatus) -> None:
     """
@@ -10,8 +15,8 @@ def apply_conservatism_rule(status: ShelterStatus) -> None:
         return
     
     # Check if more than 12 hours have passed
-    if datetime.utcnow() - status.last_updated > timedelta(hours=12):
-        if status.status in ['OPEN', 'LIMITED']:
+    if datetime.utcnow() - status.last_updated > STALE_AFTER:
+        if status.status in OPEN_STATUSES:
             status.status = 'UNKNOWN'
             # Note: We don't update last_updated here to preserve the original timestamp
 
@@ -0,0 +1,164 @@
+from datetime import datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+# Wire codes are list positions; only ever append so older clients keep decoding
+CATEGORIES = ("MEN", "WOMEN", "FAMILY", "YOUTH", "MIXED")
+STATUSES = ("OPEN", "LIMITED", "FULL", "UNKNOWN")
+RESOURCE_TYPES = (
+    "FOOD", "SHOWER", "HEALTH", "LEGAL", "EMPLOYMENT",
+    "HYGIENE", "COOLING", "WARMING", "SAFE_PARKING",
+)
+
+# Coordinates are sent as int32 degrees * 1e7 (about 1 cm of precision)
+COORD_SCALE = 10 ** 7
+
+FORMAT_VERSION = 1
+
+
+def wants_msgpack(accept: Optional[str]) -> bool:
+    """
+    True when the Accept header prefers MessagePack and the encoder is installed
+    JSON stays the default for browsers and anything that doesn't ask
+    """
+    if msgpack is None or not accept:
+        return False
+
+    best, best_q = None, -1.0
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type.strip() in (MSGPACK_MEDIA_TYPE, "application/json") and q > best_q:
+            best, best_q = media_type.strip(), q
+
+    return best == MSGPACK_MEDIA_TYPE and best_q > 0
+
+
+def _uuid(value) -> bytes:
+    return (value if isinstance(value, UUID) else UUID(str(value))).bytes
+
+
+def _coord(value) -> int:
+    return int((Decimal(value) * COORD_SCALE).to_integral_value())
+
+
+def _meters(value) -> Optional[int]:
+    return None if value is None else round(value * 1000)
+
+
+def _minutes(value: Optional[time]) -> Optional[int]:
+    return None if value is None else value.hour * 60 + value.minute
+
+
+def _epoch(value) -> Optional[int]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp())
+
+
+def _enum(values: Tuple[str, ...]) -> Callable[[str], int]:
+    codes = {name: code for code, name in enumerate(values)}
+    return codes.__getitem__
+
+
+def _plain(value):
+    return value
+
+
+# (field, encoder) per response; distance is sent in whole meters
+SHELTER_FIELDS: List[Tuple[str, Callable]] = [
+    ("id", _uuid),
+    ("name", _plain),
+    ("address", _plain),
+    ("lat", _coord),
+    ("lon", _coord),
+    ("neighborhood", _plain),
+    ("phone", _plain),
+    ("hours", _plain),
+    ("website", _plain),
+    ("requires_id", _plain),
+    ("pet_friendly", _plain),
+    ("ada_accessible", _plain),
+    ("lgbtq_friendly", _plain),
+    ("curfew_time", _minutes),
+    ("intake_notes", _plain),
+    ("languages", _plain),
+    ("distance_km", _meters),
+    ("relevance", _plain),
+]
+
+# Appended when a list request asks for forecasts; values are {category: {beds_expected, p_available}}
+SHELTER_FORECAST_FIELDS = SHELTER_FIELDS + [("forecast", _plain)]
+
+RESOURCE_FIELDS: List[Tuple[str, Callable]] = [
+    ("id", _uuid),
+    ("name", _plain),
+    ("type", _enum(RESOURCE_TYPES)),
+    ("address", _plain),
+    ("lat", _coord),
+    ("lon", _coord),
+    ("neighborhood", _plain),
+    ("hours", _plain),
+    ("phone", _plain),
+    ("notes", _plain),
+    ("distance_km", _meters),
+    ("relevance", _plain),
+]
+
+STATUS_FIELDS: List[Tuple[str, Callable]] = [
+    ("id", _uuid),
+    ("shelter_id", _uuid),
+    ("category", _enum(CATEGORIES)),
+    ("beds_total", _plain),
+    ("beds_available", _plain),
+    ("status", _enum(STATUSES)),
+    ("notes", _plain),
+    ("last_updated", _epoch),
+]
+
+_ENUMS = {
+    "category": CATEGORIES,
+    "status": STATUSES,
+    "type": RESOURCE_TYPES,
+}
+
+
+def pack_rows(
+    fields: Sequence[Tuple[str, Callable]],
+    rows: Sequence[Mapping[str, Any]],
+    **extra: Any,
+) -> bytes:
+    """
+    Pack rows as a self-describing MessagePack table: field names once, then one array per row
+    Field names ending in _km become _m and coordinates are fixed-point ints
+    """
+    names = [name.replace("distance_km", "distance_m") for name, _ in fields]
+    payload: Dict[str, Any] = {
+        "v": FORMAT_VERSION,
+        "fields": names,
+        "enums": {name: list(_ENUMS[name]) for name, _ in fields if name in _ENUMS},
+        "coord_scale": COORD_SCALE,
+        "rows": [
+            [None if row.get(name) is None else encode(row[name]) for name, encode in fields]
+            for row in rows
+        ],
+    }
+    payload.update(extra)
+    return msgpack.packb(payload, use_bin_type=True)
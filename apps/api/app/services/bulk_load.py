@@ -0,0 +1,326 @@
+import logging
+import random
+from datetime import datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID, uuid4
+
+from sqlalchemy import Table, insert, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+from app.models import Resource, Shelter, ShelterStatus, Staff, StatusChange
+from app.services.availability import get_status_from_availability
+from app.services.binary import CATEGORIES, RESOURCE_TYPES
+from app.services.history import ensure_partitions
+from app.services.hours import format_multirange, schedule_for
+from app.services.neighborhoods import resolve_neighborhoods
+
+logger = logging.getLogger(__name__)
+
+# Rows per COPY call; each call streams one chunk from the generator
+COPY_CHUNK_SIZE = 50_000
+
+# Rough LA County bounding box for background points
+LAT_RANGE = (33.70, 34.82)
+LON_RANGE = (-118.95, -117.65)
+
+# (lat, lon, share of points, spread in degrees) for areas with many services
+HOTSPOTS = [
+    (34.0440, -118.2440, 0.20, 0.010),  # Skid Row
+    (34.1010, -118.3270, 0.08, 0.020),  # Hollywood
+    (34.0610, -118.3000, 0.06, 0.015),  # Koreatown
+    (33.9900, -118.4600, 0.05, 0.015),  # Venice
+    (34.0190, -118.4910, 0.04, 0.015),  # Santa Monica
+    (33.7700, -118.1900, 0.08, 0.030),  # Long Beach
+    (34.1870, -118.4490, 0.07, 0.030),  # Van Nuys
+    (34.1480, -118.1440, 0.05, 0.020),  # Pasadena
+    (33.8960, -118.2200, 0.05, 0.020),  # Compton
+    (33.9620, -118.3530, 0.04, 0.020),  # Inglewood
+    (34.6870, -118.1540, 0.03, 0.040),  # Lancaster
+    (34.0550, -117.7500, 0.03, 0.030),  # Pomona
+]
+
+# Hours and curfews drawn for synthetic rows; schedules are filled per combination after the COPY
+SHELTER_HOURS = ["24/7", "24/7", "6:00 PM - 7:00 AM", "7:00 PM - 7:00 AM", "8:00 AM - 8:00 PM", "9:00 AM - 6:00 PM"]
+SHELTER_CURFEWS = [None, time(21, 0), time(22, 0)]
+RESOURCE_HOURS = ["8:00 AM - 5:00 PM", "8:00 AM - 4:00 PM", "9:00 AM - 3:00 PM, Tue/Thu/Sat", "Mon-Fri 9am-5pm", "24/7"]
+LANGUAGES = [["en"], ["en", "es"], ["en", "es"], ["en", "es", "ko"], ["en", "es", "zh"], ["en", "hy"]]
+STREETS = ["Main St", "Broadway", "Figueroa St", "Vermont Ave", "Western Ave", "Sunset Blvd", "Pico Blvd", "Central Ave"]
+
+SHELTER_COLUMNS = [
+    "id", "name", "address", "lat", "lon", "neighborhood", "phone", "hours", "website", "requires_id",
+    "pet_friendly", "ada_accessible", "lgbtq_friendly", "curfew_time", "intake_notes", "languages",
+]
+STATUS_COLUMNS = ["id", "shelter_id", "category", "beds_total", "beds_available", "status", "last_updated", "notes"]
+STATUS_CHANGE_COLUMNS = ["id", "shelter_id", "category", "prev_available", "new_available", "changed_by", "changed_at"]
+RESOURCE_COLUMNS = ["id", "name", "type", "address", "lat", "lon", "neighborhood", "hours", "phone", "notes"]
+
+_LOADED_TABLES = [Shelter.__table__, ShelterStatus.__table__, StatusChange.__table__, Resource.__table__]
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def la_points(rng: random.Random, count: int) -> Iterator[Tuple[float, float]]:
+    """
+    (lat, lon) points clustered around LA County service hotspots with a uniform background
+    """
+    weights = [share for _, _, share, _ in HOTSPOTS]
+    background = max(1.0 - sum(weights), 0.0)
+    choices = HOTSPOTS + [None]
+    for _ in range(count):
+        spot = rng.choices(choices, weights=weights + [background])[0]
+        if spot is None:
+            yield rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+        else:
+            lat, lon, _, spread = spot
+            yield rng.gauss(lat, spread), rng.gauss(lon, spread)
+
+
+def _located(rng: random.Random, count: int) -> Iterator[Tuple[Decimal, Decimal, str]]:
+    """
+    Points as NUMERIC-ready Decimals with neighborhoods resolved in vectorized batches
+    """
+    for chunk in _chunks(la_points(rng, count), COPY_CHUNK_SIZE):
+        for (lat, lon), neighborhood in zip(chunk, resolve_neighborhoods(chunk)):
+            yield Decimal(f"{lat:.6f}"), Decimal(f"{lon:.6f}"), neighborhood
+
+
+def synthetic_shelters(rng: random.Random, count: int) -> Iterator[Tuple]:
+    for i, (lat, lon, neighborhood) in enumerate(_located(rng, count)):
+        yield (
+            uuid4(),
+            f"{neighborhood} Shelter {i + 1}",
+            f"{rng.randint(100, 19999)} {rng.choice(STREETS)}, Los Angeles, CA",
+            lat,
+            lon,
+            neighborhood,
+            f"(213) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+            rng.choice(SHELTER_HOURS),
+            None,
+            rng.random() < 0.4,
+            rng.random() < 0.3,
+            rng.random() < 0.7,
+            rng.random() < 0.6,
+            rng.choice(SHELTER_CURFEWS),
+            "Synthetic load-test shelter",
+            rng.choice(LANGUAGES),
+        )
+
+
+def synthetic_statuses(
+    rng: random.Random,
+    shelter_ids: Sequence[UUID],
+    per_shelter: int,
+    now: datetime,
+) -> Iterator[Tuple]:
+    """
+    Up to one status per category per shelter; updates are spread over the last six hours so some go stale
+    """
+    per_shelter = min(per_shelter, len(CATEGORIES))
+    for shelter_id in shelter_ids:
+        for category in rng.sample(CATEGORIES, per_shelter):
+            beds_total = rng.randint(10, 200)
+            beds_available = rng.randint(0, beds_total) if rng.random() < 0.7 else 0
+            yield (
+                uuid4(),
+                shelter_id,
+                category,
+                beds_total,
+                beds_available,
+                get_status_from_availability(beds_available, beds_total),
+                now - timedelta(minutes=rng.randint(0, 360)),
+                None,
+            )
+
+
+def synthetic_status_changes(
+    rng: random.Random,
+    statuses: Sequence[Tuple[UUID, str, int]],
+    staff_ids: Sequence[UUID],
+    count: int,
+    now: datetime,
+    history_days: int,
+) -> Iterator[Tuple]:
+    """
+    Audit history drawn from existing (shelter_id, category, beds_total) statuses
+    """
+    span = history_days * 24 * 3600
+    for _ in range(count):
+        shelter_id, category, beds_total = rng.choice(statuses)
+        yield (
+            uuid4(),
+            shelter_id,
+            category,
+            rng.randint(0, beds_total),
+            rng.randint(0, beds_total),
+            rng.choice(staff_ids),
+            now - timedelta(seconds=rng.randint(0, span)),
+        )
+
+
+def synthetic_resources(rng: random.Random, count: int) -> Iterator[Tuple]:
+    for i, (lat, lon, neighborhood) in enumerate(_located(rng, count)):
+        resource_type = rng.choice(RESOURCE_TYPES)
+        yield (
+            uuid4(),
+            f"{neighborhood} {resource_type.replace('_', ' ').title()} {i + 1}",
+            resource_type,
+            f"{rng.randint(100, 19999)} {rng.choice(STREETS)}, Los Angeles, CA",
+            lat,
+            lon,
+            neighborhood,
+            rng.choice(RESOURCE_HOURS),
+            f"(323) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+            "Synthetic load-test resource",
+        )
+
+
+async def copy_rows(
+    conn: AsyncConnection,
+    table: Table,
+    columns: Sequence[str],
+    rows: Iterable[Tuple],
+    chunk_size: int = COPY_CHUNK_SIZE,
+) -> int:
+    """
+    Stream tuples into a table with asyncpg's binary COPY, one chunk at a time
+    Runs inside the connection's current transaction
+    """
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+    total = 0
+    for chunk in _chunks(rows, chunk_size):
+        await driver.copy_records_to_table(table.name, records=chunk, columns=list(columns))
+        total += len(chunk)
+        logger.info("Copied %d rows into %s", total, table.name)
+    return total
+
+
+async def drop_secondary_indexes(conn: AsyncConnection, tables: Sequence[Table]) -> List:
+    """
+    Drop the model-declared non-constraint indexes so COPY doesn't maintain them row by row
+    """
+    dropped = []
+    for table in tables:
+        for index in table.indexes:
+            await conn.execute(text(f'DROP INDEX IF EXISTS "{index.name}"'))
+            dropped.append(index)
+    return dropped
+
+
+async def create_indexes(conn: AsyncConnection, indexes: Sequence) -> None:
+    await conn.execute(text("SET LOCAL maintenance_work_mem = '512MB'"))
+    for index in indexes:
+        await conn.execute(CreateIndex(index, if_not_exists=True))
+
+
+async def _fill_derived_columns(conn: AsyncConnection, table: Table, hours_options, curfew_options) -> None:
+    """
+    Set location and open_schedule for copied rows with one set-based UPDATE per hours/curfew combination
+    asyncpg has no binary codec for PostGIS types, so these can't ride along in the COPY
+    """
+    location = "ST_SetSRID(ST_MakePoint(lon::float8, lat::float8), 4326)::geography"
+    for hours in set(hours_options):
+        for curfew in curfew_options:
+            curfew_clause = ""
+            params = {"hours": hours, "schedule": format_multirange(schedule_for(hours, curfew))}
+            if table is Shelter.__table__:
+                curfew_clause = " AND curfew_time IS NOT DISTINCT FROM :curfew"
+                params["curfew"] = curfew
+            await conn.execute(
+                text(
+                    f"UPDATE {table.name} SET location = {location}, "
+                    f"open_schedule = CAST(:schedule AS int4multirange) "
+                    f"WHERE location IS NULL AND hours = :hours{curfew_clause}"
+                ),
+                params,
+            )
+
+
+async def bulk_load(
+    conn: AsyncConnection,
+    *,
+    shelters: int,
+    statuses_per_shelter: int = len(CATEGORIES),
+    status_changes: int = 0,
+    resources: int = 0,
+    history_days: int = 90,
+    seed: Optional[int] = None,
+    defer_indexes: bool = True,
+) -> Dict[str, int]:
+    """
+    Generate LA-County-distributed fixtures and COPY them in, deferring secondary index builds
+    Call inside a transaction (engine.begin()) so a failed load restores the dropped indexes
+    """
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    counts: Dict[str, int] = {}
+
+    await conn.execute(text("SET LOCAL synchronous_commit = off"))
+    dropped = await drop_secondary_indexes(conn, _LOADED_TABLES) if defer_indexes else []
+
+    # Ids are kept so statuses and history can reference them without reading them back
+    shelter_ids: List[UUID] = []
+
+    def track(rows):
+        for row in rows:
+            shelter_ids.append(row[0])
+            yield row
+
+    counts["shelters"] = await copy_rows(conn, Shelter.__table__, SHELTER_COLUMNS, track(synthetic_shelters(rng, shelters)))
+    await _fill_derived_columns(conn, Shelter.__table__, SHELTER_HOURS, SHELTER_CURFEWS)
+
+    statuses: List[Tuple[UUID, str, int]] = []
+
+    def track_statuses(rows):
+        for row in rows:
+            statuses.append((row[1], row[2], row[3]))
+            yield row
+
+    counts["statuses"] = await copy_rows(
+        conn,
+        ShelterStatus.__table__,
+        STATUS_COLUMNS,
+        track_statuses(synthetic_statuses(rng, shelter_ids, statuses_per_shelter, now)),
+    )
+
+    if status_changes and statuses:
+        # A handful of staff accounts to attribute the history to; small enough for a plain insert
+        staff_rows = [
+            {"id": uuid4(), "email": f"loadtest-{uuid4().hex[:12]}@example.org", "role": "STAFF",
+             "shelter_id": rng.choice(shelter_ids), "locale": "en"}
+            for _ in range(max(1, len(shelter_ids) // 100))
+        ]
+        await conn.execute(insert(Staff), staff_rows)
+        counts["staff"] = len(staff_rows)
+
+        # Monthly partitions for the whole window, since rows outside every partition are rejected
+        await ensure_partitions(conn, start=(now - timedelta(days=history_days)).date())
+        counts["status_changes"] = await copy_rows(
+            conn,
+            StatusChange.__table__,
+            STATUS_CHANGE_COLUMNS,
+            synthetic_status_changes(rng, statuses, [row["id"] for row in staff_rows], status_changes, now, history_days),
+        )
+
+    if resources:
+        counts["resources"] = await copy_rows(conn, Resource.__table__, RESOURCE_COLUMNS, synthetic_resources(rng, resources))
+        await _fill_derived_columns(conn, Resource.__table__, RESOURCE_HOURS, [None])
+
+    if dropped:
+        await create_indexes(conn, dropped)
+
+    for table in _LOADED_TABLES:
+        await conn.execute(text(f"ANALYZE {table.name}"))
+
+    return counts
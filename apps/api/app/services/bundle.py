@@ -0,0 +1,178 @@
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import (
+    Resource,
+    Shelter,
+    ShelterAvailability,
+    ShelterStatus,
+    SyncTombstone,
+    TranslationString,
+)
+from app.schemas.resource import ResourceResponse
+from app.schemas.shelter import ShelterResponse
+from app.services.serialization import dumps, response_columns
+from app.services.snapshot import snapshot_statuses
+from app.services.sync import format_sync_token, snapshot_xmin
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_DIR = os.getenv("BUNDLE_DIR", "bundles")
+BUNDLE_INTERVAL_SECONDS = int(os.getenv("BUNDLE_INTERVAL_SECONDS", "300"))
+BUNDLE_KEEP = int(os.getenv("BUNDLE_KEEP", "5"))
+
+# Advisory lock so only one worker builds at a time
+BUNDLE_LOCK_KEY = 0x42554E44
+
+BUNDLE_FORMAT_VERSION = 1
+MANIFEST_NAME = "latest.json"
+BUNDLE_NAME_RE = re.compile(r"^directory-[0-9a-f]{16}\.json\.gz$")
+
+
+async def collect_directory(db: AsyncSession) -> Dict[str, Any]:
+    """
+    Load the whole public directory: shelters, current statuses, resources and translations
+    """
+    # Read the token first so any write racing the build is re-sent by /sync
+    xmin = await snapshot_xmin(db)
+    token = await db.scalar(select(func.greatest(*(
+        select(func.coalesce(func.max(model.change_seq), 0)).scalar_subquery()
+        for model in (Shelter, ShelterStatus, Resource, SyncTombstone)
+    ))))
+
+    result = await db.execute(select(*response_columns(Shelter, ShelterResponse)).order_by(Shelter.id))
+    shelters = [dict(row) for row in result.mappings()]
+
+    result = await db.execute(select(ShelterAvailability).order_by(ShelterAvailability.shelter_id))
+    statuses = [status for snapshot in result.scalars() for status in snapshot_statuses(snapshot)]
+
+    result = await db.execute(select(*response_columns(Resource, ResourceResponse)).order_by(Resource.id))
+    resources = [dict(row) for row in result.mappings()]
+
+    result = await db.execute(
+        select(TranslationString.lang, TranslationString.key, TranslationString.value)
+        .order_by(TranslationString.lang, TranslationString.key)
+    )
+    translations: Dict[str, Dict[str, str]] = {}
+    for lang, key, value in result.all():
+        translations.setdefault(lang, {})[key] = value
+
+    return {
+        "version": BUNDLE_FORMAT_VERSION,
+        "sync_token": format_sync_token(token, xmin),
+        "shelters": shelters,
+        "statuses": statuses,
+        "resources": resources,
+        "translations": translations,
+    }
+
+
+def read_manifest(bundle_dir: str = BUNDLE_DIR) -> Optional[Dict[str, Any]]:
+    """
+    Manifest of the newest bundle, or None before the first build
+    """
+    try:
+        with open(os.path.join(bundle_dir, MANIFEST_NAME), "rb") as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+
+
+def _replace_file(path: str, data: bytes) -> None:
+    """
+    Write through a uniquely named temp file in the same directory, then rename over path
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp creates the file owner-only; bundles are served to everyone
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _write_bundle(bundle_dir: str, body: bytes, counts: Dict[str, int], sync_token: str) -> Dict[str, Any]:
+    digest = hashlib.sha256(body).hexdigest()
+    name = f"directory-{digest[:16]}.json.gz"
+    path = os.path.join(bundle_dir, name)
+    os.makedirs(bundle_dir, exist_ok=True)
+
+    if not os.path.exists(path):
+        # mtime=0 keeps the gzip bytes stable for the same content
+        _replace_file(path, gzip.compress(body, compresslevel=9, mtime=0))
+
+    manifest = {
+        "file": name,
+        "sha256": digest,
+        "size": os.path.getsize(path),
+        "uncompressed_size": len(body),
+        "sync_token": sync_token,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "counts": counts,
+    }
+    _replace_file(os.path.join(bundle_dir, MANIFEST_NAME), dumps(manifest))
+
+    # Keep a few previous bundles so clients that just read the old manifest can still fetch
+    bundles = sorted(
+        (entry for entry in os.scandir(bundle_dir) if BUNDLE_NAME_RE.match(entry.name)),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in bundles[BUNDLE_KEEP:]:
+        if entry.name != name:
+            os.remove(entry.path)
+
+    return manifest
+
+
+async def build_bundle(db: AsyncSession, bundle_dir: str = BUNDLE_DIR) -> Dict[str, Any]:
+    """
+    Build the directory bundle as gzip'd JSON named by its content hash and update the manifest
+    Skipped when another worker holds the build lock
+    """
+    if not await db.scalar(select(func.pg_try_advisory_xact_lock(BUNDLE_LOCK_KEY))):
+        return {"skipped": True}
+
+    directory = await collect_directory(db)
+    counts = {
+        name: len(directory[name])
+        for name in ("shelters", "statuses", "resources", "translations")
+    }
+    body = dumps(directory)
+    # Compression and file writes run off the event loop
+    return await asyncio.to_thread(_write_bundle, bundle_dir, body, counts, directory["sync_token"])
+
+
+async def run_bundle_builder(
+    session_factory: async_sessionmaker,
+    interval: int = BUNDLE_INTERVAL_SECONDS,
+) -> None:
+    """
+    Background task: rebuild the directory bundle on a fixed interval
+    """
+    while True:
+        try:
+            async with session_factory() as session:
+                manifest = await build_bundle(session)
+            if not manifest.get("skipped"):
+                logger.info("Built directory bundle %s (%d bytes)", manifest["file"], manifest["size"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Bundle build failed: {e}")
+
+        await asyncio.sleep(interval)
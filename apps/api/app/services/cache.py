@@ -0,0 +1,198 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlencode
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Hold, Resource, Shelter, ShelterStatus
+
+logger = logging.getLogger(__name__)
+
+# memory is per process: invalidation only clears the worker that made the write, so other workers
+# keep serving old bodies until the TTL unless the key carries a data version. Run multi-worker
+# deployments with redis
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")  # memory, redis
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "30"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+# Decimal places kept from `near` coordinates (3 ~ 110m buckets)
+CACHE_NEAR_PRECISION = int(os.getenv("CACHE_NEAR_PRECISION", "3"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Writes to these models invalidate cached list responses
+_INVALIDATING_MODELS = (Shelter, ShelterStatus, Resource, Hold)
+
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry TTL; only suits a single worker
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self.clear_now()
+
+    def clear_now(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend:
+    """
+    Redis-compatible cache shared across API workers
+    """
+
+    def __init__(self, url: str = REDIS_URL, prefix: str = "shelterlink:cache:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ValueError("CACHE_BACKEND=redis requires the 'redis' package")
+
+        self.prefix = prefix
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._client.set(self.prefix + key, value, ex=ttl)
+
+    async def clear(self) -> None:
+        keys = [key async for key in self._client.scan_iter(match=self.prefix + "*")]
+        if keys:
+            await self._client.unlink(*keys)
+
+
+def _make_backend():
+    if CACHE_BACKEND == "memory":
+        return MemoryCacheBackend()
+    elif CACHE_BACKEND == "redis":
+        return RedisCacheBackend()
+    else:
+        raise ValueError(f"Unsupported cache backend: {CACHE_BACKEND}")
+
+
+class ResponseCache:
+    """
+    TTL cache for serialized public list responses, keyed by normalized query params
+    """
+
+    def __init__(self, backend, ttl: int = CACHE_TTL_SECONDS, near_precision: int = CACHE_NEAR_PRECISION):
+        self.backend = backend
+        self.ttl = ttl
+        self.near_precision = near_precision
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, namespace: str, params: Dict[str, Any]) -> str:
+        """
+        Normalize params into a cache key: drop unset values, sort, bucket `near`
+        """
+        normalized = {}
+        for name, value in params.items():
+            if value is None:
+                continue
+            if name == "near" and isinstance(value, tuple):
+                value = ",".join(f"{float(v):.{self.near_precision}f}" for v in value)
+            elif isinstance(value, bool):
+                value = str(value).lower()
+            normalized[name] = value
+
+        return f"{namespace}?{urlencode(sorted(normalized.items()))}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache get failed: {e}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        try:
+            await self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logger.warning(f"Cache set failed: {e}")
+
+    async def invalidate(self) -> None:
+        try:
+            await self.backend.clear()
+        except Exception as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+
+    def invalidate_soon(self) -> None:
+        """
+        Invalidate from sync contexts such as session hooks
+        """
+        if isinstance(self.backend, MemoryCacheBackend):
+            self.backend.clear_now()
+            return
+
+        try:
+            asyncio.get_running_loop().create_task(self.invalidate())
+        except RuntimeError:
+            logger.warning("No running event loop; cache not invalidated")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "ttl_seconds": self.ttl,
+        }
+
+
+response_cache = ResponseCache(_make_backend())
+
+
+# Write-through invalidation for ORM writes; Core writers call response_cache.invalidate()
+
+@event.listens_for(Session, "after_flush")
+def _mark_cache_dirty(session: Session, flush_context) -> None:
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, _INVALIDATING_MODELS):
+            session.info["response_cache_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+    if session.info.pop("response_cache_dirty", False):
+        response_cache.invalidate_soon()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cache_dirty(session: Session) -> None:
+    session.info.pop("response_cache_dirty", None)
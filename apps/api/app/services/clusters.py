@@ -0,0 +1,329 @@
+import logging
+import math
+import os
+from collections import defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Resource, Shelter, ShelterStatus, SyncTombstone
+from app.services.events import event_bus
+from app.services.sync import changes_since, parse_sync_token, snapshot_xmin
+
+logger = logging.getLogger(__name__)
+
+# Deepest zoom with its own cluster level; closer zooms reuse it
+MAP_CLUSTER_MAX_ZOOM = int(os.getenv("MAP_CLUSTER_MAX_ZOOM", "16"))
+
+# Clusters are 64px cells on 256px web-mercator tiles (4x4 per tile), so each
+# level's cells split exactly into four at the next zoom
+CELL_BITS = 2
+
+# Web mercator stops just short of the poles
+MAX_MERCATOR_LAT = 85.05112878
+
+SHELTER = "shelter"
+RESOURCE = "resource"
+
+Cell = Tuple[int, int]
+
+
+class Cluster:
+    """
+    Running totals for one grid cell at one zoom level
+    """
+
+    __slots__ = ("lat_sum", "lon_sum", "shelters", "resources", "beds", "members")
+
+    def __init__(self):
+        self.lat_sum = 0.0
+        self.lon_sum = 0.0
+        self.shelters = 0
+        self.resources = 0
+        self.beds: Dict[str, int] = defaultdict(int)
+        self.members: Dict[Hashable, str] = {}
+
+    @property
+    def count(self) -> int:
+        return self.shelters + self.resources
+
+
+def _mercator_cell(lat: float, lon: float, bits: int) -> Cell:
+    """
+    Grid cell of a point at 2**bits cells per axis; y grows southward like map tiles
+    """
+    cells = 1 << bits
+    lat = max(min(lat, MAX_MERCATOR_LAT), -MAX_MERCATOR_LAT)
+    sin_lat = math.sin(math.radians(lat))
+    x = (lon + 180.0) / 360.0
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return (
+        min(max(int(x * cells), 0), cells - 1),
+        min(max(int(y * cells), 0), cells - 1),
+    )
+
+
+class ClusterIndex:
+    """
+    Quadtree of grid clusters for every zoom level, precomputed over shelters and resources
+    Moves, deletes and bed changes adjust the running totals along one point's path
+    instead of rebuilding the tree
+    """
+
+    def __init__(self, max_zoom: int = MAP_CLUSTER_MAX_ZOOM):
+        self.max_zoom = max_zoom
+        self.ready = False
+        self._levels: List[Dict[Cell, Cluster]] = [{} for _ in range(max_zoom + 1)]
+        # key -> (kind, lat, lon, cell at max_zoom)
+        self._points: Dict[Hashable, Tuple[str, float, float, Cell]] = {}
+        self._beds: Dict[Hashable, Dict[str, int]] = defaultdict(dict)
+        # (change_seq, snapshot xmin) of the last build or catch-up; None off PostgreSQL
+        self.token: Optional[Tuple[int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _path(self, cell: Cell):
+        """
+        Yield (zoom, cell) from the deepest level up to zoom 0
+        """
+        x, y = cell
+        for zoom in range(self.max_zoom, -1, -1):
+            shift = self.max_zoom - zoom
+            yield zoom, (x >> shift, y >> shift)
+
+    def _apply(self, key: Hashable, sign: int) -> None:
+        kind, lat, lon, cell = self._points[key]
+        beds = self._beds.get(key, {})
+        for zoom, zoom_cell in self._path(cell):
+            level = self._levels[zoom]
+            cluster = level.get(zoom_cell)
+            if cluster is None:
+                cluster = level[zoom_cell] = Cluster()
+
+            cluster.lat_sum += sign * lat
+            cluster.lon_sum += sign * lon
+            if kind == SHELTER:
+                cluster.shelters += sign
+            else:
+                cluster.resources += sign
+            for category, available in beds.items():
+                cluster.beds[category] += sign * available
+
+            if sign > 0:
+                cluster.members[key] = kind
+            else:
+                cluster.members.pop(key, None)
+                if not cluster.members:
+                    del level[zoom_cell]
+
+    def insert(self, key: Hashable, kind: str, lat: float, lon: float) -> None:
+        """
+        Add or move a point
+        """
+        self.remove(key)
+        lat, lon = float(lat), float(lon)
+        self._points[key] = (kind, lat, lon, _mercator_cell(lat, lon, self.max_zoom + CELL_BITS))
+        self._apply(key, 1)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove a point if present; its bed counts are kept in case it is re-inserted
+        """
+        if key not in self._points:
+            return
+        self._apply(key, -1)
+        del self._points[key]
+
+    def forget(self, key: Hashable) -> None:
+        self.remove(key)
+        self._beds.pop(key, None)
+
+    def set_beds(self, key: Hashable, category: str, available: int) -> None:
+        """
+        Update one shelter category's available beds in every cluster above it
+        """
+        delta = available - self._beds[key].get(category, 0)
+        self._beds[key][category] = available
+        if delta == 0 or key not in self._points:
+            return
+
+        for zoom, zoom_cell in self._path(self._points[key][3]):
+            self._levels[zoom][zoom_cell].beds[category] += delta
+
+    def clear(self) -> None:
+        for level in self._levels:
+            level.clear()
+        self._points.clear()
+        self._beds.clear()
+
+    def cell_range(self, bbox: Tuple[float, float, float, float], zoom: int) -> Tuple[int, int, int, int]:
+        """
+        Inclusive (min_x, min_y, max_x, max_y) cells covering a min_lon,min_lat,max_lon,max_lat box
+        """
+        min_lon, min_lat, max_lon, max_lat = bbox
+        bits = min(zoom, self.max_zoom) + CELL_BITS
+        min_x, min_y = _mercator_cell(max_lat, min_lon, bits)
+        max_x, max_y = _mercator_cell(min_lat, max_lon, bits)
+        return min_x, min_y, max_x, max_y
+
+    def clusters(self, bbox: Tuple[float, float, float, float], zoom: int) -> List[Dict[str, Any]]:
+        """
+        Clusters whose cell overlaps the box at a zoom level; single points carry their id
+        """
+        zoom = max(0, min(zoom, self.max_zoom))
+        level = self._levels[zoom]
+        min_x, min_y, max_x, max_y = self.cell_range(bbox, zoom)
+
+        # Walk whichever is smaller: the cells in view or the occupied cells
+        if (max_x - min_x + 1) * (max_y - min_y + 1) <= len(level):
+            cells = (
+                (x, y)
+                for x in range(min_x, max_x + 1)
+                for y in range(min_y, max_y + 1)
+                if (x, y) in level
+            )
+        else:
+            cells = (
+                cell for cell in level
+                if min_x <= cell[0] <= max_x and min_y <= cell[1] <= max_y
+            )
+
+        results = []
+        for x, y in sorted(cells):
+            cluster = level[(x, y)]
+            count = cluster.count
+            item = {
+                "id": f"{zoom}/{x}/{y}",
+                "lat": round(cluster.lat_sum / count, 6),
+                "lon": round(cluster.lon_sum / count, 6),
+                "count": count,
+                "shelters": cluster.shelters,
+                "resources": cluster.resources,
+                "beds_available": {category: beds for category, beds in cluster.beds.items() if beds},
+            }
+            if count == 1:
+                (key, kind), = cluster.members.items()
+                item["point"] = {"id": str(key), "kind": kind}
+            results.append(item)
+        return results
+
+
+cluster_index = ClusterIndex()
+
+_KINDS = {Shelter: SHELTER, Resource: RESOURCE}
+
+
+async def build_cluster_index(db: AsyncSession) -> None:
+    """
+    Load shelter and resource points plus current bed counts into the cluster tree
+    """
+    token = await _change_token(db)
+    cluster_index.clear()
+
+    result = await db.execute(
+        select(ShelterStatus.shelter_id, ShelterStatus.category, ShelterStatus.beds_available)
+    )
+    for shelter_id, category, available in result.all():
+        cluster_index.set_beds(shelter_id, category, available)
+
+    for model, kind in _KINDS.items():
+        result = await db.execute(select(model.id, model.lat, model.lon))
+        for row_id, lat, lon in result.all():
+            cluster_index.insert(row_id, kind, lat, lon)
+
+    cluster_index.token = token
+    cluster_index.ready = True
+    logger.info("Built map cluster index with %d points over %d zoom levels", len(cluster_index), cluster_index.max_zoom + 1)
+
+
+async def data_version(db: AsyncSession) -> int:
+    """
+    Newest change_seq over clustered rows and their deletes; agrees across workers, unlike a local counter
+    """
+    newest = [select(func.max(model.change_seq)).scalar_subquery() for model in (Shelter, Resource, ShelterStatus, SyncTombstone)]
+    return await db.scalar(select(func.coalesce(func.greatest(*newest), 0)))
+
+
+async def _change_token(db: AsyncSession) -> Optional[Tuple[int, int]]:
+    """
+    Position in the change log to catch up from; xmin is read first so in-flight writes are revisited
+    """
+    if db.bind is None or db.bind.dialect.name != "postgresql":
+        return None
+    xmin = await snapshot_xmin(db)
+    return await data_version(db), xmin
+
+
+async def sync_cluster_index(db: AsyncSession) -> None:
+    """
+    Build the tree on first use, then apply rows changed since it was built or last caught up,
+    including writes by other processes that never reached this worker as events
+    """
+    if not cluster_index.ready:
+        await build_cluster_index(db)
+        return
+    if cluster_index.token is None:
+        return
+
+    while True:
+        changes = await changes_since(db, *cluster_index.token)
+        if changes["deleted"]["statuses"]:
+            # Status tombstones don't say which shelter category to zero, so recount everything
+            await build_cluster_index(db)
+            return
+
+        for name, kind in (("shelters", SHELTER), ("resources", RESOURCE)):
+            for row in changes[name]:
+                cluster_index.insert(row["id"], kind, row["lat"], row["lon"])
+            for key in changes["deleted"][name]:
+                cluster_index.forget(key)
+        for row in changes["statuses"]:
+            cluster_index.set_beds(row["shelter_id"], row["category"], row["beds_available"])
+
+        cluster_index.token = parse_sync_token(changes["token"])
+        if not changes["has_more"]:
+            return
+
+
+def _on_status_event(payload: Dict[str, Any]) -> None:
+    # Status events come from ORM commits, bulk Core upserts and other workers via the bridge
+    if payload.get("type") != "status" or payload.get("beds_available") is None:
+        return
+    cluster_index.set_beds(UUID(payload["shelter_id"]), payload["category"], payload["beds_available"])
+
+
+event_bus.add_listener(_on_status_event)
+
+
+# Keep points in step with committed shelter and resource writes made through the ORM
+
+@event.listens_for(Session, "after_flush")
+def _collect_cluster_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault("cluster_index_changes", [])
+
+    for obj in list(session.new) + list(session.dirty):
+        kind = _KINDS.get(type(obj))
+        if kind is not None:
+            pending.append((obj.id, kind, obj.lat, obj.lon))
+
+    for obj in session.deleted:
+        if type(obj) in _KINDS:
+            pending.append((obj.id, None, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_cluster_changes(session: Session) -> None:
+    for key, kind, lat, lon in session.info.pop("cluster_index_changes", []):
+        if kind is None:
+            cluster_index.forget(key)
+        else:
+            cluster_index.insert(key, kind, lat, lon)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_cluster_changes(session: Session) -> None:
+    session.info.pop("cluster_index_changes", None)
@@ -0,0 +1,339 @@
+import asyncio
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import String, bindparam, event, inspect, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Resource, Shelter, ShelterStatus, StatusChange
+from app.services.availability import should_send_notification
+from app.services.geo import haversine_distances
+from app.services.spatial_index import shelter_index
+
+logger = logging.getLogger(__name__)
+
+# In-memory indexes hear other processes' writes only through the bridge; with none, routers
+# query the database directly instead of trusting them
+EVENT_BRIDGE = os.getenv("EVENT_BRIDGE", "postgres")  # none, postgres
+EVENT_CHANNEL = os.getenv("EVENT_CHANNEL", "shelter_events")
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "256"))
+
+# Identifies events published by this worker so bridged copies are not delivered twice
+WORKER_ID = uuid.uuid4().hex
+
+# Index maintenance events that listeners act on but subscribers never see
+INTERNAL_EVENTS = {"records"}
+
+# "records" event entity names for rows the in-memory indexes hold
+RECORD_ENTITIES = {Shelter: "shelter", Resource: "resource"}
+
+_NOTIFY_SQL = text("SELECT pg_notify(:channel, payload) FROM unnest(:payloads) AS payload").bindparams(
+    bindparam("payloads", type_=ARRAY(String))
+)
+
+
+@dataclass
+class Subscription:
+    """
+    A subscriber's queue plus its category and area filters
+    """
+    category: Optional[str] = None
+    bbox: Optional[Tuple[float, float, float, float]] = None  # min_lon, min_lat, max_lon, max_lat
+    near: Optional[Tuple[float, float]] = None
+    radius_km: float = 10.0
+    opened_only: bool = False
+    queue: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(SUBSCRIBER_QUEUE_SIZE))
+
+    def matches(self, payload: Dict[str, Any]) -> bool:
+        if payload.get("type") in INTERNAL_EVENTS:
+            return False
+
+        if self.category and payload.get("category") != self.category:
+            return False
+
+        if self.opened_only and not payload.get("beds_opened"):
+            return False
+
+        if self.bbox or self.near:
+            lat, lon = payload.get("lat"), payload.get("lon")
+            if lat is None or lon is None:
+                return False
+
+            if self.bbox:
+                min_lon, min_lat, max_lon, max_lat = self.bbox
+                if not (min_lat <= lat <= max_lat and min_lon <= lon <= max_lon):
+                    return False
+
+            if self.near:
+                distance = haversine_distances(*self.near, [(lat, lon)])[0]
+                if distance > self.radius_km:
+                    return False
+
+        return True
+
+
+class EventBus:
+    """
+    In-process pub/sub for availability deltas
+    """
+
+    def __init__(self):
+        self._subscriptions: List[Subscription] = []
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self.bridge: Optional["PostgresEventBridge"] = None
+
+    @property
+    def shared(self) -> bool:
+        """
+        Whether other processes' events reach this worker, so in-memory indexes can be trusted
+        """
+        return self.bridge is not None and self.bridge.listening
+
+    def subscribe(self, subscription: Subscription) -> Subscription:
+        self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Call a function synchronously for every delivered event, e.g. to keep an in-memory index current
+        """
+        self._listeners.append(listener)
+
+    def publish(self, payload: Dict[str, Any]) -> None:
+        """
+        Deliver locally and forward to other workers through the bridge
+        """
+        payload = {**payload, "origin": WORKER_ID}
+        self.deliver(payload)
+
+        if self.bridge is not None:
+            try:
+                asyncio.get_running_loop().create_task(self.bridge.notify(payload))
+            except RuntimeError:
+                logger.warning("No running event loop; event not bridged")
+
+    async def publish_on_commit(self, db: AsyncSession, payloads: List[Dict[str, Any]]) -> None:
+        """
+        Queue events with the caller's transaction: pg_notify reaches every listening worker on commit,
+        even when the writer is a CLI process with no bridge, and local delivery follows the commit
+        """
+        if not payloads:
+            return
+        payloads = [{**payload, "origin": WORKER_ID} for payload in payloads]
+        await db.execute(_NOTIFY_SQL, {"channel": EVENT_CHANNEL, "payloads": [json.dumps(p) for p in payloads]})
+        db.info.setdefault("committed_events", []).extend(payloads)
+
+    def deliver(self, payload: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(payload)
+            except Exception as e:
+                logger.warning(f"Event listener failed: {e}")
+
+        for subscription in list(self._subscriptions):
+            if not subscription.matches(payload):
+                continue
+            try:
+                subscription.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                # Drop the oldest event for slow consumers rather than block writers
+                subscription.queue.get_nowait()
+                subscription.queue.put_nowait(payload)
+
+
+class PostgresEventBridge:
+    """
+    Shares events between API workers over Postgres LISTEN/NOTIFY
+    """
+
+    def __init__(self, bus: EventBus, dsn: str, channel: str = EVENT_CHANNEL):
+        self.bus = bus
+        self.dsn = dsn
+        self.channel = channel
+        self._conn = None
+        # asyncpg connections run one query at a time, so sends get their own connection and a lock
+        self._notify_conn = None
+        self._notify_lock = asyncio.Lock()
+
+    @property
+    def listening(self) -> bool:
+        return self._conn is not None and not self._conn.is_closed()
+
+    async def start(self) -> None:
+        import asyncpg
+
+        self._conn = await asyncpg.connect(self.dsn)
+        await self._conn.add_listener(self.channel, self._on_notify)
+        self._notify_conn = await asyncpg.connect(self.dsn)
+        self.bus.bridge = self
+
+    async def stop(self) -> None:
+        self.bus.bridge = None
+        async with self._notify_lock:
+            if self._notify_conn is not None:
+                await self._notify_conn.close()
+                self._notify_conn = None
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
+    async def notify(self, payload: Dict[str, Any]) -> None:
+        if self._conn is None:
+            return
+        async with self._notify_lock:
+            try:
+                if self._notify_conn is None or self._notify_conn.is_closed():
+                    import asyncpg
+
+                    self._notify_conn = await asyncpg.connect(self.dsn)
+                await self._notify_conn.execute("SELECT pg_notify($1, $2)", self.channel, json.dumps(payload))
+            except Exception as e:
+                logger.warning(f"Event bridge notify failed: {e}")
+
+    def _on_notify(self, connection, pid, channel, data: str) -> None:
+        payload = json.loads(data)
+        if payload.get("origin") != WORKER_ID:
+            self.bus.deliver(payload)
+
+
+event_bus = EventBus()
+
+
+def status_event(
+    status: ShelterStatus,
+    prev_available: Optional[int] = None,
+    prev_status: Optional[str] = None,
+    location: Optional[Tuple[float, float]] = None,
+) -> Dict[str, Any]:
+    """
+    Build a status delta payload, flagging "beds opened" via should_send_notification
+    location defaults to the spatial index entry; pass it where the index isn't loaded
+    """
+    beds_opened = False
+    if prev_available is not None:
+        previous = ShelterStatus(beds_available=prev_available, status=prev_status or status.status)
+        beds_opened = should_send_notification(previous, status)
+
+    location = location or shelter_index.get(status.shelter_id)
+    return {
+        "type": "status",
+        "shelter_id": str(status.shelter_id),
+        "category": status.category,
+        "beds_total": status.beds_total,
+        "beds_available": status.beds_available,
+        "prev_available": prev_available,
+        "status": status.status,
+        "beds_opened": beds_opened,
+        "lat": location[0] if location else None,
+        "lon": location[1] if location else None,
+    }
+
+
+def status_change_event(change: StatusChange, status: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build an audit-row payload; status is the category's status after the change, when known
+    """
+    previous = ShelterStatus(beds_available=change.prev_available)
+    current = ShelterStatus(beds_available=change.new_available, status=status or "UNKNOWN")
+    location = shelter_index.get(change.shelter_id)
+    return {
+        "type": "status_change",
+        "shelter_id": str(change.shelter_id),
+        "category": change.category,
+        "prev_available": change.prev_available,
+        "new_available": change.new_available,
+        "beds_opened": should_send_notification(previous, current),
+        "lat": location[0] if location else None,
+        "lon": location[1] if location else None,
+    }
+
+
+def notify_in_transaction(connection: Connection, payloads: List[Dict[str, Any]]) -> None:
+    """
+    pg_notify from a flush hook's connection; other workers get the events on commit, this one never does
+    """
+    if not payloads or connection.dialect.name != "postgresql":
+        return
+    payloads = [{**payload, "origin": WORKER_ID} for payload in payloads]
+    connection.execute(_NOTIFY_SQL, {"channel": EVENT_CHANNEL, "payloads": [json.dumps(p) for p in payloads]})
+
+
+def records_events(entity: str, ids: List[Any], chunk_size: int = 150) -> List[Dict[str, Any]]:
+    """
+    "These rows changed" payloads for writers that bypass the ORM hooks; receivers reload the rows
+    Chunked to stay under pg_notify's 8000-byte payload limit
+    """
+    ids = [str(key) for key in ids]
+    return [
+        {"type": "records", "entity": entity, "ids": ids[start:start + chunk_size]}
+        for start in range(0, len(ids), chunk_size)
+    ]
+
+
+def format_sse(payload: Dict[str, Any]) -> str:
+    data = {key: value for key, value in payload.items() if key != "origin"}
+    return f"event: {payload['type']}\ndata: {json.dumps(data)}\n\n"
+
+
+# Collect deltas during ORM flushes and publish them once the transaction commits
+
+@event.listens_for(Session, "after_flush")
+def _collect_events(session: Session, flush_context) -> None:
+    pending = session.info.setdefault("availability_events", [])
+    statuses = {
+        (obj.shelter_id, obj.category): obj.status
+        for obj in list(session.new) + list(session.dirty) + list(session.identity_map.values())
+        if isinstance(obj, ShelterStatus)
+    }
+
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, ShelterStatus):
+            state = inspect(obj)
+            available = state.attrs.beds_available.history
+            status = state.attrs.status.history
+            if obj in session.new:
+                pending.append(status_event(obj, prev_available=0, prev_status="FULL"))
+            elif available.has_changes() or status.has_changes():
+                prev_available = available.deleted[0] if available.deleted else obj.beds_available
+                prev_status = status.deleted[0] if status.deleted else obj.status
+                pending.append(status_event(obj, prev_available, prev_status))
+        elif isinstance(obj, StatusChange) and obj in session.new:
+            pending.append(status_change_event(obj, statuses.get((obj.shelter_id, obj.category))))
+
+    # This worker's flush hooks update its own indexes; other workers reload the rows on commit
+    changed: Dict[str, List[Any]] = {}
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        entity = RECORD_ENTITIES.get(type(obj))
+        if entity is not None and obj.id is not None:
+            changed.setdefault(entity, []).append(obj.id)
+    notify_in_transaction(
+        session.connection(),
+        [payload for entity, ids in changed.items() for payload in records_events(entity, ids)],
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_events(session: Session) -> None:
+    for payload in session.info.pop("availability_events", []):
+        event_bus.publish(payload)
+
+    # Already sent to other workers by pg_notify in the transaction
+    for payload in session.info.pop("committed_events", []):
+        event_bus.deliver(payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_events(session: Session) -> None:
+    session.info.pop("availability_events", None)
+    session.info.pop("committed_events", None)
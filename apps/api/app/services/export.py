@@ -0,0 +1,227 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import ARRAY, BigInteger, Boolean, DateTime, Integer, Numeric, Table, Time, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Shelter, ShelterStatus, StatusChange
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+EXPORT_TABLES: Dict[str, Table] = {
+    "shelters": Shelter.__table__,
+    "statuses": ShelterStatus.__table__,
+    "status_changes": StatusChange.__table__,
+}
+
+# Column used for ?since= filters and for a stable export order
+_TIMESTAMP_COLUMNS = {
+    "statuses": "last_updated",
+    "status_changes": "changed_at",
+}
+
+# Columns computed from other fields (lat/lon, hours, feed records) or sync bookkeeping that exports leave out
+_DERIVED_COLUMNS = ("location", "open_schedule", "source_hash", "change_xid")
+
+
+def supports_since(table_name: str) -> bool:
+    """
+    Whether ?since= can filter a table; shelters carry no update timestamp (use /sync for their changes)
+    """
+    return table_name in _TIMESTAMP_COLUMNS
+
+
+def export_columns(table_name: str) -> List:
+    """
+    Exported columns for a table, without the derived ones
+    """
+    return [c for c in EXPORT_TABLES[table_name].c if c.name not in _DERIVED_COLUMNS]
+
+
+async def stream_rows(
+    db: AsyncSession,
+    table_name: str,
+    since: Optional[datetime] = None,
+    batch_size: int = EXPORT_BATCH_SIZE,
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Yield batches of row mappings from a server-side cursor so memory stays flat
+    Raises ValueError if since is given for a table without an update timestamp
+    """
+    if since is not None and not supports_since(table_name):
+        raise ValueError(f"'since' is not supported for {table_name}")
+
+    columns = export_columns(table_name)
+    table = EXPORT_TABLES[table_name]
+    query = select(*columns)
+
+    timestamp = _TIMESTAMP_COLUMNS.get(table_name)
+    if timestamp is not None:
+        if since is not None:
+            query = query.where(table.c[timestamp] >= since)
+        query = query.order_by(table.c[timestamp], table.c.id)
+    else:
+        query = query.order_by(table.c.id)
+
+    result = await db.stream(query.execution_options(yield_per=batch_size))
+    async for partition in result.mappings().partitions():
+        yield partition
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    return value
+
+
+async def ndjson_chunks(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Encode each batch as newline-delimited JSON
+    """
+    async for batch in batches:
+        yield "".join(
+            json.dumps({key: _plain(value) for key, value in row.items()}, separators=(",", ":")) + "\n"
+            for row in batch
+        ).encode()
+
+
+async def csv_chunks(columns: List, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Encode each batch as CSV rows after a single header line; arrays are joined with '|', NULL items as ''
+    """
+    names = [c.name for c in columns]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+
+    async for batch in batches:
+        for row in batch:
+            writer.writerow([
+                "|".join("" if item is None else str(item) for item in row[name])
+                if isinstance(row[name], list) else _plain(row[name])
+                for name in names
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only file object that hands written bytes back to the caller in chunks
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _arrow_schema(columns: List):
+    import pyarrow as pa
+
+    fields = []
+    for column in columns:
+        if isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, BigInteger):
+            # BigInteger subclasses Integer, so it has to be matched first (change_seq)
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int32()
+        elif isinstance(column.type, Numeric):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC")
+        elif isinstance(column.type, Time):
+            arrow_type = pa.time64("us")
+        elif isinstance(column.type, ARRAY):
+            arrow_type = pa.list_(pa.string())
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+async def parquet_chunks(columns: List, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Encode each batch as a Parquet row group; requires the optional 'pyarrow' package
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ValueError("Parquet export requires the 'pyarrow' package")
+
+    schema = _arrow_schema(columns)
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        async for batch in batches:
+            arrays = {}
+            for field in schema:
+                values = [row[field.name] for row in batch]
+                if pa.types.is_string(field.type):
+                    values = [str(v) if v is not None else None for v in values]
+                elif pa.types.is_floating(field.type):
+                    values = [float(v) if v is not None else None for v in values]
+                arrays[field.name] = values
+            writer.write_table(pa.Table.from_pydict(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+
+    yield sink.drain()
+
+
+def encode_rows(format: str, columns: List, batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """
+    Pick the chunk encoder for an export format
+    """
+    if format == "ndjson":
+        return ndjson_chunks(batches)
+    if format == "csv":
+        return csv_chunks(columns, batches)
+    if format == "parquet":
+        return parquet_chunks(columns, batches)
+    raise ValueError(f"Unknown export format: {format}")
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import ShelterStatus, StatusChange
+from app.services.hours import minute_of_week
+
+logger = logging.getLogger(__name__)
+
+# Days of status_changes each fit reads; at least a week so every hour of the week is seen
+FORECAST_HISTORY_DAYS = max(int(os.getenv("FORECAST_HISTORY_DAYS", "56")), 7)
+# Older weeks count for less: an hour this many days back has half the weight of the latest one
+FORECAST_HALF_LIFE_DAYS = float(os.getenv("FORECAST_HALF_LIFE_DAYS", "14"))
+FORECAST_RETRAIN_SECONDS = int(os.getenv("FORECAST_RETRAIN_SECONDS", "3600"))
+# Status change rows fetched per round trip while streaming the history window
+FORECAST_FETCH_ROWS = 10_000
+
+HOURS_PER_WEEK = 7 * 24
+
+# Series fitted per block; bounds the (series x hours) matrix to a few MB
+FIT_BLOCK_SIZE = 512
+
+SeriesKey = Tuple[UUID, str]
+
+
+def hourly_grid(start: datetime, end: datetime, half_life_days: float = FORECAST_HALF_LIFE_DAYS):
+    """
+    Hourly sample points from start to end as (seconds since start, hour-of-week bucket, recency weight)
+    Buckets are local time, so a 9pm forecast means 9pm on the wall clock across DST changes
+    """
+    hours = int((end - start).total_seconds() // 3600)
+    offsets = np.arange(hours, dtype=np.int64) * 3600
+    buckets = np.fromiter(
+        (minute_of_week(start + timedelta(hours=h)) // 60 for h in range(hours)),
+        dtype=np.int64,
+        count=hours,
+    )
+    age_days = (hours - 1 - np.arange(hours)) / 24
+    weights = np.power(0.5, age_days / half_life_days)
+    return offsets, buckets, weights
+
+
+def fit_profiles(
+    series: np.ndarray,
+    offsets: np.ndarray,
+    values: np.ndarray,
+    n_series: int,
+    grid: np.ndarray,
+    buckets: np.ndarray,
+    weights: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Fit a 168-bucket weekly profile per series from step-wise observations
+    Observations are (series index, seconds since window start, beds available); every series needs one at 0
+    Each grid hour takes the last observed value, so a count holds until the next update
+    Returns (expected beds, probability of at least one bed), both (n_series, 168) float32
+    """
+    order = np.lexsort((offsets, series))
+    series, offsets, values = series[order], offsets[order], values[order].astype(np.float32)
+
+    # Weighted one-hot of grid hour -> bucket; profile = samples @ design / total weight per bucket
+    design = np.zeros((len(grid), HOURS_PER_WEEK), dtype=np.float32)
+    design[np.arange(len(grid)), buckets] = weights
+    totals = design.sum(axis=0)
+    # A short window can miss a bucket entirely (the skipped hour at a DST change); it scores 0
+    design /= np.where(totals > 0, totals, 1)
+
+    # One sorted key per observation so a single searchsorted finds each series' value at every grid hour
+    span = np.int64(max(int(grid[-1]), int(offsets.max())) + 1)
+    keys = series.astype(np.int64) * span + offsets
+
+    expected = np.empty((n_series, HOURS_PER_WEEK), dtype=np.float32)
+    p_bed = np.empty((n_series, HOURS_PER_WEEK), dtype=np.float32)
+    for first in range(0, n_series, FIT_BLOCK_SIZE):
+        block = np.arange(first, min(first + FIT_BLOCK_SIZE, n_series), dtype=np.int64)
+        query = (block[:, None] * span + grid[None, :]).ravel()
+        samples = values[np.searchsorted(keys, query, side="right") - 1].reshape(len(block), len(grid))
+        expected[block] = samples @ design
+        p_bed[block] = (samples > 0).astype(np.float32) @ design
+
+    return expected, p_bed
+
+
+class Forecaster:
+    """
+    Per-shelter, per-category weekly availability profiles held in memory
+    Scoring a time is a column slice, so the whole county costs one array lookup
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.version = 0
+        self.trained_at: Optional[datetime] = None
+        self.keys: List[SeriesKey] = []
+        self.expected = np.zeros((0, HOURS_PER_WEEK), dtype=np.float32)
+        self.p_bed = np.zeros((0, HOURS_PER_WEEK), dtype=np.float32)
+        self._rows: Dict[UUID, List[Tuple[str, int]]] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, shelter_id: UUID) -> bool:
+        return shelter_id in self._rows
+
+    def load(self, keys: List[SeriesKey], expected: np.ndarray, p_bed: np.ndarray, trained_at: datetime) -> None:
+        """
+        Swap in a freshly fitted model
+        """
+        rows: Dict[UUID, List[Tuple[str, int]]] = {}
+        for row, (shelter_id, category) in enumerate(keys):
+            rows.setdefault(shelter_id, []).append((category, row))
+
+        self.keys, self.expected, self.p_bed, self._rows = keys, expected, p_bed, rows
+        self.trained_at = trained_at
+        self.version += 1
+        self.ready = True
+
+    def score(self, moment: Optional[datetime] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Expected beds and probability of a bed for every series at one time (now by default)
+        """
+        bucket = minute_of_week(moment) // 60
+        return self.expected[:, bucket], self.p_bed[:, bucket]
+
+    def for_shelters(
+        self, shelter_ids: Iterable[UUID], moment: Optional[datetime] = None
+    ) -> Dict[UUID, Dict[str, Dict[str, float]]]:
+        """
+        {shelter_id: {category: {beds_expected, p_available}}} at one time for the given shelters
+        """
+        expected, p_bed = self.score(moment)
+        expected, p_bed = np.round(expected, 1).tolist(), np.round(p_bed, 2).tolist()
+        return {
+            shelter_id: {
+                category: {"beds_expected": expected[row], "p_available": p_bed[row]}
+                for category, row in self._rows.get(shelter_id, ())
+            }
+            for shelter_id in shelter_ids
+        }
+
+    def hourly(self, shelter_id: UUID, start: datetime, hours: int) -> Dict[str, List[Dict[str, object]]]:
+        """
+        Hour-by-hour forecast per category for one shelter, starting at start
+        """
+        times = [start + timedelta(hours=h) for h in range(hours)]
+        buckets = [minute_of_week(moment) // 60 for moment in times]
+
+        forecast = {}
+        for category, row in self._rows.get(shelter_id, ()):
+            expected = np.round(self.expected[row, buckets], 1).tolist()
+            p_bed = np.round(self.p_bed[row, buckets], 2).tolist()
+            forecast[category] = [
+                {"at": moment, "beds_expected": e, "p_available": p}
+                for moment, e, p in zip(times, expected, p_bed)
+            ]
+        return forecast
+
+
+forecaster = Forecaster()
+
+
+async def train_forecaster(
+    db: AsyncSession,
+    history_days: int = FORECAST_HISTORY_DAYS,
+    half_life_days: float = FORECAST_HALF_LIFE_DAYS,
+) -> None:
+    """
+    Fit every shelter/category series from the recent status_changes partitions in one batch
+    Series without changes in the window forecast their current count
+    """
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = now - timedelta(days=history_days)
+
+    result = await db.execute(select(ShelterStatus.shelter_id, ShelterStatus.category, ShelterStatus.beds_available))
+    statuses = result.all()
+    keys: List[SeriesKey] = [(row.shelter_id, row.category) for row in statuses]
+    index = {key: i for i, key in enumerate(keys)}
+    if not keys:
+        forecaster.load(keys, forecaster.expected[:0], forecaster.p_bed[:0], now)
+        return
+
+    # Streamed as columns a partition at a time; offsets come back as seconds so rows never build datetimes
+    offset = cast(func.floor(func.extract("epoch", StatusChange.changed_at - start)), BigInteger)
+    result = await db.stream(
+        select(StatusChange.shelter_id, StatusChange.category, offset, StatusChange.prev_available, StatusChange.new_available)
+        .where(StatusChange.changed_at >= start, StatusChange.changed_at < now)
+        .order_by(StatusChange.changed_at)
+        .execution_options(yield_per=FORECAST_FETCH_ROWS)
+    )
+    chunks = []
+    async for rows in result.partitions():
+        count = len(rows)
+        chunks.append((
+            np.fromiter((index.get((row[0], row[1]), -1) for row in rows), dtype=np.int64, count=count),
+            np.fromiter((row[2] for row in rows), dtype=np.int64, count=count),
+            np.fromiter((row[3] for row in rows), dtype=np.int64, count=count),
+            np.fromiter((row[4] for row in rows), dtype=np.int64, count=count),
+        ))
+
+    n = len(keys)
+    current = np.fromiter((row.beds_available for row in statuses), dtype=np.int64, count=n)
+    grid, buckets, weights = hourly_grid(start, now, half_life_days)
+    series, offsets, values = await asyncio.to_thread(_series_arrays, chunks, current)
+    expected, p_bed = await asyncio.to_thread(fit_profiles, series, offsets, values, n, grid, buckets, weights)
+    forecaster.load(keys, expected, p_bed, now)
+    logger.info("Fitted forecasts for %d series from %d status changes", n, len(series) - n)
+
+
+def _series_arrays(chunks: List[Tuple[np.ndarray, ...]], current: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Anchor each series at the window start, then append its changes, for fit_profiles
+    The anchor is the first change's previous count, or today's count if nothing changed
+    """
+    n = len(current)
+    if chunks:
+        series, offsets, prev, new = (np.concatenate(column) for column in zip(*chunks))
+    else:
+        series = offsets = prev = new = np.zeros(0, dtype=np.int64)
+
+    # Changes for statuses deleted since are dropped
+    known = series >= 0
+    series, offsets, prev, new = series[known], offsets[known], prev[known], new[known]
+
+    anchors = current.copy()
+    changed, first = np.unique(series, return_index=True)
+    anchors[changed] = prev[first]
+
+    return (
+        np.concatenate([np.arange(n, dtype=np.int64), series]),
+        np.concatenate([np.zeros(n, dtype=np.int64), offsets]),
+        np.concatenate([anchors, new]),
+    )
+
+
+async def ensure_forecaster(db: AsyncSession) -> None:
+    """
+    Train on first use; concurrent callers wait for the one fit
+    """
+    if forecaster.ready:
+        return
+    async with forecaster._lock:
+        if not forecaster.ready:
+            await train_forecaster(db)
+
+
+async def run_forecast_trainer(
+    session_factory: async_sessionmaker,
+    interval: int = FORECAST_RETRAIN_SECONDS,
+) -> None:
+    """
+    Background task: refit the forecasts from the latest history, then sleep
+    """
+    while True:
+        try:
+            async with session_factory() as session:
+                async with forecaster._lock:
+                    await train_forecaster(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Forecast training failed: {e}")
+
+        await asyncio.sleep(interval)
@@ -1,12 +1,59 @@
 import math
-from decimal import Decimal
-from typing import Tuple
+import os
+from decimal import Decimal, InvalidOperation
+from typing import Sequence, Tuple
+
+import numpy as np
+from geoalchemy2 import Geography
+from sqlalchemy import cast, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.neighborhoods import resolve_neighborhood
+
+# Set USE_POSTGIS=false to force the pure-Python distance path
+USE_POSTGIS = os.getenv("USE_POSTGIS", "true").lower() == "true"
+
+
+# Earth's radius in kilometers
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_distances(lat: float, lon: float, coords: np.ndarray) -> np.ndarray:
+    """
+    Calculate distances from one origin to many points in a single NumPy pass
+    coords is an (n, 2) array of lat, lon in degrees; returns kilometers
+    """
+    coords = np.ascontiguousarray(coords, dtype=np.float64).reshape(-1, 2)
+    
+    # Convert to radians
+    lat1_rad = math.radians(float(lat))
+    lon1_rad = math.radians(float(lon))
+    lat2_rad = np.radians(coords[:, 0])
+    lon2_rad = np.radians(coords[:, 1])
+    
+    # Haversine formula
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+    a = (np.sin(dlat / 2) ** 2 +
+         math.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2)
+    c = 2 * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+    
+    return c * EARTH_RADIUS_KM
+
+
+def coordinate_array(items: Sequence) -> np.ndarray:
+    """
+    Pack the lat/lon values of row mappings into a contiguous (n, 2) float64 array
+    """
+    return np.array(
+        [(item["lat"], item["lon"]) for item in items], dtype=np.float64
+    ).reshape(-1, 2)
 
 
 def calculate_distance(lat1: Decimal, lon1: Decimal, lat2: Decimal, lon2: Decimal) -> float:
     """
     Calculate distance between two points using Haversine formula
-    Returns distance in kilometers
+    Returns distance in kilometers; plain math, since NumPy's per-call overhead dwarfs one pair
     """
     # Convert to radians
     lat1_rad = math.radians(float(lat1))
@@ -19,58 +66,54 @@ def calculate_distance(lat1: Decimal, lon1: Decimal, lat2: Decimal, lon2: Decima
     dlon = lon2_rad - lon1_rad
     a = (math.sin(dlat/2)**2 + 
          math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon/2)**2)
-    c = 2 * math.asin(math.sqrt(a))
+    c = 2 * math.asin(math.sqrt(min(a, 1.0)))
     
-    # Earth's radius in kilometers
-    r = 6371
-    
-    return c * r
+    return c * EARTH_RADIUS_KM
 
 
-def get_neighborhood(lat: Decimal, lon: Decimal) -> str:
+def parse_coordinates(near: str) -> Tuple[Decimal, Decimal]:
     """
-    Determine LA neighborhood based on coordinates
-    This is a simplified version - in production you'd use a proper geocoding service
+    Parse a 'lat,lon' query string into coordinates
+    Raises ValueError if the string is malformed or out of range
     """
-    lat_f = float(lat)
-    lon_f = float(lon)
-    
-    # Simplified LA neighborhood boundaries
-    # In production, use proper GIS data or geocoding service
-    
-    # Downtown LA / Skid Row
-    if (34.04 <= lat_f <= 34.06 and -118.26 <= lon_f <= -118.24):
-        return "Skid Row"
-    
-    # Koreatown
-    if (34.05 <= lat_f <= 34.08 and -118.32 <= lon_f <= -118.28):
-        return "Koreatown"
-    
-    # Hollywood
-    if (34.08 <= lat_f <= 34.12 and -118.36 <= lon_f <= -118.32):
-        return "Hollywood"
-    
-    # Venice
-    if (33.98 <= lat_f <= 34.02 and -118.48 <= lon_f <= -118.44):
-        return "Venice"
+    lat_str, lon_str = near.split(',')
+    try:
+        lat, lon = Decimal(lat_str.strip()), Decimal(lon_str.strip())
+    except InvalidOperation:
+        raise ValueError(f"Invalid coordinates: {near}")
     
-    # South LA
-    if (33.95 <= lat_f <= 34.05 and -118.32 <= lon_f <= -118.24):
-        return "South LA"
+    if not (lat.is_finite() and lon.is_finite()):
+        raise ValueError(f"Invalid coordinates: {near}")
     
-    # San Fernando Valley
-    if (34.15 <= lat_f <= 34.25 and -118.50 <= lon_f <= -118.35):
-        return "San Fernando Valley"
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError("Coordinates out of range")
     
-    # San Pedro / Harbor
-    if (33.70 <= lat_f <= 33.80 and -118.32 <= lon_f <= -118.28):
-        return "San Pedro/Harbor"
-    
-    # Westlake / MacArthur Park
-    if (34.06 <= lat_f <= 34.08 and -118.28 <= lon_f <= -118.26):
-        return "Westlake/MacArthur Park"
+    return lat, lon
+
+
+def postgis_enabled(db: AsyncSession) -> bool:
+    """
+    Check whether spatial queries can be pushed down to PostGIS
+    """
+    if not USE_POSTGIS or db.bind is None:
+        return False
     
-    return "Other"
+    return db.bind.dialect.name == "postgresql"
+
+
+def geography_point(lat: Decimal, lon: Decimal):
+    """
+    Build a PostGIS geography point expression (note PostGIS takes lon, lat)
+    """
+    return cast(func.ST_SetSRID(func.ST_MakePoint(float(lon), float(lat)), 4326), Geography)
+
+
+def get_neighborhood(lat: Decimal, lon: Decimal) -> str:
+    """
+    Determine LA neighborhood based on coordinates
+    Point-in-polygon lookup against the NEIGHBORHOODS_GEOJSON boundaries; "Other" if outside all
+    """
+    return resolve_neighborhood(lat, lon)
 
 
 def is_within_radius(lat1: Decimal, lon1: Decimal, lat2: Decimal, lon2: Decimal, radius_km: float) -> bool:
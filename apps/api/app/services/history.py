@@ -0,0 +1,360 @@
+import asyncio
+import gzip
+import logging
+import os
+import re
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import StatusChange, StatusRollupDaily, StatusRollupHourly
+from app.services.hours import LOCAL_TIMEZONE
+
+logger = logging.getLogger(__name__)
+
+# Months of raw status_changes kept online; older partitions are archived (optionally) and dropped
+HISTORY_RETENTION_MONTHS = int(os.getenv("HISTORY_RETENTION_MONTHS", "13"))
+# Future monthly partitions kept ready; there is no default partition, so an insert past the last one fails
+HISTORY_PARTITIONS_AHEAD = int(os.getenv("HISTORY_PARTITIONS_AHEAD", "3"))
+# Where dropped partitions are written as gzipped CSV; empty drops them without a copy
+HISTORY_ARCHIVE_DIR = os.getenv("HISTORY_ARCHIVE_DIR", "")
+HISTORY_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("HISTORY_MAINTENANCE_INTERVAL_SECONDS", "600"))
+# Hours of rollups recomputed on every pass, so history committed late still gets counted
+HISTORY_ROLLUP_LOOKBACK_HOURS = int(os.getenv("HISTORY_ROLLUP_LOOKBACK_HOURS", "48"))
+
+# Advisory lock so only one worker runs maintenance at a time
+HISTORY_LOCK_KEY = 0x53484953
+
+# Hourly rollups are recomputed in windows of this size to bound each statement
+ROLLUP_WINDOW = timedelta(days=1)
+
+PARENT_TABLE = StatusChange.__tablename__
+_PARTITION_RE = re.compile(rf"^{PARENT_TABLE}_y(\d{{4}})m(\d{{2}})$")
+
+_HOURLY_ROLLUP_SQL = text(f"""
+    INSERT INTO {StatusRollupHourly.__tablename__} (
+        bucket, shelter_id, category, samples, min_available, max_available, sum_available, last_available
+    )
+    SELECT
+        date_trunc('hour', changed_at),
+        shelter_id,
+        category,
+        count(*),
+        min(new_available),
+        max(new_available),
+        sum(new_available),
+        (array_agg(new_available ORDER BY changed_at DESC))[1]
+    FROM {PARENT_TABLE}
+    WHERE changed_at >= :start AND changed_at < :end
+    GROUP BY 1, 2, 3
+    ON CONFLICT (bucket, shelter_id, category) DO UPDATE SET
+        samples = EXCLUDED.samples,
+        min_available = EXCLUDED.min_available,
+        max_available = EXCLUDED.max_available,
+        sum_available = EXCLUDED.sum_available,
+        last_available = EXCLUDED.last_available
+""")
+
+_DAILY_ROLLUP_SQL = text(f"""
+    INSERT INTO {StatusRollupDaily.__tablename__} (
+        day, shelter_id, category, samples, min_available, max_available, sum_available, last_available
+    )
+    SELECT
+        (bucket AT TIME ZONE :tz)::date,
+        shelter_id,
+        category,
+        sum(samples),
+        min(min_available),
+        max(max_available),
+        sum(sum_available),
+        (array_agg(last_available ORDER BY bucket DESC))[1]
+    FROM {StatusRollupHourly.__tablename__}
+    WHERE bucket >= :start AND bucket < :end
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, shelter_id, category) DO UPDATE SET
+        samples = EXCLUDED.samples,
+        min_available = EXCLUDED.min_available,
+        max_available = EXCLUDED.max_available,
+        sum_available = EXCLUDED.sum_available,
+        last_available = EXCLUDED.last_available
+""")
+
+
+def month_start(moment: date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year}m{month.month:02d}"
+
+
+def partition_ddl(month: date) -> str:
+    """
+    CREATE TABLE for one monthly partition; bounds are UTC month starts
+    """
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+async def ensure_partitions(db, start: Optional[date] = None, months_ahead: int = HISTORY_PARTITIONS_AHEAD) -> List[str]:
+    """
+    Create monthly partitions from start (default: this month) through months_ahead
+    Accepts a session or a connection so the bulk loader can prepare partitions in its transaction
+    There is no default partition (it would rule out DETACH ... CONCURRENTLY), so rows need their month here
+    """
+    today = datetime.now(timezone.utc).date()
+    month = month_start(start or today)
+    last = add_months(month_start(today), months_ahead)
+
+    names = []
+    while month <= last:
+        if not await db.scalar(select(func.to_regclass(partition_name(month)))):
+            await db.execute(text(partition_ddl(month)))
+        names.append(partition_name(month))
+        month = add_months(month, 1)
+    return names
+
+
+async def list_partitions(db: AsyncSession) -> List[Tuple[str, date]]:
+    """
+    (name, month) for every monthly partition, oldest first
+    """
+    result = await db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        WHERE parent.relname = :parent
+    """), {"parent": PARENT_TABLE})
+
+    partitions = []
+    for (name,) in result.all():
+        match = _PARTITION_RE.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda p: p[1])
+
+
+def _local_midnight(moment: datetime) -> datetime:
+    local = moment.astimezone(LOCAL_TIMEZONE)
+    return datetime.combine(local.date(), time(0), tzinfo=LOCAL_TIMEZONE)
+
+
+async def refresh_rollups(
+    db: AsyncSession,
+    now: Optional[datetime] = None,
+    since: Optional[datetime] = None,
+    lookback_hours: int = HISTORY_ROLLUP_LOOKBACK_HOURS,
+) -> Dict[str, int]:
+    """
+    Bring hourly and daily rollups up to date
+    Recomputes from the newest hourly bucket or the lookback window, whichever starts earlier, so rows
+    committed after their hour was rolled up are counted; pass since to redo older history, e.g. after a bulk load
+    """
+    now = now or datetime.now(timezone.utc)
+    end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+
+    start = since
+    if start is None:
+        newest = await db.scalar(select(func.max(StatusRollupHourly.bucket)))
+        if newest is None:
+            start = await db.scalar(select(func.min(StatusChange.changed_at)))
+            if start is None:
+                return {"hourly": 0, "daily": 0}
+        else:
+            start = min(newest, end - timedelta(hours=lookback_hours))
+    start = start.replace(minute=0, second=0, microsecond=0)
+
+    hourly = 0
+    window_start = start
+    while window_start < end:
+        window_end = min(window_start + ROLLUP_WINDOW, end)
+        result = await db.execute(_HOURLY_ROLLUP_SQL, {"start": window_start, "end": window_end})
+        hourly += result.rowcount
+        window_start = window_end
+
+    # Re-aggregate every local day touched by the refreshed hours
+    result = await db.execute(
+        _DAILY_ROLLUP_SQL,
+        {"start": _local_midnight(start), "end": end, "tz": LOCAL_TIMEZONE.key},
+    )
+    return {"hourly": hourly, "daily": result.rowcount}
+
+
+async def availability_report(
+    db: AsyncSession,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    shelter_ids: Optional[List[UUID]] = None,
+    category: Optional[str] = None,
+) -> List[Dict[str, object]]:
+    """
+    Min/max/avg availability per shelter and category from the hourly or daily rollups
+    """
+    model = StatusRollupHourly if granularity == "hour" else StatusRollupDaily
+    period = model.bucket if granularity == "hour" else model.day
+    if granularity == "day":
+        start, end = start.astimezone(LOCAL_TIMEZONE).date(), end.astimezone(LOCAL_TIMEZONE).date()
+
+    query = (
+        select(
+            period.label("period"),
+            model.shelter_id,
+            model.category,
+            model.samples,
+            model.min_available,
+            model.max_available,
+            model.avg_available,
+            model.last_available,
+        )
+        .where(period >= start, period < end)
+        .order_by(model.shelter_id, model.category, period)
+    )
+    if shelter_ids is not None:
+        query = query.where(model.shelter_id.in_(shelter_ids))
+    if category:
+        query = query.where(model.category == category)
+
+    result = await db.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+
+async def _archive_partition(db: AsyncSession, name: str, archive_dir: str) -> str:
+    """
+    Stream a partition to <archive_dir>/<name>.csv.gz with COPY TO
+    Compression and file writes run in a worker thread so the event loop keeps serving
+    """
+    await asyncio.to_thread(os.makedirs, archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    connection = await db.connection()
+    raw = await connection.get_raw_connection()
+
+    # Only a complete archive takes the final name, since the partition is dropped right after
+    tmp = f"{path}.tmp"
+    out = await asyncio.to_thread(gzip.open, tmp, "wb")
+    try:
+        async def write(chunk: bytes) -> None:
+            await asyncio.to_thread(out.write, chunk)
+
+        await raw.driver_connection.copy_from_table(name, output=write, format="csv", header=True)
+    finally:
+        await asyncio.to_thread(out.close)
+    await asyncio.to_thread(os.replace, tmp, path)
+    return path
+
+
+async def _detach_partition(db: AsyncSession, name: str) -> None:
+    """
+    Detach and drop a partition on an autocommit connection, since DETACH ... CONCURRENTLY can't run
+    in a transaction block; writers and readers of the parent keep going while it waits them out
+    """
+    async with db.bind.connect() as connection:
+        connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+        # An interrupted concurrent detach leaves the partition pending; FINALIZE completes it
+        pending = await connection.scalar(
+            text("SELECT inhdetachpending FROM pg_inherits WHERE inhrelid = to_regclass(:name)"),
+            {"name": name},
+        )
+        mode = "FINALIZE" if pending else "CONCURRENTLY"
+        await connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name} {mode}"))
+        await connection.execute(text(f"DROP TABLE {name}"))
+
+
+async def retire_partitions(
+    db: AsyncSession,
+    retention_months: int = HISTORY_RETENTION_MONTHS,
+    archive_dir: str = HISTORY_ARCHIVE_DIR,
+    now: Optional[datetime] = None,
+) -> List[str]:
+    """
+    Archive and drop partitions older than the retention window, one partition at a time
+    A partition is only dropped once the hourly rollups cover all of it, and only after its archive is written
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = add_months(month_start(now.date()), -retention_months)
+    rolled_up_to = await db.scalar(select(func.max(StatusRollupHourly.bucket)))
+    partitions = await list_partitions(db)
+    await db.commit()
+
+    retired = []
+    for name, month in partitions:
+        month_end = datetime.combine(add_months(month, 1), time(0), tzinfo=timezone.utc)
+        if month >= cutoff:
+            break
+        if rolled_up_to is None or rolled_up_to < month_end:
+            logger.warning(f"Keeping {name}: rollups don't cover it yet")
+            break
+
+        if archive_dir:
+            # A read-only transaction of its own; COPY only needs the partition's ACCESS SHARE lock
+            path = await _archive_partition(db, name, archive_dir)
+            await db.commit()
+            logger.info("Archived %s to %s", name, path)
+
+        await _detach_partition(db, name)
+        retired.append(name)
+    return retired
+
+
+async def maintain_history(
+    db: AsyncSession,
+    months_ahead: int = HISTORY_PARTITIONS_AHEAD,
+    retention_months: int = HISTORY_RETENTION_MONTHS,
+    archive_dir: str = HISTORY_ARCHIVE_DIR,
+    rollup_since: Optional[datetime] = None,
+) -> Dict[str, object]:
+    """
+    One maintenance pass: upcoming partitions, rollups, then retention, each committed on its own
+    so no step holds locks on status_changes while the next runs
+    Skipped when another worker holds the maintenance lock, which lives on a separate connection across the steps
+    """
+    async with db.bind.connect() as lock:
+        lock = await lock.execution_options(isolation_level="AUTOCOMMIT")
+        if not await lock.scalar(select(func.pg_try_advisory_lock(HISTORY_LOCK_KEY))):
+            return {"skipped": True}
+
+        try:
+            partitions = await ensure_partitions(db, months_ahead=months_ahead)
+            await db.commit()
+
+            rollups = await refresh_rollups(db, since=rollup_since)
+            await db.commit()
+
+            retired = await retire_partitions(db, retention_months, archive_dir)
+        except BaseException:
+            await db.rollback()
+            raise
+        finally:
+            await lock.scalar(select(func.pg_advisory_unlock(HISTORY_LOCK_KEY)))
+
+    return {"partitions": partitions, "rollups": rollups, "retired": retired}
+
+
+async def run_history_maintenance(
+    session_factory: async_sessionmaker,
+    interval: int = HISTORY_MAINTENANCE_INTERVAL_SECONDS,
+) -> None:
+    """
+    Background task: keep partitions and rollups current, then sleep
+    """
+    while True:
+        try:
+            async with session_factory() as session:
+                await maintain_history(session)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"History maintenance failed: {e}")
+
+        await asyncio.sleep(interval)
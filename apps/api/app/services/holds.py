@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, func, insert, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models import Hold, ShelterStatus, Staff, StatusChange
+from app.services.cache import response_cache
+from app.services.events import event_bus, status_event
+from app.services.snapshot import refresh_availability
+
+logger = logging.getLogger(__name__)
+
+HOLD_SWEEP_INTERVAL_SECONDS = int(os.getenv("HOLD_SWEEP_INTERVAL_SECONDS", "30"))
+HOLD_SWEEP_BATCH_SIZE = int(os.getenv("HOLD_SWEEP_BATCH_SIZE", "500"))
+
+
+class InsufficientBedsError(Exception):
+    """
+    Raised when a hold asks for more beds than are currently available
+    """
+
+
+def _status_after(beds_available, beds_total):
+    """
+    SQL mirror of get_status_from_availability; UNKNOWN is left for staff to resolve
+    """
+    return case(
+        (ShelterStatus.status == "UNKNOWN", ShelterStatus.status),
+        (beds_available <= 0, "FULL"),
+        (beds_available <= beds_total * 0.25, "LIMITED"),
+        else_="OPEN",
+    )
+
+
+async def create_hold(
+    db: AsyncSession,
+    staff: Staff,
+    shelter_id: UUID,
+    category: str,
+    qty: int,
+    minutes: int,
+) -> Hold:
+    """
+    Reserve beds with a conditional decrement so concurrent holds can never oversell
+    Raises PermissionError if staff can't edit the shelter, InsufficientBedsError if beds ran out
+    """
+    if not (staff.role == "ADMIN" or staff.shelter_id == shelter_id):
+        raise PermissionError("Not allowed to place holds at this shelter")
+
+    new_available = ShelterStatus.beds_available - qty
+    result = await db.execute(
+        update(ShelterStatus)
+        .where(
+            ShelterStatus.shelter_id == shelter_id,
+            ShelterStatus.category == category,
+            ShelterStatus.beds_available >= qty,
+        )
+        .values(
+            beds_available=new_available,
+            status=_status_after(new_available, ShelterStatus.beds_total),
+            # Held beds are not a fresh count, so skip the onupdate bump and keep staleness honest
+            last_updated=ShelterStatus.last_updated,
+        )
+        .returning(ShelterStatus.beds_available)
+        .execution_options(synchronize_session=False)
+    )
+    remaining = result.scalar_one_or_none()
+
+    if remaining is None:
+        await db.rollback()
+        raise InsufficientBedsError(f"Fewer than {qty} {category} beds available")
+
+    hold = Hold(
+        shelter_id=shelter_id,
+        category=category,
+        qty=qty,
+        created_by=staff.id,
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=minutes),
+        status="ACTIVE",
+    )
+    db.add(hold)
+    db.add(StatusChange(
+        shelter_id=shelter_id,
+        category=category,
+        prev_available=remaining + qty,
+        new_available=remaining,
+        changed_by=staff.id,
+    ))
+
+    # The flush hooks refresh the snapshot, invalidate the cache and publish the change
+    await db.commit()
+    return hold
+
+
+async def _return_beds(
+    db: AsyncSession,
+    released: List[Tuple[UUID, str, int, UUID]],
+) -> None:
+    """
+    Give beds from released holds back to their statuses (capped at beds_total) and audit it
+    released holds are (shelter_id, category, qty, changed_by) tuples
+    """
+    returned: Dict[Tuple[UUID, str], int] = defaultdict(int)
+    actor: Dict[Tuple[UUID, str], UUID] = {}
+    for shelter_id, category, qty, changed_by in released:
+        returned[(shelter_id, category)] += qty
+        actor[(shelter_id, category)] = changed_by
+
+    result = await db.execute(
+        select(ShelterStatus.shelter_id, ShelterStatus.category, ShelterStatus.beds_available)
+        .where(tuple_(ShelterStatus.shelter_id, ShelterStatus.category).in_(returned))
+        .with_for_update()
+    )
+    previous = {(row.shelter_id, row.category): row.beds_available for row in result.all()}
+
+    changes = []
+    written = []
+    for key, qty in returned.items():
+        if key not in previous:
+            continue
+
+        new_available = func.least(ShelterStatus.beds_total, ShelterStatus.beds_available + qty)
+        result = await db.execute(
+            update(ShelterStatus)
+            .where(ShelterStatus.shelter_id == key[0], ShelterStatus.category == key[1])
+            .values(
+                beds_available=new_available,
+                status=_status_after(new_available, ShelterStatus.beds_total),
+                last_updated=ShelterStatus.last_updated,
+            )
+            .returning(*ShelterStatus.__table__.c)
+            .execution_options(synchronize_session=False)
+        )
+        row = result.mappings().one()
+        written.append((row, previous[key]))
+        changes.append({
+            "shelter_id": key[0],
+            "category": key[1],
+            "prev_available": previous[key],
+            "new_available": row["beds_available"],
+            "changed_by": actor[key],
+        })
+
+    if changes:
+        await db.execute(insert(StatusChange), changes)
+
+    await refresh_availability(db, {shelter_id for shelter_id, _ in returned})
+    await db.commit()
+
+    await response_cache.invalidate()
+    for row, prev_available in written:
+        event_bus.publish(status_event(ShelterStatus(**row), prev_available=prev_available))
+
+
+async def cancel_hold(db: AsyncSession, staff: Staff, hold_id: UUID) -> Hold:
+    """
+    Cancel an active hold and return its beds
+    Raises LookupError if missing, PermissionError if not allowed, ValueError if not active
+    """
+    result = await db.execute(select(Hold).where(Hold.id == hold_id).with_for_update())
+    hold = result.scalar_one_or_none()
+
+    if hold is None:
+        raise LookupError("Hold not found")
+
+    if not (staff.role == "ADMIN" or staff.id == hold.created_by or staff.shelter_id == hold.shelter_id):
+        raise PermissionError("Not allowed to cancel this hold")
+
+    if hold.status != "ACTIVE":
+        raise ValueError(f"Hold is already {hold.status.lower()}")
+
+    hold.status = "CANCELLED"
+    await db.flush()
+    await _return_beds(db, [(hold.shelter_id, hold.category, hold.qty, staff.id)])
+    return hold
+
+
+async def expire_holds(db: AsyncSession, batch_size: int = HOLD_SWEEP_BATCH_SIZE) -> int:
+    """
+    Expire one batch of overdue holds and return their beds; returns the number expired
+    SKIP LOCKED lets several workers sweep concurrently without double-returning beds
+    """
+    due = (
+        select(Hold.id)
+        .where(Hold.status == "ACTIVE", Hold.expires_at <= func.now())
+        .order_by(Hold.expires_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        update(Hold)
+        .where(Hold.id.in_(due))
+        .values(status="EXPIRED")
+        .returning(Hold.shelter_id, Hold.category, Hold.qty, Hold.created_by)
+        .execution_options(synchronize_session=False)
+    )
+    released = [tuple(row) for row in result.all()]
+
+    if not released:
+        await db.commit()
+        return 0
+
+    await _return_beds(db, released)
+    return len(released)
+
+
+async def run_hold_sweeper(
+    session_factory: async_sessionmaker,
+    interval: int = HOLD_SWEEP_INTERVAL_SECONDS,
+    batch_size: int = HOLD_SWEEP_BATCH_SIZE,
+) -> None:
+    """
+    Background task: expire holds in batches until caught up, then sleep
+    """
+    while True:
+        try:
+            async with session_factory() as session:
+                while await expire_holds(session, batch_size) == batch_size:
+                    pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Hold sweep failed: {e}")
+
+        await asyncio.sleep(interval)
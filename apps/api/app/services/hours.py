@@ -0,0 +1,272 @@
+import os
+import re
+from datetime import datetime, time
+from typing import List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+# Schedules are weekly [start, end) minute intervals; minute 0 is Monday 00:00 local time
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+LOCAL_TIMEZONE = ZoneInfo(os.getenv("LOCAL_TIMEZONE", "America/Los_Angeles"))
+
+# When a shelter curfew stops admitting people, intake resumes at this local time
+CURFEW_LIFTS_AT = time.fromisoformat(os.getenv("CURFEW_LIFTS_AT", "06:00"))
+
+Interval = Tuple[int, int]
+
+ALL_DAYS = list(range(7))
+
+_DAY_NAMES = {
+    "mon": 0, "monday": 0,
+    "tue": 1, "tues": 1, "tuesday": 1,
+    "wed": 2, "weds": 2, "wednesday": 2,
+    "thu": 3, "thur": 3, "thurs": 3, "thursday": 3,
+    "fri": 4, "friday": 4,
+    "sat": 5, "saturday": 5,
+    "sun": 6, "sunday": 6,
+}
+_DAY_GROUPS = {
+    "daily": ALL_DAYS,
+    "everyday": ALL_DAYS,
+    "every day": ALL_DAYS,
+    "weekdays": [0, 1, 2, 3, 4],
+    "weekends": [5, 6],
+    "weekend": [5, 6],
+}
+
+_DAY = r"(?:mon(?:day)?|tue(?:s(?:day)?)?|wed(?:s|nesday)?|thu(?:r(?:s(?:day)?)?)?|fri(?:day)?|sat(?:urday)?|sun(?:day)?)\.?"
+_DAY_RANGE_RE = re.compile(rf"\b({_DAY})\s*-\s*({_DAY})(?![a-z])")
+_DAY_RE = re.compile(rf"\b({_DAY})(?![a-z])")
+_DAY_GROUP_RE = re.compile(r"\b(every ?day|daily|weekdays|weekends?)\b")
+
+_TIME = r"(?:(\d{1,2})(?::(\d{2}))?\s*([ap])\.?(?:m\.?)?(?![a-z])|(\d{1,2})(?::(\d{2}))?|(noon|midnight))"
+_TIME_RANGE_RE = re.compile(rf"{_TIME}\s*-\s*{_TIME}")
+
+_ALWAYS_RE = re.compile(r"\b24\s*/\s*7\b|\b24\s*(?:hours|hrs|hr|h)\b|\bopen 24\b|\ball day\b")
+_CLOSED_RE = re.compile(r"^\s*closed\s*$")
+_PAREN_RE = re.compile(r"\([^)]*\)")
+
+
+def _normalize(text: str) -> str:
+    text = text.lower()
+    text = _PAREN_RE.sub(" ", text)
+    text = re.sub(r"[‒–—―]", "-", text)
+    text = re.sub(r"\s+(?:to|until|thru|through)\s+", " - ", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _day_index(token: str) -> int:
+    return _DAY_NAMES[token.rstrip(".")]
+
+
+def _parse_days(segment: str) -> List[int]:
+    days: List[int] = []
+    for match in _DAY_GROUP_RE.finditer(segment):
+        days.extend(_DAY_GROUPS[match.group(1)])
+    segment = _DAY_GROUP_RE.sub(" ", segment)
+
+    for match in _DAY_RANGE_RE.finditer(segment):
+        start, end = _day_index(match.group(1)), _day_index(match.group(2))
+        days.extend((start + i) % 7 for i in range((end - start) % 7 + 1))
+    segment = _DAY_RANGE_RE.sub(" ", segment)
+
+    days.extend(_day_index(match.group(1)) for match in _DAY_RE.finditer(segment))
+    return sorted(set(days))
+
+
+def _clock(hour: Optional[str], minute: Optional[str], word: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    (hour, minute) in 24h form, or None if out of range; word is noon/midnight
+    """
+    if word == "noon":
+        return 12, 0
+    if word == "midnight":
+        return 0, 0
+    h, m = int(hour), int(minute or 0)
+    if h > 24 or m > 59:
+        return None
+    return h, m
+
+
+def _apply_meridiem(hour: int, meridiem: str) -> int:
+    hour = hour % 12
+    return hour + 12 if meridiem == "p" else hour
+
+
+def _parse_time_range(match: re.Match) -> Optional[Interval]:
+    """
+    Minutes past midnight for one "start - end" match; end may exceed a day for overnight hours
+    """
+    groups = match.groups()
+    start_meridiem, end_meridiem = groups[2], groups[8]
+    start = _clock(groups[0] or groups[3], groups[1] or groups[4], groups[5])
+    end = _clock(groups[6] or groups[9], groups[7] or groups[10], groups[11])
+    if start is None or end is None:
+        return None
+    (start_h, start_m), (end_h, end_m) = start, end
+
+    if start_meridiem and end_meridiem:
+        start_h, end_h = _apply_meridiem(start_h, start_meridiem), _apply_meridiem(end_h, end_meridiem)
+    elif end_meridiem and not groups[5]:
+        # "9-5pm" reads as 9am-5pm, "8-11pm" as 8pm-11pm
+        end_h = _apply_meridiem(end_h, end_meridiem)
+        candidate = _apply_meridiem(start_h, end_meridiem)
+        start_h = candidate if candidate * 60 + start_m <= end_h * 60 + end_m else _apply_meridiem(start_h, "a" if end_meridiem == "p" else "p")
+    elif start_meridiem:
+        start_h = _apply_meridiem(start_h, start_meridiem)
+        # "9am-5" reads as 9am-5pm, while "9pm-5" stays overnight
+        if not groups[11] and end_h < 12 and end_h * 60 + end_m <= start_h * 60 + start_m < (end_h + 12) * 60 + end_m:
+            end_h += 12
+    elif not groups[5] and not groups[11] and start_h <= 12 and end_h <= 12 and end_h <= start_h:
+        # Bare "9-5" is a daytime range
+        end_h += 12
+
+    start_minute = start_h * 60 + start_m
+    end_minute = end_h * 60 + end_m
+    if end_minute <= start_minute:
+        # Overnight, e.g. 6:00 PM - 7:00 AM or anything ending at midnight
+        end_minute += MINUTES_PER_DAY
+    return start_minute, end_minute
+
+
+def _parse_times(segment: str) -> List[Interval]:
+    if _ALWAYS_RE.search(segment):
+        return [(0, MINUTES_PER_DAY)]
+    return [interval for interval in map(_parse_time_range, _TIME_RANGE_RE.finditer(segment)) if interval]
+
+
+def merge_intervals(intervals: Sequence[Interval]) -> List[Interval]:
+    """
+    Sort and merge overlapping or touching intervals
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _weekly(days: Sequence[int], times: Sequence[Interval]) -> List[Interval]:
+    intervals = []
+    for day in days:
+        for start, end in times:
+            start, end = day * MINUTES_PER_DAY + start, day * MINUTES_PER_DAY + end
+            if end > MINUTES_PER_WEEK:
+                # Sunday overnight hours carry into Monday morning
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+            else:
+                intervals.append((start, end))
+    return intervals
+
+
+def parse_hours(text: Optional[str]) -> Optional[List[Interval]]:
+    """
+    Parse free-text opening hours into merged weekly minute intervals
+    Returns [] for "closed" and None when the text can't be understood
+    """
+    if not text or not text.strip():
+        return None
+
+    normalized = _normalize(text)
+    if _CLOSED_RE.match(normalized):
+        return []
+
+    intervals: List[Interval] = []
+    parsed_any = False
+
+    for clause in re.split(r"[;\n|]", normalized):
+        pending_days: List[int] = []
+        pending_times: List[Interval] = []
+
+        for segment in clause.split(","):
+            days, times = _parse_days(segment), _parse_times(segment)
+            if days and times:
+                intervals += _weekly(sorted(set(pending_days + days)), times)
+                pending_days = []
+                parsed_any = True
+            elif days:
+                if pending_times:
+                    intervals += _weekly(days, pending_times)
+                    pending_times = []
+                    parsed_any = True
+                else:
+                    pending_days += days
+            elif times:
+                if pending_days:
+                    intervals += _weekly(pending_days, times)
+                    pending_days = []
+                    parsed_any = True
+                else:
+                    pending_times += times
+
+        if pending_times:
+            intervals += _weekly(ALL_DAYS, pending_times)
+            parsed_any = True
+
+    if not parsed_any:
+        return None
+    return merge_intervals(intervals)
+
+
+def apply_curfew(intervals: Optional[List[Interval]], curfew: Optional[time], lifts_at: time = CURFEW_LIFTS_AT) -> Optional[List[Interval]]:
+    """
+    Remove the nightly no-entry window between curfew and when intake resumes
+    """
+    if intervals is None or curfew is None:
+        return intervals
+
+    start = curfew.hour * 60 + curfew.minute
+    end = lifts_at.hour * 60 + lifts_at.minute
+    if end <= start:
+        end += MINUTES_PER_DAY
+    blocked = merge_intervals(_weekly(ALL_DAYS, [(start, end)]))
+
+    result = []
+    for open_start, open_end in intervals:
+        cursor = open_start
+        for block_start, block_end in blocked:
+            if block_end <= cursor or block_start >= open_end:
+                continue
+            if block_start > cursor:
+                result.append((cursor, block_start))
+            cursor = max(cursor, block_end)
+        if cursor < open_end:
+            result.append((cursor, open_end))
+    return result
+
+
+def schedule_for(hours: Optional[str], curfew: Optional[time] = None) -> Optional[List[Interval]]:
+    """
+    Precomputed weekly schedule for a shelter or resource
+    """
+    return apply_curfew(parse_hours(hours), curfew)
+
+
+def minute_of_week(moment: Optional[datetime] = None) -> int:
+    """
+    Minute of the local week for a timestamp (now by default); naive times are taken as local
+    """
+    if moment is None:
+        moment = datetime.now(LOCAL_TIMEZONE)
+    elif moment.tzinfo is None:
+        moment = moment.replace(tzinfo=LOCAL_TIMEZONE)
+    else:
+        moment = moment.astimezone(LOCAL_TIMEZONE)
+    return moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+
+
+def is_open_at(intervals: Optional[Sequence[Interval]], minute: int) -> bool:
+    return bool(intervals) and any(start <= minute < end for start, end in intervals)
+
+
+def format_multirange(intervals: Optional[Sequence[Interval]]) -> Optional[str]:
+    """
+    Postgres int4multirange literal for a schedule, e.g. '{[480,1200),[1920,2640)}'
+    """
+    if intervals is None:
+        return None
+    return "{" + ",".join(f"[{start},{end})" for start, end in intervals) + "}"
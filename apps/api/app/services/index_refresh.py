@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from typing import Any, Dict, List
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.models import Resource, Shelter
+from app.services.cache import response_cache
+from app.services.clusters import RESOURCE, SHELTER, cluster_index
+from app.services.events import event_bus
+from app.services.search import SEARCH_FIELDS, resource_search, shelter_search
+from app.services.spatial_index import resource_index, shelter_index
+
+logger = logging.getLogger(__name__)
+
+# "records" event entity -> model, spatial index, search index, cluster kind
+RECORD_INDEXES = {
+    SHELTER: (Shelter, shelter_index, shelter_search, SHELTER),
+    RESOURCE: (Resource, resource_index, resource_search, RESOURCE),
+}
+
+_pending = set()
+
+
+async def reload_records(entity: str, ids: List[UUID]) -> None:
+    """
+    Re-read changed rows and apply them to this worker's in-memory indexes; missing rows are removed
+    """
+    model, spatial, search, kind = RECORD_INDEXES[entity]
+    columns = [getattr(model, name) for name in SEARCH_FIELDS[model]]
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(select(model.id, model.lat, model.lon, *columns).where(model.id.in_(ids)))
+        rows = {row["id"]: row for row in result.mappings()}
+
+    for key in ids:
+        row = rows.get(key)
+        if row is None:
+            spatial.remove(key)
+            cluster_index.forget(key)
+            if search.ready:
+                search.remove(key)
+            continue
+
+        spatial.insert(key, row["lat"], row["lon"])
+        cluster_index.insert(key, kind, row["lat"], row["lon"])
+        if search.ready:
+            search.insert(key, row)
+
+    response_cache.invalidate_soon()
+
+
+def _on_records_event(payload: Dict[str, Any]) -> None:
+    # Sent by Core writers such as the feed importer, possibly from another process
+    if payload.get("type") != "records" or payload.get("entity") not in RECORD_INDEXES:
+        return
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+
+    task = loop.create_task(reload_records(payload["entity"], [UUID(key) for key in payload["ids"]]))
+    _pending.add(task)
+    task.add_done_callback(_finish_reload)
+
+
+def _finish_reload(task: asyncio.Task) -> None:
+    _pending.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Index reload failed: {task.exception()}")
+
+
+event_bus.add_listener(_on_records_event)
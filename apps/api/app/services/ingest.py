@@ -0,0 +1,415 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+import orjson
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Shelter, ShelterStatus
+from app.models.sync import CHANGE_SEQ, CURRENT_XACT_ID
+from app.services.availability import get_status_from_availability
+from app.services.cache import response_cache
+from app.services.events import event_bus, records_events, status_event
+from app.services.neighborhoods import resolve_neighborhoods
+from app.services.schedules import shelter_schedule
+from app.services.snapshot import refresh_availability
+
+logger = logging.getLogger(__name__)
+
+# Records diffed and upserted per transaction
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "500"))
+
+# Bytes read per step while stream-parsing a JSON array
+INGEST_CHUNK_BYTES = 64 * 1024
+
+# Feed shelter types to ShelterStatus categories
+FEED_CATEGORIES = {
+    "men": "MEN",
+    "women": "WOMEN",
+    "family": "FAMILY",
+    "families": "FAMILY",
+    "youth": "YOUTH",
+    "general": "MIXED",
+    "mixed": "MIXED",
+    "veterans": "MIXED",
+}
+
+_PETS_OK_RE = re.compile(r"\bpets? (?:ok|allowed|welcome|friendly)\b|\bpet[- ]friendly\b", re.IGNORECASE)
+_ADA_RE = re.compile(r"\bada\b|accessible|wheelchair", re.IGNORECASE)
+
+# Shelter columns written by an import; anything else (website, curfew, languages) stays as staff set it
+_SHELTER_FIELDS = (
+    "name", "address", "lat", "lon", "neighborhood", "phone", "hours",
+    "intake_notes", "pet_friendly", "ada_accessible",
+)
+
+
+def iter_json_array(fp: IO[str], chunk_size: int = INGEST_CHUNK_BYTES) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array without loading the whole document
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+    started = False
+
+    while True:
+        chunk = fp.read(chunk_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+        if not started:
+            stripped = buffer.lstrip()
+            if not stripped:
+                if eof:
+                    return
+                continue
+            if stripped[0] != "[":
+                raise ValueError("Expected a JSON array of records")
+            buffer, started = stripped[1:], True
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                return
+            try:
+                value, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element continues in the next chunk
+                if eof:
+                    raise
+                break
+            yield value
+
+        if eof:
+            raise ValueError("Unterminated JSON array")
+
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records from a JSON array file, or one object per line for .ndjson/.jsonl
+    """
+    with open(path, encoding="utf-8") as fp:
+        if path.endswith((".ndjson", ".jsonl")):
+            for line in fp:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from iter_json_array(fp)
+
+
+def external_id(record: Dict[str, Any], source: Optional[str] = None) -> str:
+    """
+    Stable id for a feed record: its source plus a digest of name and address
+    Feeds don't carry their own ids, so a renamed or moved shelter imports as a new one
+    """
+    source = source or record.get("source") or "feed"
+    identity = f"{record.get('name', '').strip().lower()}|{record.get('address', '').strip().lower()}"
+    return f"{source}:{hashlib.sha1(identity.encode()).hexdigest()[:16]}"
+
+
+def _coordinate(value, places: int) -> Decimal:
+    return Decimal(str(value)).quantize(Decimal(1).scaleb(-places))
+
+
+def _reported_at(value) -> Optional[datetime]:
+    """
+    The feed's lastUpdated as an aware datetime, capped at now; None when missing or unparseable
+    """
+    if not value:
+        return None
+    try:
+        reported = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if reported.tzinfo is None:
+        reported = reported.replace(tzinfo=timezone.utc)
+    # A clock running ahead would otherwise keep the status fresh past its staleness window
+    return min(reported, datetime.now(timezone.utc))
+
+
+def normalize_record(record: Dict[str, Any], source: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Map a feed record onto shelter and status columns; raises ValueError for unusable records
+    Neighborhoods are filled in per batch afterwards
+    """
+    name = (record.get("name") or "").strip()
+    address = (record.get("address") or "").strip()
+    coordinates = record.get("coordinates") or {}
+    if not name or not address:
+        raise ValueError("name and address are required")
+    if coordinates.get("latitude") is None or coordinates.get("longitude") is None:
+        raise ValueError("coordinates are required")
+
+    category = FEED_CATEGORIES.get(str(record.get("type") or "").strip().lower())
+    if category is None:
+        raise ValueError(f"Unknown shelter type: {record.get('type')!r}")
+
+    beds_total = max(int(record.get("capacity") or 0), 0)
+    beds_available = min(max(int(record.get("available") or 0), 0), beds_total)
+    if str(record.get("status") or "").lower() == "closed":
+        beds_available, status = 0, "FULL"
+    elif beds_total == 0:
+        status = "UNKNOWN"
+    else:
+        status = get_status_from_availability(beds_available, beds_total)
+
+    restrictions = (record.get("restrictions") or "").strip()
+    services = ", ".join(record.get("services") or [])
+    notes = ". ".join(part for part in (restrictions, services and f"Services: {services}") if part) or None
+
+    shelter = {
+        "external_id": external_id(record, source),
+        "name": name,
+        "address": address,
+        "lat": _coordinate(coordinates["latitude"], 8),
+        "lon": _coordinate(coordinates["longitude"], 8),
+        "neighborhood": None,
+        "phone": record.get("phone"),
+        "hours": record.get("hours"),
+        "intake_notes": notes,
+        "pet_friendly": bool(_PETS_OK_RE.search(restrictions)),
+        "ada_accessible": bool(_ADA_RE.search(f"{restrictions} {services}")),
+    }
+    status_row = {
+        "category": category,
+        "beds_total": beds_total,
+        "beds_available": beds_available,
+        "status": status,
+        "last_updated": _reported_at(record.get("lastUpdated")),
+    }
+    return {"shelter": shelter, "status": status_row}
+
+
+def record_hash(normalized: Dict[str, Any]) -> str:
+    """
+    Digest of a record's shelter columns, compared against shelters.source_hash to skip unchanged rows
+    """
+    payload = orjson.dumps(normalized, option=orjson.OPT_SORT_KEYS, default=str)
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _status_changed(status: Dict[str, Any], stored) -> bool:
+    """
+    Whether a feed status should be written over the stored row for its shelter category
+    A report no newer than the stored row loses to it, so staff updates made since the feed was cut stand
+    """
+    if stored is None:
+        return True
+    if status["last_updated"] is not None:
+        return status["last_updated"] > stored.last_updated
+    return (stored.beds_total, stored.beds_available, stored.status) != (
+        status["beds_total"], status["beds_available"], status["status"]
+    )
+
+
+def _batches(items: Iterable, size: int) -> Iterator[List]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def _upsert(db: AsyncSession, records: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Write changed records: one upsert of changed shelters, one status upsert, then the usual snapshot refresh
+    """
+    # Imports never touch curfew_time, so schedules keep the curfew staff set; the lock holds it until commit
+    result = await db.execute(
+        select(Shelter.external_id, Shelter.id, Shelter.curfew_time, Shelter.source_hash)
+        .where(Shelter.external_id.in_({r["shelter"]["external_id"] for r in records}))
+        .with_for_update()
+    )
+    stored = {row.external_id: row for row in result.all()}
+    shelter_ids = {key: row.id for key, row in stored.items()}
+
+    # A shelter's categories arrive as separate records, so keep one row per shelter
+    shelter_rows = {}
+    for record in records:
+        shelter = record["shelter"]
+        previous = stored.get(shelter["external_id"])
+        if previous is not None and previous.source_hash == record["hash"]:
+            continue
+        shelter_rows[shelter["external_id"]] = {
+            **shelter,
+            "source_hash": record["hash"],
+            "location": f"SRID=4326;POINT({shelter['lon']} {shelter['lat']})",
+            "open_schedule": shelter_schedule(shelter["hours"], previous.curfew_time if previous else None),
+        }
+
+    changed_shelters = []
+    if shelter_rows:
+        upsert = pg_insert(Shelter).values(list(shelter_rows.values()))
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[Shelter.external_id],
+            set_={
+                **{name: upsert.excluded[name] for name in _SHELTER_FIELDS},
+                "location": upsert.excluded.location,
+                "open_schedule": upsert.excluded.open_schedule,
+                "source_hash": upsert.excluded.source_hash,
+                # ON CONFLICT DO UPDATE skips Column.onupdate, so bump the sync sequence here
+                "change_seq": CHANGE_SEQ.next_value(),
+                "change_xid": CURRENT_XACT_ID,
+            },
+        ).returning(Shelter.id, Shelter.external_id)
+        for row in (await db.execute(upsert)).all():
+            shelter_ids[row.external_id] = row.id
+            changed_shelters.append(row.id)
+
+    # Records without a lastUpdated count as reported now
+    now = datetime.now(timezone.utc)
+    status_rows = [
+        {
+            **record["status"],
+            "last_updated": record["status"]["last_updated"] or now,
+            "shelter_id": shelter_ids[record["shelter"]["external_id"]],
+        }
+        for record in records
+    ]
+    result = await db.execute(
+        select(ShelterStatus).where(ShelterStatus.shelter_id.in_(set(shelter_ids.values())))
+    )
+    current = {(s.shelter_id, s.category): s for s in result.scalars().all()}
+
+    upsert = pg_insert(ShelterStatus).values(status_rows)
+    upsert = upsert.on_conflict_do_update(
+        constraint="uq_shelter_status_shelter_category",
+        set_={
+            "beds_total": upsert.excluded.beds_total,
+            "beds_available": upsert.excluded.beds_available,
+            "status": upsert.excluded.status,
+            "last_updated": upsert.excluded.last_updated,
+            "change_seq": CHANGE_SEQ.next_value(),
+            "change_xid": CURRENT_XACT_ID,
+        },
+        # Staff updates made after the feed's report win
+        where=ShelterStatus.last_updated <= upsert.excluded.last_updated,
+    ).returning(*ShelterStatus.__table__.c)
+    written = (await db.execute(upsert)).mappings().all()
+
+    # Core statements skip the ORM flush hooks, so refresh the snapshot explicitly
+    await refresh_availability(db, {row["shelter_id"] for row in written})
+
+    # Sent with the transaction so API workers reload these shelters and see the new counts,
+    # since the importer usually runs as a separate process
+    locations = {
+        shelter_ids[r["shelter"]["external_id"]]: (float(r["shelter"]["lat"]), float(r["shelter"]["lon"]))
+        for r in records
+    }
+    events = records_events("shelter", changed_shelters) if changed_shelters else []
+    for row in written:
+        previous = current.get((row["shelter_id"], row["category"]))
+        events.append(status_event(
+            ShelterStatus(**row),
+            prev_available=previous.beds_available if previous is not None else 0,
+            prev_status=previous.status if previous is not None else "FULL",
+            location=locations[row["shelter_id"]],
+        ))
+    await event_bus.publish_on_commit(db, events)
+    await db.commit()
+
+    await response_cache.invalidate()
+
+    inserted = sum(1 for row in written if (row["shelter_id"], row["category"]) not in current)
+    return {"inserted": inserted, "updated": len(written) - inserted}
+
+
+async def ingest_records(
+    db: AsyncSession,
+    records: Iterable[Dict[str, Any]],
+    *,
+    source: Optional[str] = None,
+    batch_size: int = INGEST_BATCH_SIZE,
+    dry_run: bool = False,
+) -> Dict[str, int]:
+    """
+    Normalize, hash and diff feed records against stored shelters and statuses, upserting only changes
+    Each batch costs one lookup and, if anything changed, one upsert per table
+    """
+    summary = {"read": 0, "invalid": 0, "duplicate": 0, "unchanged": 0, "inserted": 0, "updated": 0}
+    seen = set()
+
+    for batch in _batches(records, batch_size):
+        summary["read"] += len(batch)
+
+        normalized = []
+        for raw in batch:
+            try:
+                record = normalize_record(raw, source)
+            except (ValueError, TypeError, ArithmeticError) as e:
+                summary["invalid"] += 1
+                logger.warning(f"Skipping feed record {raw.get('name')!r}: {e}")
+                continue
+
+            # One record per shelter category; a shelter with several categories has several records
+            key = (record["shelter"]["external_id"], record["status"]["category"])
+            if key in seen:
+                summary["duplicate"] += 1
+                continue
+            seen.add(key)
+            normalized.append(record)
+
+        if not normalized:
+            continue
+
+        neighborhoods = resolve_neighborhoods([(r["shelter"]["lat"], r["shelter"]["lon"]) for r in normalized])
+        for record, neighborhood in zip(normalized, neighborhoods):
+            record["shelter"]["neighborhood"] = neighborhood
+            record["hash"] = record_hash(record["shelter"])
+
+        result = await db.execute(
+            select(
+                Shelter.external_id, Shelter.source_hash, ShelterStatus.category, ShelterStatus.beds_total,
+                ShelterStatus.beds_available, ShelterStatus.status, ShelterStatus.last_updated,
+            )
+            .outerjoin(ShelterStatus, ShelterStatus.shelter_id == Shelter.id)
+            .where(Shelter.external_id.in_({r["shelter"]["external_id"] for r in normalized}))
+        )
+        hashes, statuses = {}, {}
+        for row in result.all():
+            hashes[row.external_id] = row.source_hash
+            if row.category is not None:
+                statuses[(row.external_id, row.category)] = row
+
+        changed = [
+            r for r in normalized
+            if hashes.get(r["shelter"]["external_id"]) != r["hash"]
+            or _status_changed(r["status"], statuses.get((r["shelter"]["external_id"], r["status"]["category"])))
+        ]
+        summary["unchanged"] += len(normalized) - len(changed)
+        if not changed:
+            continue
+
+        if dry_run:
+            inserted = sum(
+                1 for r in changed if (r["shelter"]["external_id"], r["status"]["category"]) not in statuses
+            )
+            summary["inserted"] += inserted
+            summary["updated"] += len(changed) - inserted
+            continue
+
+        counts = await _upsert(db, changed)
+        summary["inserted"] += counts["inserted"]
+        summary["updated"] += counts["updated"]
+
+    return summary
+
+
+async def ingest_file(db: AsyncSession, path: str, **options) -> Dict[str, int]:
+    """
+    Stream one feed file through ingest_records
+    """
+    return await ingest_records(db, iter_records(path), **options)
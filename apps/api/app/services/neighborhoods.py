@@ -0,0 +1,242 @@
+import json
+import logging
+import math
+import os
+from functools import lru_cache
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Any GeoJSON FeatureCollection of (Multi)Polygons in lon/lat, e.g. a city neighborhood boundary export
+NEIGHBORHOODS_GEOJSON = os.getenv(
+    "NEIGHBORHOODS_GEOJSON",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "la_neighborhoods.geojson"),
+)
+NEIGHBORHOODS_NAME_PROPERTY = os.getenv("NEIGHBORHOODS_NAME_PROPERTY", "name")
+NEIGHBORHOOD_CACHE_SIZE = int(os.getenv("NEIGHBORHOOD_CACHE_SIZE", "65536"))
+# The bundled file is a handful of hand-drawn rectangles marked "placeholder"; ignored unless this is set
+NEIGHBORHOODS_ALLOW_PLACEHOLDER = os.getenv("NEIGHBORHOODS_ALLOW_PLACEHOLDER", "false").lower() == "true"
+
+# Lookups are cached on coordinates rounded to 4 decimals (~11 m)
+CACHE_PRECISION = 4
+
+UNKNOWN_NEIGHBORHOOD = "Other"
+
+# Children per R-tree node
+STR_NODE_CAPACITY = 16
+
+
+class STRtree:
+    """
+    Static R-tree over (min_x, min_y, max_x, max_y) boxes, bulk-loaded with Sort-Tile-Recursive packing
+    Point queries descend only into nodes whose bounds contain the point
+    """
+
+    def __init__(self, boxes: np.ndarray, node_capacity: int = STR_NODE_CAPACITY):
+        self.boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        # Leaf level first; each level is (node bounds, child indexes into the level below or into boxes)
+        self.levels: List[Tuple[np.ndarray, List[np.ndarray]]] = []
+
+        bounds = self.boxes
+        while len(bounds):
+            groups = self._pack(bounds, node_capacity)
+            bounds = np.array([
+                (bounds[g, 0].min(), bounds[g, 1].min(), bounds[g, 2].max(), bounds[g, 3].max()) for g in groups
+            ], dtype=np.float64)
+            self.levels.append((bounds, groups))
+            if len(groups) == 1:
+                break
+
+    @staticmethod
+    def _pack(bounds: np.ndarray, capacity: int) -> List[np.ndarray]:
+        """
+        Sort by x center into vertical slices, then by y center within each slice, and cut into nodes
+        """
+        count = len(bounds)
+        slices = math.ceil(math.sqrt(math.ceil(count / capacity)))
+        per_slice = slices * capacity
+        cx = (bounds[:, 0] + bounds[:, 2]) / 2
+        cy = (bounds[:, 1] + bounds[:, 3]) / 2
+
+        groups = []
+        by_x = np.argsort(cx, kind="stable")
+        for start in range(0, count, per_slice):
+            column = by_x[start:start + per_slice]
+            column = column[np.argsort(cy[column], kind="stable")]
+            groups.extend(column[i:i + capacity] for i in range(0, len(column), capacity))
+        return groups
+
+    def query(self, x: float, y: float) -> List[int]:
+        """
+        Indexes of boxes containing the point, ascending
+        """
+        xs, ys = np.array([x], dtype=np.float64), np.array([y], dtype=np.float64)
+        return sorted(item for item, _ in self.query_points(xs, ys))
+
+    def query_points(self, xs: np.ndarray, ys: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        (box index, positions of the points inside it) for every box holding at least one point
+        """
+        if not self.levels:
+            return
+        top = len(self.levels) - 1
+        stack = [(top, node, np.arange(len(xs))) for node in range(len(self.levels[top][1]))]
+        while stack:
+            level, node, positions = stack.pop()
+            min_x, min_y, max_x, max_y = self.levels[level][0][node]
+            px, py = xs[positions], ys[positions]
+            positions = positions[(px >= min_x) & (px <= max_x) & (py >= min_y) & (py <= max_y)]
+            if not len(positions):
+                continue
+
+            for child in self.levels[level][1][node]:
+                if level > 0:
+                    stack.append((level - 1, child, positions))
+                    continue
+                min_x, min_y, max_x, max_y = self.boxes[child]
+                px, py = xs[positions], ys[positions]
+                hits = positions[(px >= min_x) & (px <= max_x) & (py >= min_y) & (py <= max_y)]
+                if len(hits):
+                    yield int(child), hits
+
+
+class NeighborhoodResolver:
+    """
+    Point-in-polygon lookup over neighborhood boundaries
+    Polygon bounding boxes go into an STR-packed R-tree so each lookup only ray-casts a few candidates
+    """
+
+    def __init__(self, features: Sequence[Dict], name_property: str = NEIGHBORHOODS_NAME_PROPERTY, placeholder: bool = False):
+        self.placeholder = placeholder
+        self.names: List[str] = []
+        # One entry per polygon part: its rings (exterior first, then holes) as (n, 2) lon/lat arrays
+        self._parts: List[List[np.ndarray]] = []
+        self._owners: List[int] = []
+        bboxes = []
+
+        for feature in features:
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") == "Polygon":
+                polygons = [geometry["coordinates"]]
+            elif geometry.get("type") == "MultiPolygon":
+                polygons = geometry["coordinates"]
+            else:
+                continue
+
+            name = (feature.get("properties") or {}).get(name_property)
+            if not name:
+                continue
+            self.names.append(name)
+
+            for polygon in polygons:
+                rings = [np.asarray(ring, dtype=np.float64)[:, :2] for ring in polygon if len(ring) >= 3]
+                if not rings:
+                    continue
+                exterior = rings[0]
+                self._parts.append(rings)
+                self._owners.append(len(self.names) - 1)
+                bboxes.append((exterior[:, 0].min(), exterior[:, 1].min(), exterior[:, 0].max(), exterior[:, 1].max()))
+
+        self._tree = STRtree(np.array(bboxes, dtype=np.float64).reshape(-1, 4))
+
+    @classmethod
+    def from_geojson(cls, path: str, name_property: str = NEIGHBORHOODS_NAME_PROPERTY) -> "NeighborhoodResolver":
+        with open(path) as f:
+            collection = json.load(f)
+        return cls(
+            collection.get("features", []),
+            name_property=name_property,
+            placeholder=bool(collection.get("placeholder")),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _contains(self, part: int, lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+        """
+        Even-odd ray casting over every ring of a polygon part, vectorized across points
+        Holes flip the parity back, so points inside a hole are outside the polygon
+        """
+        inside = np.zeros(lons.shape, dtype=bool)
+        for ring in self._parts[part]:
+            x1, y1 = ring[:, 0], ring[:, 1]
+            x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+            straddles = (y1[:, None] > lats) != (y2[:, None] > lats)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cross_x = x1[:, None] + (lats - y1[:, None]) * (x2 - x1)[:, None] / (y2 - y1)[:, None]
+            crossings = np.count_nonzero(straddles & (lons < cross_x), axis=0)
+            inside ^= (crossings % 2).astype(bool)
+        return inside
+
+    def resolve(self, lat: float, lon: float) -> str:
+        """
+        Neighborhood containing a point, or "Other" when it falls outside every boundary
+        """
+        lats = np.array([lat], dtype=np.float64)
+        lons = np.array([lon], dtype=np.float64)
+        # Lowest part first, so overlapping boundaries resolve the same way as resolve_many
+        for part in self._tree.query(lon, lat):
+            if self._contains(part, lons, lats)[0]:
+                return self.names[self._owners[part]]
+        return UNKNOWN_NEIGHBORHOOD
+
+    def resolve_many(self, points: Sequence[Tuple[float, float]]) -> List[str]:
+        """
+        Resolve many (lat, lon) points at once; the R-tree hands each polygon the points
+        inside its bounding box, which are ray-cast in one vectorized pass
+        """
+        coords = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        lats, lons = coords[:, 0], coords[:, 1]
+        # Lowest containing part wins where boundaries overlap
+        part_of = np.full(len(coords), len(self._parts), dtype=np.int64)
+
+        for part, candidates in self._tree.query_points(lons, lats):
+            hits = candidates[self._contains(part, lons[candidates], lats[candidates])]
+            part_of[hits] = np.minimum(part_of[hits], part)
+
+        owners = np.append(np.asarray(self._owners, dtype=np.int64), -1)[part_of]
+        return [self.names[i] if i >= 0 else UNKNOWN_NEIGHBORHOOD for i in owners]
+
+
+@lru_cache(maxsize=1)
+def get_resolver() -> NeighborhoodResolver:
+    """
+    Load the boundary dataset once per process
+    The bundled placeholder resolves everything to "Other" unless NEIGHBORHOODS_ALLOW_PLACEHOLDER is set,
+    so ingest and seeding keep working without writing made-up neighborhoods
+    """
+    resolver = NeighborhoodResolver.from_geojson(NEIGHBORHOODS_GEOJSON)
+    if resolver.placeholder:
+        message = (
+            f"{NEIGHBORHOODS_GEOJSON} is the placeholder boundary file ({len(resolver)} rough areas); "
+            "set NEIGHBORHOODS_GEOJSON to a real LA neighborhood boundary export"
+        )
+        if not NEIGHBORHOODS_ALLOW_PLACEHOLDER:
+            logger.warning(f"{message}; neighborhoods resolve to {UNKNOWN_NEIGHBORHOOD} until then")
+            return NeighborhoodResolver([], placeholder=True)
+        logger.warning(message)
+    logger.info("Loaded %d neighborhood boundaries from %s", len(resolver), NEIGHBORHOODS_GEOJSON)
+    return resolver
+
+
+@lru_cache(maxsize=NEIGHBORHOOD_CACHE_SIZE)
+def _resolve_rounded(lat: float, lon: float) -> str:
+    return get_resolver().resolve(lat, lon)
+
+
+def resolve_neighborhood(lat: float, lon: float) -> str:
+    """
+    Cached single-point lookup on rounded coordinates
+    """
+    return _resolve_rounded(round(float(lat), CACHE_PRECISION), round(float(lon), CACHE_PRECISION))
+
+
+def resolve_neighborhoods(points: Sequence[Tuple[float, float]]) -> List[str]:
+    """
+    Batch lookup for ETL and seed imports
+    """
+    if not len(points):
+        return []
+    return get_resolver().resolve_many(points)
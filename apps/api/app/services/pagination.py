@@ -0,0 +1,129 @@
+import base64
+import bisect
+import json
+import os
+from typing import Any, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.serialization import row_dicts
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "50"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "200"))
+
+# Filtered index pages fetch this many candidates per wanted row, growing by the same factor
+CANDIDATE_OVERFETCH = 4
+
+# (sort value such as distance_km, or None when ordering by id; row id)
+Keyset = Tuple[Optional[float], UUID]
+
+
+def encode_cursor(distance_km: Optional[float], row_id: UUID) -> str:
+    """
+    Encode the last row's sort key as an opaque URL-safe token
+    """
+    payload = json.dumps({"d": distance_km, "id": str(row_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Keyset:
+    """
+    Decode a cursor token; raises ValueError if it was not produced by encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        distance = payload["d"]
+        return (float(distance) if distance is not None else None), UUID(payload["id"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def parse_cursor(cursor: Optional[str], ranked: bool) -> Optional[Keyset]:
+    """
+    Decode an optional cursor and check it was issued for the same sort mode
+    ranked is True when rows are ordered by a value (distance or relevance) before id
+    """
+    if cursor is None:
+        return None
+    after = decode_cursor(cursor)
+    if (after[0] is not None) != ranked:
+        raise ValueError("Cursor does not match the 'near' or 'q' parameters")
+    return after
+
+
+def after_keyset(keys: Sequence[Tuple[Optional[float], UUID]], after: Optional[Keyset]) -> List[int]:
+    """
+    Return positions of keys strictly after the cursor keyset
+    Used for in-memory candidate lists that are already sorted by (distance, id)
+    """
+    if after is None:
+        return list(range(len(keys)))
+    return [i for i, key in enumerate(keys) if _sort_key(key) > _sort_key(after)]
+
+
+def keyset_candidates(
+    candidates: Sequence[Tuple[Hashable, float]], after: Optional[Keyset]
+) -> List[Tuple[float, Hashable]]:
+    """
+    Spatial index (key, distance_km) hits as (distance, key) in keyset order, cut at the cursor
+    """
+    ordered = sorted((distance, key) for key, distance in candidates)
+    if after is not None:
+        ordered = ordered[bisect.bisect_right(ordered, _sort_key(after)):]
+    return ordered
+
+
+async def fetch_candidates(
+    db: AsyncSession,
+    query,
+    id_column,
+    ordered: Sequence[Tuple[float, Hashable]],
+    limit: Optional[int],
+    filtered: bool,
+) -> List[Dict[str, Any]]:
+    """
+    Run query over keyset-ordered candidates a chunk at a time until limit rows pass its filters
+    Unfiltered pages need exactly limit candidates; filtered ones over-fetch in growing chunks
+    """
+    if limit is None:
+        size = max(len(ordered), 1)
+    else:
+        size = limit * CANDIDATE_OVERFETCH if filtered else limit
+
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while start < len(ordered) and (limit is None or len(rows) < limit):
+        keys = [key for _, key in ordered[start:start + size]]
+        result = await db.execute(query.where(id_column.in_(keys)))
+        rows.extend(row_dicts(result.mappings()))
+        start += size
+        size *= CANDIDATE_OVERFETCH
+    return rows
+
+
+def _sort_key(key: Tuple[Optional[float], UUID]) -> Tuple[float, UUID]:
+    distance, row_id = key
+    return (distance if distance is not None else 0.0), row_id
+
+
+def sort_value(row: Mapping[str, Any]) -> Optional[float]:
+    """
+    Leading keyset value of a row: distance when sorted by location, else negated relevance
+    """
+    if row.get("distance_km") is not None:
+        return row["distance_km"]
+    if row.get("relevance") is not None:
+        return -row["relevance"]
+    return None
+
+
+def next_cursor(items: Sequence[Mapping[str, Any]], per_page: int) -> Optional[str]:
+    """
+    Build the cursor for the next page given per_page + 1 fetched rows
+    """
+    if len(items) <= per_page:
+        return None
+    last = items[per_page - 1]
+    return encode_cursor(sort_value(last), last["id"])
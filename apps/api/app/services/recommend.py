@@ -0,0 +1,270 @@
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import String, bindparam, text
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.services.availability import OPEN_STATUSES, STALE_AFTER
+from app.services.binary import CATEGORIES
+from app.services.hours import CURFEW_LIFTS_AT, LOCAL_TIMEZONE, MINUTES_PER_DAY
+
+FACTORS = ("distance", "availability", "category", "needs", "curfew", "freshness")
+
+# name=weight pairs; factors left out keep their default
+RECOMMEND_WEIGHTS = os.getenv(
+    "RECOMMEND_WEIGHTS", "distance=3,availability=3,category=2,needs=2,curfew=1,freshness=1"
+)
+# Speed used to estimate arrival before curfew (transit, roughly)
+RECOMMEND_TRAVEL_KMH = float(os.getenv("RECOMMEND_TRAVEL_KMH", "15"))
+# Minutes of slack before curfew that count as fully comfortable
+CURFEW_COMFORT_MINUTES = 120
+# Beds at which the availability factor reaches 0.5
+BEDS_HALF_SCORE = 2
+
+# Shelters within the radius when the in-memory index can't be trusted; uses the location GiST index
+_CANDIDATES_SQL = text("""
+    SELECT id, ST_Distance(location, origin.point) / 1000 AS distance_km
+    FROM shelters, (SELECT ST_SetSRID(ST_MakePoint(:lon, :lat), 4326)::geography AS point) AS origin
+    WHERE ST_DWithin(location, origin.point, :radius_m)
+    ORDER BY location <-> origin.point, id
+""")
+
+# Per-candidate features from the snapshot, with the conservatism rule applied in SQL:
+# open categories whose stale_at has passed count as UNKNOWN, so they contribute no beds
+_FEATURES_SQL = text(f"""
+    SELECT
+        s.id, s.name, s.address, s.lat, s.lon,
+        s.requires_id, s.pet_friendly, s.ada_accessible, s.lgbtq_friendly, s.languages, s.curfew_time,
+        COALESCE(f.beds, 0) AS beds,
+        COALESCE(f.exact, false) AS exact,
+        COALESCE(f.served, false) AS served,
+        f.updated
+    FROM shelters s
+    LEFT JOIN LATERAL (
+        SELECT
+            SUM(CASE
+                WHEN e.value->>'status' IN {tuple(OPEN_STATUSES)!r}
+                 AND CAST(e.value->>'stale_at' AS timestamptz) > now()
+                THEN CAST(e.value->>'beds_available' AS integer)
+                ELSE 0
+            END) AS beds,
+            bool_or(e.key = :category) AS exact,
+            count(*) > 0 AS served,
+            extract(epoch FROM max(CAST(e.value->>'last_updated' AS timestamptz))) AS updated
+        FROM shelter_availability a, jsonb_each(a.categories) e
+        WHERE a.shelter_id = s.id AND e.key = ANY(:categories)
+    ) f ON true
+    WHERE s.id = ANY(:shelter_ids)
+""").bindparams(
+    bindparam("shelter_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("categories", type_=ARRAY(String)),
+)
+
+
+def parse_weights(spec: Optional[str], base: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+    """
+    Parse 'distance=3,availability=2' over a base set of weights; raises ValueError on bad input
+    """
+    weights = dict(base) if base is not None else {name: 1.0 for name in FACTORS}
+    for part in (spec or "").split(","):
+        if not part.strip():
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in FACTORS:
+            raise ValueError(f"Unknown factor '{name}'. Use: {', '.join(FACTORS)}")
+        try:
+            weight = float(value)
+        except ValueError:
+            raise ValueError(f"Weight for '{name}' must be a number")
+        if not weight >= 0:
+            raise ValueError(f"Weight for '{name}' must not be negative")
+        weights[name] = weight
+
+    if sum(weights.values()) <= 0:
+        raise ValueError("At least one weight must be positive")
+    return weights
+
+
+DEFAULT_WEIGHTS = parse_weights(RECOMMEND_WEIGHTS)
+
+
+def candidate_features(rows: Sequence[Mapping[str, Any]], distances: Mapping[UUID, float]) -> Dict[str, np.ndarray]:
+    """
+    Column arrays for scoring; one pass over the rows, everything after is vectorized
+    """
+    n = len(rows)
+    curfew = np.full(n, np.nan)
+    for i, row in enumerate(rows):
+        if row["curfew_time"] is not None:
+            curfew[i] = row["curfew_time"].hour * 60 + row["curfew_time"].minute
+
+    return {
+        "distance_km": np.fromiter((distances[row["id"]] for row in rows), dtype=np.float64, count=n),
+        "beds": np.fromiter((row["beds"] for row in rows), dtype=np.float64, count=n),
+        "exact": np.fromiter((row["exact"] for row in rows), dtype=bool, count=n),
+        "served": np.fromiter((row["served"] for row in rows), dtype=bool, count=n),
+        "updated": np.fromiter(
+            (np.nan if row["updated"] is None else float(row["updated"]) for row in rows), dtype=np.float64, count=n
+        ),
+        "requires_id": np.fromiter((bool(row["requires_id"]) for row in rows), dtype=bool, count=n),
+        "pet_friendly": np.fromiter((bool(row["pet_friendly"]) for row in rows), dtype=bool, count=n),
+        "ada_accessible": np.fromiter((bool(row["ada_accessible"]) for row in rows), dtype=bool, count=n),
+        "lgbtq_friendly": np.fromiter((bool(row["lgbtq_friendly"]) for row in rows), dtype=bool, count=n),
+        "curfew": curfew,
+    }
+
+
+def _speaks(rows: Sequence[Mapping[str, Any]], language: str) -> np.ndarray:
+    language = language.strip().lower()
+    return np.fromiter(
+        (any(language == spoken.lower() for spoken in row["languages"] or ()) for row in rows),
+        dtype=bool,
+        count=len(rows),
+    )
+
+
+def score_candidates(
+    features: Mapping[str, np.ndarray],
+    *,
+    radius_km: float,
+    weights: Mapping[str, float],
+    category: Optional[str] = None,
+    needs: Sequence[np.ndarray] = (),
+    now: Optional[datetime] = None,
+) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Weighted score in [0, 1] per candidate plus each factor's [0, 1] value
+    needs are boolean arrays, one per requirement the client asked for, True where it's met
+    """
+    now = now or datetime.now(timezone.utc)
+    distance = features["distance_km"]
+    n = len(distance)
+
+    factors = {
+        "distance": np.clip(1 - distance / radius_km, 0, 1),
+        "availability": features["beds"] / (features["beds"] + BEDS_HALF_SCORE),
+    }
+
+    # An exact category match beats a MIXED shelter, which beats one that doesn't serve the client
+    if category is None:
+        factors["category"] = features["served"].astype(np.float64)
+    else:
+        factors["category"] = np.where(features["exact"], 1.0, np.where(features["served"], 0.5, 0.0))
+
+    if needs:
+        factors["needs"] = np.mean(np.vstack(needs), axis=0)
+    else:
+        factors["needs"] = np.ones(n)
+
+    # Minutes left before curfew once the client gets there; after curfew until it lifts scores 0
+    local = now.astimezone(LOCAL_TIMEZONE)
+    minute = local.hour * 60 + local.minute
+    lifts = CURFEW_LIFTS_AT.hour * 60 + CURFEW_LIFTS_AT.minute
+    curfew = features["curfew"]
+    has_curfew = ~np.isnan(curfew)
+    left = np.mod(curfew - minute, MINUTES_PER_DAY)
+    window = np.mod(curfew - lifts, MINUTES_PER_DAY)
+    arrival_left = left - distance / RECOMMEND_TRAVEL_KMH * 60
+    inside = has_curfew & (left > 0) & (left <= window)
+    factors["curfew"] = np.where(
+        has_curfew,
+        np.where(inside, np.clip(arrival_left / CURFEW_COMFORT_MINUTES, 0, 1), 0.0),
+        1.0,
+    )
+
+    age = now.timestamp() - features["updated"]
+    factors["freshness"] = np.nan_to_num(np.clip(1 - age / STALE_AFTER.total_seconds(), 0, 1), nan=0.0)
+
+    total = sum(weights.values())
+    score = sum(weights[name] * factors[name] for name in FACTORS) / total
+    return score, factors
+
+
+def top_k(score: np.ndarray, distance: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indexes of the k best scores, best first; ties go to the closer shelter
+    """
+    if len(score) > k:
+        candidates = np.argpartition(-score, k - 1)[:k]
+    else:
+        candidates = np.arange(len(score))
+    return candidates[np.lexsort((distance[candidates], -score[candidates]))]
+
+
+async def nearby_candidates(db: AsyncSession, lat: float, lon: float, radius_km: float) -> List[Tuple[UUID, float]]:
+    """
+    (shelter_id, distance_km) pairs within the radius from PostGIS, nearest first
+    """
+    result = await db.execute(
+        _CANDIDATES_SQL, {"lat": float(lat), "lon": float(lon), "radius_m": radius_km * 1000}
+    )
+    return [(shelter_id, float(distance)) for shelter_id, distance in result.all()]
+
+
+async def recommend_shelters(
+    db: AsyncSession,
+    candidates: Sequence[Tuple[UUID, float]],
+    *,
+    radius_km: float,
+    k: int,
+    weights: Mapping[str, float],
+    category: Optional[str] = None,
+    has_id: bool = True,
+    pet_friendly: bool = False,
+    ada_accessible: bool = False,
+    lgbtq_friendly: bool = False,
+    language: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rank prefiltered (shelter_id, distance_km) candidates and return the top k with per-factor scores
+    """
+    if not candidates:
+        return []
+
+    distances = dict(candidates)
+    categories = [category, "MIXED"] if category else list(CATEGORIES)
+    result = await db.execute(
+        _FEATURES_SQL,
+        {"shelter_ids": list(distances), "categories": categories, "category": category},
+    )
+    rows = result.mappings().all()
+    if not rows:
+        return []
+
+    features = candidate_features(rows, distances)
+    needs = []
+    if not has_id:
+        needs.append(~features["requires_id"])
+    if pet_friendly:
+        needs.append(features["pet_friendly"])
+    if ada_accessible:
+        needs.append(features["ada_accessible"])
+    if lgbtq_friendly:
+        needs.append(features["lgbtq_friendly"])
+    if language:
+        needs.append(_speaks(rows, language))
+
+    score, factors = score_candidates(
+        features, radius_km=radius_km, weights=weights, category=category, needs=needs
+    )
+
+    ranked = []
+    for i in top_k(score, features["distance_km"], k).tolist():
+        row = rows[i]
+        ranked.append({
+            "id": row["id"],
+            "name": row["name"],
+            "address": row["address"],
+            "lat": row["lat"],
+            "lon": row["lon"],
+            "distance_km": float(features["distance_km"][i]),
+            "beds_available": int(features["beds"][i]),
+            "score": round(float(score[i]), 4),
+            "factors": {name: round(float(factors[name][i]), 4) for name in FACTORS},
+        })
+    return ranked
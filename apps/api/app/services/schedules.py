@@ -0,0 +1,80 @@
+from typing import Dict, List, Optional
+
+from sqlalchemy import Integer, event, literal, not_, or_, select, update
+from sqlalchemy.dialects.postgresql import Range
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Resource, Shelter
+from app.services.hours import Interval, schedule_for
+
+
+def schedule_ranges(intervals: Optional[List[Interval]]) -> Optional[List[Range]]:
+    """
+    int4multirange value for a parsed schedule; None keeps unparseable hours out of open_now results
+    """
+    if intervals is None:
+        return None
+    return [Range(start, end, bounds="[)") for start, end in intervals]
+
+
+def shelter_schedule(hours: Optional[str], curfew_time=None) -> Optional[List[Range]]:
+    return schedule_ranges(schedule_for(hours, curfew_time))
+
+
+def resource_schedule(hours: Optional[str]) -> Optional[List[Range]]:
+    return schedule_ranges(schedule_for(hours))
+
+
+def open_at_criteria(model, minute: int, open_now: bool = True):
+    """
+    WHERE clause for rows open (or not open) at a minute of the week, answered by the GiST index
+    """
+    is_open = model.open_schedule.contains(literal(minute, Integer))
+    if open_now:
+        return is_open
+    return or_(model.open_schedule.is_(None), not_(is_open))
+
+
+async def backfill_schedules(db: AsyncSession) -> Dict[str, int]:
+    """
+    Fill open_schedule for rows that have none, with one UPDATE per distinct hours/curfew pair
+    Rows whose hours don't parse stay NULL
+    """
+    counts = {}
+    for model in (Shelter, Resource):
+        curfew = model.curfew_time if model is Shelter else literal(None)
+        result = await db.execute(
+            select(model.hours, curfew).distinct()
+            .where(model.open_schedule.is_(None), model.hours.is_not(None))
+        )
+
+        updated = 0
+        for hours, curfew_time in result.all():
+            schedule = schedule_ranges(schedule_for(hours, curfew_time))
+            if schedule is None:
+                continue
+            query = update(model).where(model.open_schedule.is_(None), model.hours == hours)
+            if model is Shelter:
+                query = query.where(Shelter.curfew_time.is_not_distinct_from(curfew_time))
+            changed = await db.execute(
+                query.values(open_schedule=schedule).execution_options(synchronize_session=False)
+            )
+            updated += changed.rowcount
+        counts[model.__tablename__] = updated
+
+    await db.commit()
+    return counts
+
+
+# Keep the precomputed schedule in step with hours/curfew on every ORM write;
+# Core writers call shelter_schedule / resource_schedule themselves
+@event.listens_for(Shelter, "before_insert")
+@event.listens_for(Shelter, "before_update")
+def _shelter_schedule(mapper, connection, target: Shelter):
+    target.open_schedule = shelter_schedule(target.hours, target.curfew_time)
+
+
+@event.listens_for(Resource, "before_insert")
+@event.listens_for(Resource, "before_update")
+def _resource_schedule(mapper, connection, target: Resource):
+    target.open_schedule = resource_schedule(target.hours)
@@ -0,0 +1,216 @@
+import logging
+import os
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, Optional, Set
+
+from sqlalchemy import event, func, literal, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Resource, Shelter
+from app.services.events import event_bus
+
+logger = logging.getLogger(__name__)
+
+# auto uses pg_trgm on PostgreSQL and the in-process index elsewhere (tests, SQLite)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").lower()
+
+# Minimum word similarity for a field to count as a match (pg_trgm's default is 0.6)
+SEARCH_THRESHOLD = float(os.getenv("SEARCH_THRESHOLD", "0.4"))
+
+# Searchable text fields and their weight in the relevance score
+SEARCH_FIELDS = {
+    Shelter: {"name": 1.0, "neighborhood": 0.8, "address": 0.6, "intake_notes": 0.4},
+    Resource: {"name": 1.0, "neighborhood": 0.8, "address": 0.6, "notes": 0.4},
+}
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    """
+    pg_trgm-style trigrams: lowercase words padded with two leading and one trailing space
+    """
+    grams: Set[str] = set()
+    for word in _WORD_RE.findall((text or "").lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def word_similarity(query: Set[str], text: Set[str]) -> float:
+    """
+    Share of the query's trigrams found in the text, so a short query can match a long field
+    """
+    if not query:
+        return 0.0
+    return len(query & text) / len(query)
+
+
+class TrigramIndex:
+    """
+    In-memory trigram index over weighted text fields
+    Mirrors the pg_trgm ranking closely enough to stand in when Postgres isn't available
+    """
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self.ready = False
+        self._docs: Dict[Hashable, Dict[str, Set[str]]] = {}
+        self._postings: Dict[str, Set[Hashable]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def insert(self, key: Hashable, fields: Dict[str, Optional[str]]) -> None:
+        """
+        Add or replace a document's searchable fields
+        """
+        self.remove(key)
+        doc = {name: trigrams(fields.get(name)) for name in self.weights}
+        self._docs[key] = doc
+        for grams in doc.values():
+            for gram in grams:
+                self._postings[gram].add(key)
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove a document if present
+        """
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for grams in doc.values():
+            for gram in grams:
+                keys = self._postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._postings[gram]
+
+    def clear(self) -> None:
+        self._docs.clear()
+        self._postings.clear()
+
+    def search(self, text: str, threshold: float = SEARCH_THRESHOLD) -> Dict[Hashable, float]:
+        """
+        Return {key: relevance} for documents with any field at or above the threshold
+        """
+        query = trigrams(text)
+        if not query:
+            return {}
+
+        # Only documents sharing enough trigrams with the query can pass the threshold
+        counts: Dict[Hashable, int] = defaultdict(int)
+        for gram in query:
+            for key in self._postings.get(gram, ()):
+                counts[key] += 1
+        needed = threshold * len(query)
+
+        matches = {}
+        for key, count in counts.items():
+            if count < needed:
+                continue
+            doc = self._docs[key]
+            best = 0.0
+            for name, weight in self.weights.items():
+                similarity = word_similarity(query, doc[name])
+                if similarity >= threshold:
+                    best = max(best, similarity * weight)
+            if best > 0:
+                matches[key] = best
+        return matches
+
+
+shelter_search = TrigramIndex(SEARCH_FIELDS[Shelter])
+resource_search = TrigramIndex(SEARCH_FIELDS[Resource])
+
+_INDEXES = {Shelter: shelter_search, Resource: resource_search}
+
+
+def use_pg_trgm(db: AsyncSession) -> bool:
+    """
+    Check whether search can run in Postgres against the pg_trgm GIN indexes
+    """
+    if db.bind is None or db.bind.dialect.name != "postgresql":
+        return False
+    # The in-memory index misses other processes' writes unless the event bridge is listening
+    return SEARCH_BACKEND != "memory" or not event_bus.shared
+
+
+def trigram_search(model, text: str):
+    """
+    Build (match criteria, relevance expression) for pg_trgm search on a model
+    The <% operator lets Postgres use the gin_trgm_ops indexes for each field
+    """
+    fields = SEARCH_FIELDS[model]
+    query = literal(text)
+    criteria = or_(*(query.op("<%")(getattr(model, name)) for name in fields))
+    relevance = func.greatest(*(
+        func.word_similarity(query, func.coalesce(getattr(model, name), "")) * weight
+        for name, weight in fields.items()
+    ))
+    return criteria, relevance
+
+
+async def set_search_threshold(db: AsyncSession, threshold: float = SEARCH_THRESHOLD) -> None:
+    """
+    Apply the match threshold to the <% operator for the current transaction
+    """
+    await db.execute(select(func.set_config("pg_trgm.word_similarity_threshold", str(threshold), True)))
+
+
+async def build_search_indexes(db: AsyncSession) -> None:
+    """
+    Load searchable fields of all shelters and resources into the in-memory indexes
+    """
+    for model, index in _INDEXES.items():
+        columns = [getattr(model, name) for name in index.weights]
+        result = await db.execute(select(model.id, *columns))
+        index.clear()
+        for row in result.mappings():
+            index.insert(row["id"], row)
+        index.ready = True
+        logger.info("Built %s search index with %d documents", model.__tablename__, len(index))
+
+
+async def memory_matches(db: AsyncSession, model, text: str) -> Dict[Hashable, float]:
+    """
+    Search the in-memory index for a model, loading it on first use
+    """
+    index = _INDEXES[model]
+    if not index.ready:
+        await build_search_indexes(db)
+    return index.search(text)
+
+
+# Keep the in-memory indexes in step with committed ORM writes
+
+@event.listens_for(Session, "after_flush")
+def _collect_search_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault("search_index_changes", [])
+
+    for obj in list(session.new) + list(session.dirty):
+        index = _INDEXES.get(type(obj))
+        if index is not None and index.ready:
+            pending.append((index, obj.id, {name: getattr(obj, name) for name in index.weights}))
+
+    for obj in session.deleted:
+        index = _INDEXES.get(type(obj))
+        if index is not None and index.ready:
+            pending.append((index, obj.id, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_search_changes(session: Session) -> None:
+    for index, key, fields in session.info.pop("search_index_changes", []):
+        if fields is None:
+            index.remove(key)
+        else:
+            index.insert(key, fields)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_search_changes(session: Session) -> None:
+    session.info.pop("search_index_changes", None)
@@ -0,0 +1,39 @@
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Type
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import Column
+
+
+def response_columns(model, schema: Type[BaseModel]) -> List[Column]:
+    """
+    Table columns backing a response schema, in the schema's field order
+    """
+    table = model.__table__
+    return [table.c[name] for name in schema.model_fields if name in table.c]
+
+
+def row_dicts(rows: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Copy Core row mappings into mutable dicts with distance_km and relevance slots
+    """
+    return [
+        {**row, "distance_km": row.get("distance_km"), "relevance": row.get("relevance")}
+        for row in rows
+    ]
+
+
+def _default(value: Any) -> Any:
+    # Pydantic renders Decimal as a string, so keep lat/lon byte-identical
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serialize plain rows straight to JSON bytes, skipping per-row Pydantic validation
+    Rows are sent as stored; response schemas' field bounds are not re-checked here
+    """
+    return orjson.dumps(value, default=_default)
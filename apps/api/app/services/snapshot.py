@@ -0,0 +1,185 @@
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, Interval, and_, bindparam, cast, event, func, not_, or_, select, text, true
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Hold, Shelter, ShelterAvailability, ShelterStatus
+from app.services.availability import OPEN_STATUSES, STALE_AFTER
+
+# Recompute the snapshot rows for a set of shelters from shelter_status and active holds
+_REFRESH_SQL = text("""
+    INSERT INTO shelter_availability (
+        shelter_id, categories, open_categories, has_closed_category,
+        effective_status, beds_available, stale_at, open_until, refreshed_at
+    )
+    SELECT
+        s.shelter_id,
+        jsonb_object_agg(s.category, jsonb_build_object(
+            'id', s.id,
+            'beds_total', s.beds_total,
+            'beds_available', s.beds_available,
+            'beds_held', COALESCE(h.held, 0),
+            'status', s.status,
+            'notes', s.notes,
+            'last_updated', s.last_updated,
+            'stale_at', s.last_updated + CAST(:stale_after AS interval)
+        )),
+        COALESCE(array_agg(s.category) FILTER (WHERE s.status IN ('OPEN', 'LIMITED')), '{}'),
+        bool_or(s.status NOT IN ('OPEN', 'LIMITED')),
+        CASE
+            WHEN bool_or(s.status = 'OPEN') THEN 'OPEN'
+            WHEN bool_or(s.status = 'LIMITED') THEN 'LIMITED'
+            WHEN bool_or(s.status = 'FULL') THEN 'FULL'
+            ELSE 'UNKNOWN'
+        END,
+        SUM(s.beds_available),
+        MIN(s.last_updated + CAST(:stale_after AS interval)) FILTER (WHERE s.status IN ('OPEN', 'LIMITED')),
+        MAX(s.last_updated + CAST(:stale_after AS interval)) FILTER (WHERE s.status IN ('OPEN', 'LIMITED')),
+        now()
+    FROM shelter_status s
+    LEFT JOIN (
+        SELECT shelter_id, category, SUM(qty) AS held
+        FROM holds
+        WHERE status = 'ACTIVE' AND shelter_id = ANY(:shelter_ids)
+        GROUP BY shelter_id, category
+    ) h ON h.shelter_id = s.shelter_id AND h.category = s.category
+    WHERE s.shelter_id = ANY(:shelter_ids)
+    GROUP BY s.shelter_id
+    ON CONFLICT (shelter_id) DO UPDATE SET
+        categories = EXCLUDED.categories,
+        open_categories = EXCLUDED.open_categories,
+        has_closed_category = EXCLUDED.has_closed_category,
+        effective_status = EXCLUDED.effective_status,
+        beds_available = EXCLUDED.beds_available,
+        stale_at = EXCLUDED.stale_at,
+        open_until = EXCLUDED.open_until,
+        refreshed_at = EXCLUDED.refreshed_at
+""").bindparams(
+    bindparam("shelter_ids", type_=ARRAY(PG_UUID(as_uuid=True))),
+    bindparam("stale_after", value=STALE_AFTER, type_=Interval),
+)
+
+# Serialize refreshes per shelter until commit: without it, two transactions writing different
+# categories each recompute from a snapshot missing the other's row and the later upsert wins.
+# Row locks rather than advisory ones, so a full rebuild doesn't fill the shared lock table;
+# NO KEY UPDATE still lets status inserts take their foreign key share locks
+_LOCK_SQL = text("""
+    SELECT id FROM shelters WHERE id = ANY(:shelter_ids) ORDER BY id FOR NO KEY UPDATE
+""").bindparams(bindparam("shelter_ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+# Drop snapshot rows for shelters whose last status was removed
+_PRUNE_SQL = text("""
+    DELETE FROM shelter_availability a
+    WHERE a.shelter_id = ANY(:shelter_ids)
+      AND NOT EXISTS (SELECT 1 FROM shelter_status s WHERE s.shelter_id = a.shelter_id)
+""").bindparams(bindparam("shelter_ids", type_=ARRAY(PG_UUID(as_uuid=True))))
+
+
+def refresh_availability_sync(connection: Connection, shelter_ids: Iterable[UUID]) -> None:
+    """
+    Refresh snapshot rows on a sync connection (used from session flush hooks)
+    """
+    shelter_ids = list(set(shelter_ids))
+    if not shelter_ids:
+        return
+
+    connection.execute(_LOCK_SQL, {"shelter_ids": shelter_ids})
+    connection.execute(_REFRESH_SQL, {"shelter_ids": shelter_ids})
+    connection.execute(_PRUNE_SQL, {"shelter_ids": shelter_ids})
+
+
+async def refresh_availability(db: AsyncSession, shelter_ids: Iterable[UUID]) -> None:
+    """
+    Refresh snapshot rows for writers that bypass the ORM flush (Core inserts/updates)
+    """
+    shelter_ids = list(set(shelter_ids))
+    if not shelter_ids:
+        return
+
+    await db.execute(_LOCK_SQL, {"shelter_ids": shelter_ids})
+    await db.execute(_REFRESH_SQL, {"shelter_ids": shelter_ids})
+    await db.execute(_PRUNE_SQL, {"shelter_ids": shelter_ids})
+
+
+async def rebuild_availability_snapshot(db: AsyncSession) -> None:
+    """
+    Rebuild the snapshot for every shelter with a status
+    """
+    result = await db.execute(select(ShelterStatus.shelter_id).distinct())
+    await refresh_availability(db, result.scalars().all())
+    await db.commit()
+
+
+def availability_match_criteria(category: Optional[str] = None, open: Optional[bool] = None):
+    """
+    Build a SQL predicate on the snapshot for category and effective open/closed filters
+    Staleness is evaluated against now() so the snapshot never serves expired OPEN data
+    """
+    snapshot = ShelterAvailability
+    now = func.now()
+
+    if category:
+        category_fresh = cast(
+            snapshot.categories[category]["stale_at"].astext, DateTime(timezone=True)
+        ) > now
+        category_open = and_(snapshot.open_categories.contains([category]), category_fresh)
+
+        if open is None:
+            return snapshot.categories.has_key(category)
+        if open:
+            return category_open
+        return and_(snapshot.categories.has_key(category), not_(category_open))
+
+    if open is None:
+        return true()
+    if open:
+        return snapshot.open_until > now
+    return or_(snapshot.has_closed_category, snapshot.stale_at <= now)
+
+
+def snapshot_statuses(snapshot: ShelterAvailability) -> List[Dict]:
+    """
+    Expand a snapshot row into status dicts with the conservatism rule applied
+    """
+    now = datetime.now(timezone.utc)
+    statuses = []
+
+    for category, entry in sorted(snapshot.categories.items()):
+        status = entry["status"]
+        stale_at = entry.get("stale_at")
+        if status in OPEN_STATUSES and stale_at and datetime.fromisoformat(stale_at) <= now:
+            status = "UNKNOWN"
+
+        statuses.append({
+            "id": entry["id"],
+            "shelter_id": snapshot.shelter_id,
+            "category": category,
+            "beds_total": entry["beds_total"],
+            "beds_available": entry["beds_available"],
+            "status": status,
+            "notes": entry.get("notes"),
+            "last_updated": entry["last_updated"],
+        })
+
+    return statuses
+
+
+# Refresh snapshot rows in the same transaction as ORM status and hold writes
+
+@event.listens_for(Session, "after_flush")
+def _refresh_changed_shelters(session: Session, flush_context) -> None:
+    changed = list(session.new) + list(session.dirty) + list(session.deleted)
+    shelter_ids = {
+        obj.shelter_id
+        for obj in changed
+        if isinstance(obj, (ShelterStatus, Hold)) and obj.shelter_id is not None
+    }
+    # Shelter edits only move refreshed_at, which backs Last-Modified on the list endpoints
+    shelter_ids.update(obj.id for obj in changed if isinstance(obj, Shelter) and obj.id is not None)
+    if shelter_ids:
+        refresh_availability_sync(session.connection(), shelter_ids)
@@ -0,0 +1,256 @@
+import heapq
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Resource, Shelter
+from app.services.geo import haversine_distances
+
+logger = logging.getLogger(__name__)
+
+# Kilometers per degree of latitude (Earth radius 6371 km)
+KM_PER_DEGREE = 6371 * math.pi / 180
+
+# Grid cell size in degrees (~5.5km of latitude)
+DEFAULT_CELL_DEG = 0.05
+
+
+class SpatialIndex:
+    """
+    In-memory geohash-style grid of point coordinates
+    Answers radius and k-nearest queries without a database round trip
+    """
+
+    def __init__(self, cell_deg: float = DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self.ready = False
+        self._cells: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float]]] = defaultdict(dict)
+        self._points: Dict[Hashable, Tuple[float, float]] = {}
+        # Per-cell key lists and (n, 2) coordinate arrays, rebuilt lazily after a cell changes
+        self._arrays: Dict[Tuple[int, int], Tuple[List[Hashable], np.ndarray]] = {}
+        # (min_row, max_row, min_col, max_col) over occupied cells; None until needed again
+        self._extent: Optional[Tuple[int, int, int, int]] = None
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def get(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        """
+        Return the (lat, lon) stored for a key
+        """
+        return self._points.get(key)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg)
+
+    def insert(self, key: Hashable, lat: float, lon: float) -> None:
+        """
+        Add or move a point
+        """
+        self.remove(key)
+        lat, lon = float(lat), float(lon)
+        cell = self._cell(lat, lon)
+        self._points[key] = (lat, lon)
+        self._cells[cell][key] = (lat, lon)
+        self._arrays.pop(cell, None)
+
+        if self._extent is not None:
+            min_row, max_row, min_col, max_col = self._extent
+            row, col = cell
+            self._extent = (min(min_row, row), max(max_row, row), min(min_col, col), max(max_col, col))
+
+    def remove(self, key: Hashable) -> None:
+        """
+        Remove a point if present
+        """
+        point = self._points.pop(key, None)
+        if point is None:
+            return
+
+        cell = self._cell(*point)
+        bucket = self._cells[cell]
+        bucket.pop(key, None)
+        self._arrays.pop(cell, None)
+        if not bucket:
+            del self._cells[cell]
+            self._extent = None
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._points.clear()
+        self._arrays.clear()
+        self._extent = None
+
+    def _cell_arrays(self, cell: Tuple[int, int]) -> Optional[Tuple[List[Hashable], np.ndarray]]:
+        bucket = self._cells.get(cell)
+        if not bucket:
+            return None
+        arrays = self._arrays.get(cell)
+        if arrays is None:
+            arrays = list(bucket.keys()), np.array(list(bucket.values()), dtype=np.float64)
+            self._arrays[cell] = arrays
+        return arrays
+
+    def _bounds(self) -> Tuple[int, int, int, int]:
+        if self._extent is None:
+            rows = [row for row, _ in self._cells]
+            cols = [col for _, col in self._cells]
+            self._extent = (min(rows), max(rows), min(cols), max(cols))
+        return self._extent
+
+    def _gather(self, cells) -> Tuple[List[Hashable], np.ndarray]:
+        """
+        Collect keys and an (n, 2) coordinate array from the given grid cells
+        """
+        keys: List[Hashable] = []
+        coords: List[np.ndarray] = []
+        for cell in cells:
+            arrays = self._cell_arrays(cell)
+            if arrays is not None:
+                keys.extend(arrays[0])
+                coords.append(arrays[1])
+        if not coords:
+            return keys, np.empty((0, 2), dtype=np.float64)
+        return keys, np.concatenate(coords)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[Hashable, float]]:
+        """
+        Return (key, distance_km) pairs within radius, sorted by distance
+        """
+        lat, lon = float(lat), float(lon)
+
+        # Widen the longitude span using the cosine at the band edge closest to a pole
+        dlat = radius_km / KM_PER_DEGREE
+        max_abs_lat = min(abs(lat) + dlat, 89.9)
+        dlon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(max_abs_lat)))
+
+        min_row, min_col = self._cell(lat - dlat, lon - dlon)
+        max_row, max_col = self._cell(lat + dlat, lon + dlon)
+
+        keys, coords = self._gather(
+            (row, col)
+            for row in range(min_row, max_row + 1)
+            for col in range(min_col, max_col + 1)
+        )
+        if not keys:
+            return []
+
+        distances = haversine_distances(lat, lon, coords)
+        order = np.argsort(distances, kind="stable")
+        order = order[distances[order] <= radius_km]
+        return [(keys[i], float(distances[i])) for i in order]
+
+    def nearest(self, lat: float, lon: float, k: int, max_km: Optional[float] = None) -> List[Tuple[Hashable, float]]:
+        """
+        Return the k closest (key, distance_km) pairs, sorted by distance
+        Scans rings of grid cells outward until no closer point can remain
+        """
+        if k <= 0 or not self._points:
+            return []
+
+        lat, lon = float(lat), float(lon)
+        origin_row, origin_col = self._cell(lat, lon)
+
+        # Smallest ground distance covered by one cell step at this latitude
+        cell_km = self.cell_deg * KM_PER_DEGREE * max(math.cos(math.radians(min(abs(lat) + 1, 89.9))), 0.01)
+
+        min_row, max_row, min_col, max_col = self._bounds()
+        max_ring = max(
+            abs(origin_row - min_row), abs(origin_row - max_row),
+            abs(origin_col - min_col), abs(origin_col - max_col),
+        )
+
+        heap: List[Tuple[float, Hashable]] = []  # max-heap of the best k via negated distance
+        for ring in range(max_ring + 1):
+            # Every point in this ring is at least (ring - 1) cells away
+            ring_floor_km = max(ring - 1, 0) * cell_km
+            if len(heap) == k and ring_floor_km > -heap[0][0]:
+                break
+            if max_km is not None and ring_floor_km > max_km:
+                break
+
+            keys, coords = self._gather(_ring_cells(origin_row, origin_col, ring))
+            if not keys:
+                continue
+
+            for key, distance in zip(keys, haversine_distances(lat, lon, coords).tolist()):
+                if max_km is not None and distance > max_km:
+                    continue
+                if len(heap) < k:
+                    heapq.heappush(heap, (-distance, key))
+                elif distance < -heap[0][0]:
+                    heapq.heapreplace(heap, (-distance, key))
+
+        return sorted(((key, -neg) for neg, key in heap), key=lambda m: m[1])
+
+
+def _ring_cells(row: int, col: int, ring: int):
+    """
+    Yield grid cells on the square ring at Chebyshev distance `ring`
+    """
+    if ring == 0:
+        yield row, col
+        return
+
+    for c in range(col - ring, col + ring + 1):
+        yield row - ring, c
+        yield row + ring, c
+    for r in range(row - ring + 1, row + ring):
+        yield r, col - ring
+        yield r, col + ring
+
+
+shelter_index = SpatialIndex()
+resource_index = SpatialIndex()
+
+_INDEXES = {Shelter: shelter_index, Resource: resource_index}
+
+
+async def build_spatial_indexes(db: AsyncSession) -> None:
+    """
+    Load all shelter and resource coordinates into the in-memory indexes
+    """
+    for model, index in _INDEXES.items():
+        result = await db.execute(select(model.id, model.lat, model.lon))
+        index.clear()
+        for row_id, lat, lon in result.all():
+            index.insert(row_id, lat, lon)
+        index.ready = True
+        logger.info("Built %s spatial index with %d points", model.__tablename__, len(index))
+
+
+# Keep the indexes in step with committed writes made through the ORM
+
+@event.listens_for(Session, "after_flush")
+def _collect_index_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault("spatial_index_changes", [])
+
+    for obj in list(session.new) + list(session.dirty):
+        index = _INDEXES.get(type(obj))
+        if index is not None:
+            pending.append((index, obj.id, obj.lat, obj.lon))
+
+    for obj in session.deleted:
+        index = _INDEXES.get(type(obj))
+        if index is not None:
+            pending.append((index, obj.id, None, None))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_index_changes(session: Session) -> None:
+    for index, key, lat, lon in session.info.pop("spatial_index_changes", []):
+        if lat is None:
+            index.remove(key)
+        else:
+            index.insert(key, lat, lon)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_index_changes(session: Session) -> None:
+    session.info.pop("spatial_index_changes", None)
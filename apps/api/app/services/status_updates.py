@@ -0,0 +1,159 @@
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, insert, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Shelter, ShelterStatus, Staff, StatusChange
+from app.models.sync import CHANGE_SEQ, CURRENT_XACT_ID
+from app.schemas.shelter import (
+    ShelterStatusBulkItem,
+    ShelterStatusBulkResult,
+    ShelterStatusResponse,
+)
+from app.services.availability import get_status_from_availability
+from app.services.cache import response_cache
+from app.services.events import event_bus, status_event
+from app.services.snapshot import refresh_availability
+
+
+def _can_edit(staff: Staff, shelter_id: UUID) -> bool:
+    return staff.role == "ADMIN" or staff.shelter_id == shelter_id
+
+
+def _merge(item: ShelterStatusBulkItem, current: Optional[ShelterStatus]) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    Merge a partial update onto the current row, returning (row, error)
+    """
+    beds_total = item.beds_total if item.beds_total is not None else getattr(current, "beds_total", None)
+    beds_available = item.beds_available if item.beds_available is not None else getattr(current, "beds_available", None)
+
+    if beds_total is None or beds_available is None:
+        return None, "beds_total and beds_available are required for a new status"
+
+    if beds_available > beds_total:
+        return None, "beds_available cannot exceed beds_total"
+
+    status = item.status
+    if status is None:
+        # Derive the status from bed counts when only counts were sent
+        if current is not None and item.beds_available is None and item.beds_total is None:
+            status = current.status
+        else:
+            status = get_status_from_availability(beds_available, beds_total)
+
+    return {
+        "shelter_id": item.shelter_id,
+        "category": item.category,
+        "beds_total": beds_total,
+        "beds_available": beds_available,
+        "status": status,
+        "notes": item.notes if item.notes is not None else getattr(current, "notes", None),
+    }, None
+
+
+async def apply_bulk_status_updates(
+    db: AsyncSession,
+    staff: Staff,
+    items: List[ShelterStatusBulkItem],
+) -> List[ShelterStatusBulkResult]:
+    """
+    Validate a batch of status updates together and apply the valid ones in one transaction
+    Uses one locking read, one multi-row upsert and one bulk audit insert
+    """
+    pairs = {(item.shelter_id, item.category) for item in items}
+    shelter_ids = {shelter_id for shelter_id, _ in pairs}
+
+    # Lock the current rows so concurrent batches serialize per shelter/category
+    result = await db.execute(
+        select(ShelterStatus)
+        .where(tuple_(ShelterStatus.shelter_id, ShelterStatus.category).in_(pairs))
+        .with_for_update()
+    )
+    current = {(s.shelter_id, s.category): s for s in result.scalars().all()}
+
+    result = await db.execute(select(Shelter.id).where(Shelter.id.in_(shelter_ids)))
+    known_shelters = set(result.scalars().all())
+
+    results: List[ShelterStatusBulkResult] = []
+    rows: List[Dict] = []
+    row_index: Dict[Tuple[UUID, str], int] = {}
+
+    for index, item in enumerate(items):
+        key = (item.shelter_id, item.category)
+        error = None
+        row = None
+
+        if key in row_index:
+            error = "Duplicate shelter/category in batch"
+        elif item.shelter_id not in known_shelters:
+            error = "Shelter not found"
+        elif not _can_edit(staff, item.shelter_id):
+            error = "Not allowed to update this shelter"
+        else:
+            row, error = _merge(item, current.get(key))
+
+        results.append(ShelterStatusBulkResult(
+            index=index,
+            shelter_id=item.shelter_id,
+            category=item.category,
+            success=error is None,
+            error=error,
+        ))
+        if row is not None:
+            row_index[key] = index
+            rows.append(row)
+
+    if not rows:
+        return results
+
+    upsert = pg_insert(ShelterStatus).values(rows)
+    upsert = upsert.on_conflict_do_update(
+        constraint="uq_shelter_status_shelter_category",
+        set_={
+            "beds_total": upsert.excluded.beds_total,
+            "beds_available": upsert.excluded.beds_available,
+            "status": upsert.excluded.status,
+            "notes": upsert.excluded.notes,
+            "last_updated": func.now(),
+            # ON CONFLICT DO UPDATE skips Column.onupdate, so bump the sync sequence here
+            "change_seq": CHANGE_SEQ.next_value(),
+            "change_xid": CURRENT_XACT_ID,
+        },
+    ).returning(*ShelterStatus.__table__.c)
+    written = (await db.execute(upsert)).mappings().all()
+
+    # Audit rows for every bed-count change, inserted as one executemany
+    changes = []
+    for row in rows:
+        previous = current.get((row["shelter_id"], row["category"]))
+        prev_available = previous.beds_available if previous is not None else 0
+        if previous is None or prev_available != row["beds_available"]:
+            changes.append({
+                "shelter_id": row["shelter_id"],
+                "category": row["category"],
+                "prev_available": prev_available,
+                "new_available": row["beds_available"],
+                "changed_by": staff.id,
+            })
+    if changes:
+        await db.execute(insert(StatusChange), changes)
+
+    # Core statements skip the ORM flush hooks, so refresh the snapshot explicitly
+    await refresh_availability(db, {row["shelter_id"] for row in rows})
+    await db.commit()
+
+    await response_cache.invalidate()
+
+    for row in written:
+        key = (row["shelter_id"], row["category"])
+        previous = current.get(key)
+        results[row_index[key]].status = ShelterStatusResponse.model_validate(dict(row))
+        event_bus.publish(status_event(
+            ShelterStatus(**row),
+            prev_available=previous.beds_available if previous is not None else 0,
+            prev_status=previous.status if previous is not None else "FULL",
+        ))
+
+    return results
@@ -0,0 +1,153 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, insert, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Resource, Shelter, ShelterStatus, SyncTombstone
+from app.schemas.resource import ResourceResponse
+from app.schemas.shelter import ShelterResponse, ShelterStatusResponse
+from app.services.availability import STALE_AFTER
+from app.services.serialization import response_columns
+
+SYNC_MAX_ROWS = int(os.getenv("SYNC_MAX_ROWS", "2000"))
+
+# Sync entity name -> (model, response schema)
+SYNCED = {
+    "shelters": (Shelter, ShelterResponse),
+    "statuses": (ShelterStatus, ShelterStatusResponse),
+    "resources": (Resource, ResourceResponse),
+}
+
+_ENTITY_NAMES = {model: name for name, (model, _) in SYNCED.items()}
+
+
+# Oldest transaction still running; everything older has committed or rolled back
+_SNAPSHOT_XMIN = literal_column("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+def parse_sync_token(token: Optional[str]) -> Tuple[int, Optional[int]]:
+    """
+    Decode a '<change_seq>.<xmin>' sync token; a missing token means a full download
+    Tokens from before the xmin part was added decode with xmin None
+    """
+    if not token:
+        return 0, None
+    seq, _, xmin = token.partition(".")
+    try:
+        since = int(seq)
+        since_xmin = int(xmin) if xmin else None
+    except ValueError:
+        raise ValueError("Invalid sync token")
+    if since < 0 or (since_xmin is not None and since_xmin < 0):
+        raise ValueError("Invalid sync token")
+    return since, since_xmin
+
+
+def format_sync_token(seq: int, xmin: int) -> str:
+    return f"{seq}.{xmin}"
+
+
+async def snapshot_xmin(db: AsyncSession) -> int:
+    """
+    Oldest in-flight transaction id; read it before any rows so the token never skips a write
+    """
+    return await db.scalar(select(_SNAPSHOT_XMIN))
+
+
+async def changes_since(
+    db: AsyncSession,
+    since: int,
+    since_xmin: Optional[int] = None,
+    max_rows: int = SYNC_MAX_ROWS,
+) -> Dict[str, Any]:
+    """
+    Collect rows created or updated, and ids deleted, after a change sequence value
+    Rows at or below since that were written by transactions in flight at the last token
+    (change_xid >= since_xmin) are sent again, since their sequence value was taken before commit
+    When any entity has more than max_rows changes the batch stops at a common
+    sequence value and has_more is set so the client keeps pulling
+    """
+    xmin = await snapshot_xmin(db)
+
+    changed: Dict[str, List[Dict[str, Any]]] = {}
+    late: Dict[str, List[Dict[str, Any]]] = {}
+    for name, (model, schema) in SYNCED.items():
+        result = await db.execute(
+            select(*response_columns(model, schema), model.change_seq)
+            .where(model.change_seq > since)
+            .order_by(model.change_seq)
+            .limit(max_rows + 1)
+        )
+        changed[name] = [dict(row) for row in result.mappings()]
+
+        late[name] = []
+        if since_xmin is not None:
+            result = await db.execute(
+                select(*response_columns(model, schema))
+                .where(model.change_seq <= since, model.change_xid >= since_xmin)
+            )
+            late[name] = [dict(row) for row in result.mappings()]
+
+    tombstone_columns = (SyncTombstone.entity, SyncTombstone.entity_id, SyncTombstone.change_seq)
+    result = await db.execute(
+        select(*tombstone_columns)
+        .where(SyncTombstone.change_seq > since)
+        .order_by(SyncTombstone.change_seq)
+        .limit(max_rows + 1)
+    )
+    tombstones = result.all()
+
+    late_tombstones = []
+    if since_xmin is not None:
+        result = await db.execute(
+            select(*tombstone_columns)
+            .where(SyncTombstone.change_seq <= since, SyncTombstone.change_xid >= since_xmin)
+        )
+        late_tombstones = result.all()
+
+    # Cut every entity at the lowest sequence value reached by a truncated one
+    batches = [[row["change_seq"] for row in rows] for rows in changed.values()]
+    batches.append([row.change_seq for row in tombstones])
+    truncated = [seqs[max_rows - 1] for seqs in batches if len(seqs) > max_rows]
+    upper = min(truncated) if truncated else None
+
+    token = since
+    deleted: Dict[str, List] = {name: [] for name in SYNCED}
+    for entity, entity_id, _ in late_tombstones:
+        deleted[entity].append(entity_id)
+    for entity, entity_id, seq in tombstones:
+        if upper is None or seq <= upper:
+            token = max(token, seq)
+            deleted[entity].append(entity_id)
+
+    payload: Dict[str, Any] = {}
+    for name, rows in changed.items():
+        kept = late[name]
+        for row in rows:
+            seq = row.pop("change_seq")
+            if upper is None or seq <= upper:
+                token = max(token, seq)
+                kept.append(row)
+        payload[name] = kept
+
+    payload["deleted"] = deleted
+    payload["token"] = format_sync_token(token, xmin)
+    payload["has_more"] = upper is not None
+    # Statuses go stale without a write, so clients apply the conservatism rule locally
+    payload["stale_after_seconds"] = int(STALE_AFTER.total_seconds())
+    return payload
+
+
+# Deletes leave a tombstone in the same transaction so clients can drop the row
+
+@event.listens_for(Session, "after_flush")
+def _record_tombstones(session: Session, flush_context) -> None:
+    rows = [
+        {"entity": _ENTITY_NAMES[type(obj)], "entity_id": obj.id}
+        for obj in session.deleted
+        if type(obj) in _ENTITY_NAMES
+    ]
+    if rows:
+        session.connection().execute(insert(SyncTombstone), rows)
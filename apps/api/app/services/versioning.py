@@ -0,0 +1,100 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Resource, Shelter, ShelterAvailability, ShelterStatus, SyncTombstone
+from app.services.availability import STALE_AFTER
+
+
+async def status_version(
+    db: AsyncSession,
+    filters: str = "",
+    shelter_id: Optional[UUID] = None,
+) -> Tuple[str, Optional[datetime]]:
+    """
+    Compute a cheap (ETag, Last-Modified) pair for shelter status data from index-backed lookups
+    The token covers the newest shelter, status and delete (tombstone) change_seq, the newest
+    snapshot refresh (holds), the next status due to go stale, plus the caller's filter set
+    """
+    stale_cutoff = func.now() - STALE_AFTER
+    statuses = select(ShelterStatus)
+    snapshots = select(ShelterAvailability)
+    shelters = select(Shelter)
+    if shelter_id is not None:
+        statuses = statuses.where(ShelterStatus.shelter_id == shelter_id)
+        snapshots = snapshots.where(ShelterAvailability.shelter_id == shelter_id)
+        shelters = shelters.where(Shelter.id == shelter_id)
+
+    columns = [
+        statuses.with_only_columns(func.max(ShelterStatus.last_updated)).scalar_subquery(),
+        snapshots.with_only_columns(func.max(ShelterAvailability.refreshed_at)).scalar_subquery(),
+        statuses.with_only_columns(func.max(ShelterStatus.change_seq)).scalar_subquery(),
+        shelters.with_only_columns(func.max(Shelter.change_seq)).scalar_subquery(),
+        statuses.with_only_columns(func.min(ShelterStatus.last_updated))
+        .where(ShelterStatus.last_updated >= stale_cutoff)
+        .scalar_subquery(),
+    ]
+    if shelter_id is None:
+        columns.append(select(func.max(SyncTombstone.change_seq)).scalar_subquery())
+    else:
+        # A removed category only shows up in this shelter's row count
+        columns.append(statuses.with_only_columns(func.count()).scalar_subquery())
+
+    row = (await db.execute(select(*columns))).one()
+    # The snapshot is refreshed by holds and shelter edits, which leave last_updated alone
+    last_modified = max((moment for moment in row[:2] if moment is not None), default=None)
+
+    token = "|".join(str(part) for part in (*row, filters))
+    etag = f'W/"{hashlib.sha1(token.encode()).hexdigest()[:20]}"'
+    return etag, last_modified
+
+
+async def resource_version(db: AsyncSession) -> int:
+    """
+    Newest resource or delete change_seq, for keying cached resource lists
+    """
+    newest = [select(func.max(model.change_seq)).scalar_subquery() for model in (Resource, SyncTombstone)]
+    return await db.scalar(select(func.coalesce(func.greatest(*newest), 0)))
+
+
+def version_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    """
+    Build ETag/Last-Modified response headers
+    """
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_not_modified(
+    etag: str,
+    last_modified: Optional[datetime],
+    if_none_match: Optional[str],
+    if_modified_since: Optional[str],
+) -> bool:
+    """
+    Evaluate conditional request headers (If-None-Match takes precedence)
+    """
+    if if_none_match:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison: W/"x" and "x" match
+        bare = etag[2:] if etag.startswith("W/") else etag
+        return "*" in candidates or etag in candidates or bare in candidates
+
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+
+    return False
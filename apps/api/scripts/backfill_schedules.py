@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Parse free-text hours into open_schedule for shelters and resources that have none,
+e.g. after the open_schedule migration on an existing database
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import AsyncSessionLocal
+from app.services.schedules import backfill_schedules
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        counts = await backfill_schedules(session)
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ Schedules backfilled in {elapsed:.2f}s")
+    for table, updated in counts.items():
+        print(f"   {table}: {updated} rows")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
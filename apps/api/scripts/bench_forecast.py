@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark fitting and scoring the occupancy forecasts on synthetic history
+Fits 1k, 5k and 20k shelter/category series from 56 days of bed updates,
+then times scoring every series at one hour of the week
+"""
+
+import random
+import sys
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+
+from app.services.forecast import Forecaster, fit_profiles, hourly_grid
+from app.services.hours import LOCAL_TIMEZONE
+
+SIZES = [1_000, 5_000, 20_000]
+HISTORY_DAYS = 56
+UPDATES_PER_DAY = 6
+SCORES = 200
+
+
+def synthetic_history(rng: np.random.Generator, n_series: int, seconds: int):
+    """
+    Random step-wise bed counts: an anchor at 0 plus UPDATES_PER_DAY changes per series per day
+    """
+    n_changes = n_series * HISTORY_DAYS * UPDATES_PER_DAY
+    series = np.concatenate([np.arange(n_series), rng.integers(0, n_series, n_changes)])
+    offsets = np.concatenate([np.zeros(n_series, dtype=np.int64), rng.integers(0, seconds, n_changes)])
+    values = np.concatenate([rng.integers(0, 20, n_series), rng.integers(0, 20, n_changes)])
+    return series, offsets, values
+
+
+def check_pattern(start: datetime, end: datetime, grid, buckets, weights):
+    """
+    A shelter that is full every evening from 8pm to midnight should forecast no bed at 9pm
+    """
+    offsets, values = [0], [5]
+    day = start.astimezone(LOCAL_TIMEZONE).replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        for hour, beds in ((20, 0), (24, 5)):
+            moment = day + timedelta(hours=hour)
+            offset = int((moment - start).total_seconds())
+            if 0 < offset < grid[-1]:
+                offsets.append(offset)
+                values.append(beds)
+        day += timedelta(days=1)
+
+    expected, p_bed = fit_profiles(
+        np.zeros(len(offsets), dtype=np.int64), np.array(offsets), np.array(values), 1, grid, buckets, weights
+    )
+    forecaster = Forecaster()
+    shelter_id = uuid4()
+    forecaster.load([(shelter_id, "MEN")], expected, p_bed, end)
+
+    nine_pm = datetime(2026, 10, 21, 21, tzinfo=LOCAL_TIMEZONE)
+    noon = nine_pm.replace(hour=12)
+    at_nine = forecaster.for_shelters([shelter_id], nine_pm)[shelter_id]["MEN"]
+    at_noon = forecaster.for_shelters([shelter_id], noon)[shelter_id]["MEN"]
+    assert at_nine == {"beds_expected": 0.0, "p_available": 0.0}, at_nine
+    assert at_noon == {"beds_expected": 5.0, "p_available": 1.0}, at_noon
+
+
+def main():
+    rng = np.random.default_rng(42)
+    end = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=HISTORY_DAYS)
+    grid, buckets, weights = hourly_grid(start, end)
+
+    check_pattern(start, end, grid, buckets, weights)
+    print("✅ Evening-full pattern forecasts no bed at 9pm and a bed at noon")
+
+    print(f"{'series':>8} {'changes':>10} {'fit s':>8} {'score ms':>9} {'lookup ms':>10}")
+    for size in SIZES:
+        series, offsets, values = synthetic_history(rng, size, int(grid[-1]))
+
+        began = time.perf_counter()
+        expected, p_bed = fit_profiles(series, offsets, values, size, grid, buckets, weights)
+        fit_s = time.perf_counter() - began
+
+        forecaster = Forecaster()
+        keys = [(uuid4(), "MIXED") for _ in range(size)]
+        forecaster.load(keys, expected, p_bed, end)
+
+        moments = [end + timedelta(hours=random.randrange(168)) for _ in range(SCORES)]
+        began = time.perf_counter()
+        for moment in moments:
+            forecaster.score(moment)
+        score_ms = (time.perf_counter() - began) / SCORES * 1000
+
+        # Full per-shelter dicts, as the list endpoint attaches them
+        shelter_ids = [key[0] for key in keys]
+        began = time.perf_counter()
+        forecaster.for_shelters(shelter_ids, moments[0])
+        lookup_ms = (time.perf_counter() - began) * 1000
+
+        print(f"{size:>8} {len(series):>10} {fit_s:>8.2f} {score_ms:>9.3f} {lookup_ms:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark neighborhood resolution: per-point lookups versus the vectorized batch API
+Resolves random LA County points against the configured NEIGHBORHOODS_GEOJSON boundaries
+"""
+
+import random
+import sys
+import os
+import time
+from collections import Counter
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.neighborhoods import get_resolver, resolve_neighborhoods
+
+# Rough LA County bounding box
+LAT_RANGE = (33.70, 34.45)
+LON_RANGE = (-118.70, -117.90)
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+def main():
+    rng = random.Random(42)
+    resolver = get_resolver()
+    print(f"Loaded {len(resolver)} neighborhoods")
+    print(f"{'points':>8} {'single us/pt':>13} {'batch us/pt':>12} {'speedup':>8}")
+
+    for size in SIZES:
+        points = [(rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)) for _ in range(size)]
+
+        start = time.perf_counter()
+        single = [resolver.resolve(lat, lon) for lat, lon in points]
+        single_us = (time.perf_counter() - start) / size * 1_000_000
+
+        start = time.perf_counter()
+        batch = resolve_neighborhoods(points)
+        batch_us = (time.perf_counter() - start) / size * 1_000_000
+
+        assert single == batch, "Batch and single lookups disagree"
+        print(f"{size:>8} {single_us:>13.2f} {batch_us:>12.2f} {single_us / batch_us:>7.1f}x")
+
+    print("Most common:", Counter(batch).most_common(5))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Compare JSON and MessagePack shelter list payloads
+Reports encoded size, gzip size and client-side decode time for the same rows
+"""
+
+import gzip
+import json
+import random
+import sys
+import os
+import time
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import msgpack
+
+from app.services.binary import SHELTER_FIELDS, pack_rows
+from app.services.serialization import dumps, row_dicts
+from bench_serialization import fake_rows
+
+SIZES = [50, 500, 5_000]
+ROUNDS = 50
+
+
+def decode_ms(fn, payload: bytes) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(payload)
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'rows':>6} {'format':>8} {'bytes':>10} {'gzip':>9} {'decode ms':>10}")
+
+    for size in SIZES:
+        shelters = row_dicts(fake_rows(rng, size))
+        for shelter in shelters:
+            shelter["distance_km"] = round(rng.uniform(0, 10), 3)
+
+        for label, payload, decode in [
+            ("json", dumps(shelters), json.loads),
+            ("msgpack", pack_rows(SHELTER_FIELDS, shelters), msgpack.unpackb),
+        ]:
+            compressed = len(gzip.compress(payload))
+            print(f"{size:>6} {label:>8} {len(payload):>10} {compressed:>9} {decode_ms(decode, payload):>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark recommendation scoring over synthetic candidate pools
+Times feature extraction, vectorized scoring and top-k for 1k, 10k and 50k
+candidates against the 50 ms budget, after a few ranking sanity checks
+"""
+
+import random
+import sys
+import os
+import time
+from datetime import datetime, time as clock, timedelta, timezone
+from uuid import uuid4
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.hours import LOCAL_TIMEZONE
+from app.services.recommend import DEFAULT_WEIGHTS, candidate_features, score_candidates, top_k
+
+SIZES = [1_000, 10_000, 50_000]
+RADIUS_KM = 40.0
+K = 10
+BUDGET_MS = 50
+REPEATS = 20
+
+
+def synthetic_row(rng: random.Random, now: datetime):
+    return {
+        "id": uuid4(),
+        "beds": rng.choice([0, 0, 1, 2, 5, 12]),
+        "exact": rng.random() < 0.5,
+        "served": True,
+        "updated": (now - timedelta(minutes=rng.randrange(0, 24 * 60))).timestamp(),
+        "requires_id": rng.random() < 0.3,
+        "pet_friendly": rng.random() < 0.2,
+        "ada_accessible": rng.random() < 0.6,
+        "lgbtq_friendly": rng.random() < 0.4,
+        "curfew_time": rng.choice([None, clock(21), clock(22), clock(23)]),
+    }
+
+
+def check_ranking(now: datetime):
+    """
+    Beds and distance both count, and a shelter past its curfew scores 0 on that factor
+    """
+    base = {"exact": True, "served": True, "updated": now.timestamp(), "requires_id": False,
+            "pet_friendly": False, "ada_accessible": False, "lgbtq_friendly": False, "curfew_time": None}
+    rows = [
+        {**base, "id": "near-open", "beds": 5},
+        {**base, "id": "far-open", "beds": 5},
+        {**base, "id": "near-full", "beds": 0},
+        {**base, "id": "near-curfew", "beds": 5, "curfew_time": clock(21)},
+    ]
+    distances = {"near-open": 1.0, "far-open": 20.0, "near-full": 1.0, "near-curfew": 1.0}
+    features = candidate_features(rows, distances)
+
+    late = datetime(2026, 10, 21, 23, 30, tzinfo=LOCAL_TIMEZONE)
+    score, factors = score_candidates(features, radius_km=RADIUS_KM, weights=DEFAULT_WEIGHTS, category="MEN", now=late)
+    order = [rows[i]["id"] for i in top_k(score, features["distance_km"], len(rows))]
+    assert order[0] == "near-open", order
+    assert order.index("far-open") < order.index("near-full"), order
+    assert factors["curfew"][3] == 0.0, factors["curfew"]
+
+
+def main():
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+
+    check_ranking(now)
+    print("✅ Ranking sanity checks passed")
+
+    print(f"{'candidates':>10} {'features ms':>12} {'score ms':>9} {'top-k ms':>9} {'total ms':>9}")
+    for size in SIZES:
+        rows = [synthetic_row(rng, now) for _ in range(size)]
+        distances = {row["id"]: rng.uniform(0, RADIUS_KM) for row in rows}
+
+        timings = [0.0, 0.0, 0.0]
+        for _ in range(REPEATS):
+            began = time.perf_counter()
+            features = candidate_features(rows, distances)
+            extracted = time.perf_counter()
+            needs = [features["pet_friendly"], ~features["requires_id"]]
+            score, _ = score_candidates(
+                features, radius_km=RADIUS_KM, weights=DEFAULT_WEIGHTS, category="WOMEN", needs=needs, now=now
+            )
+            scored = time.perf_counter()
+            top_k(score, features["distance_km"], K)
+            ranked = time.perf_counter()
+
+            timings[0] += extracted - began
+            timings[1] += scored - extracted
+            timings[2] += ranked - scored
+
+        features_ms, score_ms, top_ms = (t / REPEATS * 1000 for t in timings)
+        total_ms = features_ms + score_ms + top_ms
+        mark = "✅" if total_ms < BUDGET_MS else "⚠️"
+        print(f"{size:>10} {features_ms:>12.2f} {score_ms:>9.2f} {top_ms:>9.2f} {total_ms:>9.2f} {mark}")
+
+
+if __name__ == "__main__":
+    main()
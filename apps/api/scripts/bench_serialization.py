@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark shelter list serialization: ORM entities validated through ShelterResponse
+versus plain Core row dicts encoded with orjson
+Reports the per-row cost at 5k shelters and checks both paths emit the same JSON
+"""
+
+import json
+import random
+import sys
+import os
+import time
+from datetime import time as dt_time
+from decimal import Decimal
+from typing import List
+from uuid import uuid4
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from pydantic import TypeAdapter
+
+from app.models import Shelter
+from app.schemas.shelter import ShelterResponse
+from app.services.serialization import dumps, response_columns, row_dicts
+
+ROWS = 5_000
+ROUNDS = 20
+
+NEIGHBORHOODS = ["Downtown LA", "Skid Row", "Hollywood", "Venice", "Koreatown", "Long Beach"]
+
+
+def fake_rows(rng: random.Random, count: int):
+    columns = [c.name for c in response_columns(Shelter, ShelterResponse)]
+    rows = []
+    for i in range(count):
+        row = {
+            "id": uuid4(),
+            "name": f"Shelter {i}",
+            "address": f"{rng.randint(1, 9999)} Main St, Los Angeles, CA 900{rng.randint(10, 99)}",
+            "lat": Decimal(f"{rng.uniform(33.70, 34.45):.8f}"),
+            "lon": Decimal(f"{rng.uniform(-118.70, -117.90):.8f}"),
+            "neighborhood": rng.choice(NEIGHBORHOODS),
+            "phone": "(213) 555-0100",
+            "hours": "24/7",
+            "website": None,
+            "requires_id": rng.random() < 0.3,
+            "pet_friendly": rng.random() < 0.2,
+            "ada_accessible": rng.random() < 0.7,
+            "lgbtq_friendly": rng.random() < 0.5,
+            "curfew_time": dt_time(22, 0),
+            "intake_notes": "Walk-ins welcome",
+            "languages": ["English", "Spanish"],
+        }
+        rows.append({name: row[name] for name in columns})
+    return rows
+
+
+def orm_path(rows, adapter: TypeAdapter) -> bytes:
+    # Stand-in for hydration: build instrumented entities, then validate from attributes
+    shelters = []
+    for row in rows:
+        shelter = Shelter(**row)
+        shelter.distance_km = 1.5
+        shelters.append(shelter)
+    return adapter.dump_json(adapter.validate_python(shelters))
+
+
+def core_path(rows) -> bytes:
+    shelters = row_dicts(rows)
+    for shelter in shelters:
+        shelter["distance_km"] = 1.5
+    return dumps(shelters)
+
+
+def per_row_us(fn, rows) -> float:
+    fn(rows)
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn(rows)
+    return (time.perf_counter() - start) / ROUNDS / len(rows) * 1_000_000
+
+
+def main():
+    rng = random.Random(42)
+    rows = fake_rows(rng, ROWS)
+    adapter = TypeAdapter(List[ShelterResponse])
+
+    assert json.loads(orm_path(rows, adapter)) == json.loads(core_path(rows)), "Serialized output differs"
+
+    before = per_row_us(lambda r: orm_path(r, adapter), rows)
+    after = per_row_us(core_path, rows)
+
+    print(f"{'rows':>6} {'ORM + pydantic us/row':>22} {'Core + orjson us/row':>21} {'speedup':>8}")
+    print(f"{ROWS:>6} {before:>22.2f} {after:>21.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-memory spatial index against the linear calculate_distance loop
+(the original scalar Haversine) and a full vectorized haversine_distances scan
+Runs radius and k-nearest queries over 1k, 10k and 100k random LA County points,
+after checking the vectorized kernel agrees with the scalar one
+"""
+
+import random
+import sys
+import os
+import time
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+
+from app.services.geo import calculate_distance, haversine_distances
+from app.services.spatial_index import SpatialIndex
+
+# Rough LA County bounding box
+LAT_RANGE = (33.70, 34.45)
+LON_RANGE = (-118.70, -117.90)
+
+SIZES = [1_000, 10_000, 100_000]
+QUERIES = 200
+RADIUS_KM = 5.0
+K = 10
+
+
+def random_point(rng: random.Random):
+    return rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+
+
+def linear_within(points, lat, lon, radius_km):
+    matches = []
+    for key, (p_lat, p_lon) in points.items():
+        distance = calculate_distance(lat, lon, p_lat, p_lon)
+        if distance <= radius_km:
+            matches.append((key, distance))
+    matches.sort(key=lambda m: m[1])
+    return matches
+
+
+def linear_nearest(points, lat, lon, k):
+    distances = [
+        (key, calculate_distance(lat, lon, p_lat, p_lon))
+        for key, (p_lat, p_lon) in points.items()
+    ]
+    distances.sort(key=lambda m: m[1])
+    return distances[:k]
+
+
+def vectorized_within(keys, coords, lat, lon, radius_km):
+    distances = haversine_distances(lat, lon, coords)
+    order = np.argsort(distances)
+    order = order[distances[order] <= radius_km]
+    return [(keys[i], distances[i]) for i in order]
+
+
+def vectorized_nearest(keys, coords, lat, lon, k):
+    distances = haversine_distances(lat, lon, coords)
+    order = np.argpartition(distances, min(k, len(keys) - 1))[:k]
+    order = order[np.argsort(distances[order])]
+    return [(keys[i], distances[i]) for i in order]
+
+
+def time_per_query(fn, origins):
+    start = time.perf_counter()
+    for lat, lon in origins:
+        fn(lat, lon)
+    return (time.perf_counter() - start) / len(origins) * 1000
+
+
+def check_kernels(rng: random.Random, count: int = 10_000):
+    """
+    haversine_distances matches calculate_distance, and the per-pair cost of each
+    """
+    lat, lon = random_point(rng)
+    points = [random_point(rng) for _ in range(count)]
+    coords = np.array(points, dtype=np.float64)
+
+    start = time.perf_counter()
+    scalar = [calculate_distance(lat, lon, p_lat, p_lon) for p_lat, p_lon in points]
+    scalar_us = (time.perf_counter() - start) / count * 1_000_000
+
+    start = time.perf_counter()
+    vectorized = haversine_distances(lat, lon, coords)
+    vectorized_us = (time.perf_counter() - start) / count * 1_000_000
+
+    assert np.allclose(scalar, vectorized, rtol=0, atol=1e-9), "Vectorized and scalar Haversine disagree"
+    print(f"✅ Kernels agree; scalar {scalar_us:.3f} us/pair, vectorized {vectorized_us:.3f} us/pair")
+
+
+def main():
+    rng = random.Random(42)
+    check_kernels(rng)
+    print(f"{'points':>8} {'query':>8} {'linear ms':>11} {'numpy ms':>10} {'index ms':>10} {'speedup':>8}")
+
+    for size in SIZES:
+        points = {i: random_point(rng) for i in range(size)}
+        keys = list(points)
+        coords = np.array([points[key] for key in keys], dtype=np.float64)
+        index = SpatialIndex()
+        for key, (lat, lon) in points.items():
+            index.insert(key, lat, lon)
+
+        origins = [random_point(rng) for _ in range(QUERIES)]
+
+        # The linear loop is slow at 100k, so sample fewer origins for it
+        linear_origins = origins[: max(5, QUERIES * 1_000 // size)]
+
+        for label, linear_fn, numpy_fn, index_fn in [
+            (f"r={RADIUS_KM:g}km",
+             lambda lat, lon: linear_within(points, lat, lon, RADIUS_KM),
+             lambda lat, lon: vectorized_within(keys, coords, lat, lon, RADIUS_KM),
+             lambda lat, lon: index.within(lat, lon, RADIUS_KM)),
+            (f"k={K}",
+             lambda lat, lon: linear_nearest(points, lat, lon, K),
+             lambda lat, lon: vectorized_nearest(keys, coords, lat, lon, K),
+             lambda lat, lon: index.nearest(lat, lon, K)),
+        ]:
+            linear_ms = time_per_query(linear_fn, linear_origins)
+            numpy_ms = time_per_query(numpy_fn, origins)
+            index_ms = time_per_query(index_fn, origins)
+            print(f"{size:>8} {label:>8} {linear_ms:>11.3f} {numpy_ms:>10.3f} {index_ms:>10.3f} {linear_ms / index_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Build the offline directory bundle once
+For cron or CI jobs that publish bundles to a CDN instead of the in-process builder
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import AsyncSessionLocal
+from app.services.bundle import BUNDLE_DIR, build_bundle
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output-dir", default=BUNDLE_DIR)
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        manifest = await build_bundle(session, bundle_dir=args.output_dir)
+
+    if manifest.get("skipped"):
+        print("⏭️  Another worker is building the bundle; nothing done")
+        return
+
+    counts = ", ".join(f"{count} {name}" for name, count in manifest["counts"].items())
+    print(f"✅ Built {manifest['file']} ({manifest['size']} bytes gzip, {manifest['uncompressed_size']} raw)")
+    print(f"Contains {counts}; sync token {manifest['sync_token']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Check the opening-hours parser against every hours string in the seed data and the
+bundled shelter imports, plus hand-written edge cases with known schedules
+Exits non-zero on any mismatch so it can run in CI
+"""
+
+import argparse
+import ast
+import glob
+import json
+import sys
+import os
+from datetime import datetime, time
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.hours import MINUTES_PER_DAY, is_open_at, minute_of_week, parse_hours, schedule_for
+
+SEED_SCRIPT = os.path.join(os.path.dirname(__file__), "seed_data.py")
+IMPORT_DATA = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data", "*.json")
+
+DAY = MINUTES_PER_DAY
+WEEK = 7 * DAY
+
+
+def daily(start: int, end: int, days=range(7)):
+    return [(d * DAY + start, d * DAY + end) for d in days]
+
+
+def hm(hour: int, minute: int = 0) -> int:
+    return hour * 60 + minute
+
+
+# hours text -> expected merged weekly intervals (None = unparseable)
+EXPECTED = {
+    # Seed shelters and resources
+    "24/7": [(0, WEEK)],
+    "8:00 AM - 8:00 PM": daily(hm(8), hm(20)),
+    "9:00 AM - 6:00 PM": daily(hm(9), hm(18)),
+    "8:00 AM - 5:00 PM": daily(hm(8), hm(17)),
+    "8:00 AM - 4:00 PM": daily(hm(8), hm(16)),
+    "9:00 AM - 3:00 PM, Tue/Thu/Sat": daily(hm(9), hm(15), days=(1, 3, 5)),
+    "10:00 AM - 6:00 PM (during heat waves)": daily(hm(10), hm(18)),
+    "6:00 PM - 7:00 AM": [(0, hm(7))] + [(d * DAY + hm(18), (d + 1) * DAY + hm(7)) for d in range(6)] + [(6 * DAY + hm(18), WEEK)],
+    # Bundled shelter imports
+    "7:00 PM - 7:00 AM": [(0, hm(7))] + [(d * DAY + hm(19), (d + 1) * DAY + hm(7)) for d in range(6)] + [(6 * DAY + hm(19), WEEK)],
+    "6:00 PM - 8:00 AM": [(0, hm(8))] + [(d * DAY + hm(18), (d + 1) * DAY + hm(8)) for d in range(6)] + [(6 * DAY + hm(18), WEEK)],
+    # Formats seen in provider listings
+    "Mon-Fri 9am-5pm; Sat 10am-2pm": daily(hm(9), hm(17), days=range(5)) + daily(hm(10), hm(14), days=(5,)),
+    "Mon, Wed, Fri 9-5": daily(hm(9), hm(17), days=(0, 2, 4)),
+    "Weekdays 8am to 4pm": daily(hm(8), hm(16), days=range(5)),
+    "Mon–Fri 8:30am–4:30pm": daily(hm(8, 30), hm(16, 30), days=range(5)),
+    "Sat-Sun 10:00-14:00": daily(hm(10), hm(14), days=(5, 6)),
+    "Fri-Mon 9am-5pm": daily(hm(9), hm(17), days=(0, 4, 5, 6)),
+    "9-5pm": daily(hm(9), hm(17)),
+    "8-11pm": daily(hm(20), hm(23)),
+    "9am-5": daily(hm(9), hm(17)),
+    "noon - midnight": daily(hm(12), DAY),
+    "19:00-07:00": [(0, hm(7))] + [(d * DAY + hm(19), (d + 1) * DAY + hm(7)) for d in range(6)] + [(6 * DAY + hm(19), WEEK)],
+    "Sun 6pm-8am": [(0, hm(8)), (6 * DAY + hm(18), WEEK)],
+    "Open 24 hours": [(0, WEEK)],
+    "Daily 7am-7pm": daily(hm(7), hm(19)),
+    "Closed": [],
+    "call for hours": None,
+    "": None,
+}
+
+# (hours, curfew) -> expected schedule once the nightly no-entry window is removed
+CURFEW_CASES = {
+    ("24/7", time(22, 0)): daily(hm(6), hm(22)),
+    ("8:00 AM - 8:00 PM", time(20, 0)): daily(hm(8), hm(20)),
+    ("8:00 AM - 8:00 PM", time(18, 0)): daily(hm(8), hm(18)),
+    ("6:00 PM - 7:00 AM", time(23, 0)): sorted(daily(hm(6), hm(7)) + daily(hm(18), hm(23))),
+    ("9:00 AM - 6:00 PM", None): daily(hm(9), hm(18)),
+}
+
+# (hours, local time) -> expected is_open_at; 2026-10-19 is a Monday
+OPEN_AT_CASES = [
+    ("8:00 AM - 8:00 PM", datetime(2026, 10, 19, 7, 59), False),
+    ("8:00 AM - 8:00 PM", datetime(2026, 10, 19, 8, 0), True),
+    ("8:00 AM - 8:00 PM", datetime(2026, 10, 19, 20, 0), False),
+    ("9:00 AM - 3:00 PM, Tue/Thu/Sat", datetime(2026, 10, 19, 10, 0), False),
+    ("9:00 AM - 3:00 PM, Tue/Thu/Sat", datetime(2026, 10, 20, 10, 0), True),
+    ("6:00 PM - 7:00 AM", datetime(2026, 10, 19, 6, 30), True),
+    ("6:00 PM - 7:00 AM", datetime(2026, 10, 25, 23, 30), True),
+    ("6:00 PM - 7:00 AM", datetime(2026, 10, 19, 12, 0), False),
+]
+
+
+def seed_hours():
+    """
+    (hours, curfew) pairs from the dict literals in seed_data.py, read without importing it
+    """
+    with open(SEED_SCRIPT) as f:
+        tree = ast.parse(f.read())
+
+    pairs = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Dict):
+            continue
+        fields = {
+            key.value: value
+            for key, value in zip(node.keys, node.values)
+            if isinstance(key, ast.Constant)
+        }
+        if not isinstance(fields.get("hours"), ast.Constant):
+            continue
+        curfew = None
+        call = fields.get("curfew_time")
+        if isinstance(call, ast.Call) and getattr(call.func, "id", None) == "time":
+            curfew = time(*(arg.value for arg in call.args))
+        pairs.append((fields["hours"].value, curfew))
+    return pairs
+
+
+def import_hours():
+    hours = []
+    for path in sorted(glob.glob(IMPORT_DATA)):
+        with open(path) as f:
+            hours.extend(record["hours"] for record in json.load(f) if record.get("hours"))
+    return hours
+
+
+def check(label, actual, expected, failures):
+    if actual != expected:
+        failures.append(f"{label}\n    expected {expected}\n    got      {actual}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--verbose", action="store_true", help="Print every parsed schedule")
+    args = parser.parse_args()
+
+    failures = []
+
+    seed = seed_hours()
+    corpus = sorted({hours for hours, _ in seed} | set(import_hours()))
+    print(f"Corpus: {len(seed)} seed records, {len(corpus)} distinct hours strings")
+
+    # Every real-world string must parse, and match its expectation when one is recorded
+    for hours in corpus:
+        parsed = parse_hours(hours)
+        if parsed is None:
+            failures.append(f"{hours!r}: could not be parsed")
+        elif hours in EXPECTED:
+            check(repr(hours), parsed, EXPECTED[hours], failures)
+        else:
+            failures.append(f"{hours!r}: parsed but has no expected schedule in EXPECTED")
+        if args.verbose:
+            print(f"  {hours!r}: {parsed}")
+
+    for hours, expected in EXPECTED.items():
+        check(repr(hours), parse_hours(hours), expected, failures)
+
+    # Seed shelters with a curfew must still have some intake window
+    for hours, curfew in seed:
+        if curfew is not None and not schedule_for(hours, curfew):
+            failures.append(f"{hours!r} with curfew {curfew}: no open window left")
+
+    for (hours, curfew), expected in CURFEW_CASES.items():
+        check(f"{hours!r} with curfew {curfew}", schedule_for(hours, curfew), expected, failures)
+
+    for hours, moment, expected in OPEN_AT_CASES:
+        check(f"{hours!r} at {moment:%a %H:%M}", is_open_at(parse_hours(hours), minute_of_week(moment)), expected, failures)
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+
+    total = len(corpus) + len(EXPECTED) + len(CURFEW_CASES) + len(OPEN_AT_CASES)
+    print(f"✅ {total} hours checks passed")
+
+
+if __name__ == "__main__":
+    main()
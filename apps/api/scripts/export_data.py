@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Bulk export of shelters, statuses and status history
+Streams rows from a server-side cursor and writes NDJSON, CSV or Parquet incrementally
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import AsyncSessionLocal
+from app.services.export import (
+    EXPORT_BATCH_SIZE,
+    EXPORT_FORMATS,
+    EXPORT_TABLES,
+    encode_rows,
+    export_columns,
+    stream_rows,
+    supports_since,
+)
+
+
+async def export(table: str, format: str, output, since, batch_size: int) -> int:
+    written = 0
+    async with AsyncSessionLocal() as session:
+        batches = stream_rows(session, table, since=since, batch_size=batch_size)
+        async for chunk in encode_rows(format, export_columns(table), batches):
+            output.write(chunk)
+            written += len(chunk)
+    return written
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("table", choices=sorted(EXPORT_TABLES))
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="ndjson")
+    parser.add_argument("--output", "-o", help="Output file (defaults to stdout)")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="ISO timestamp lower bound")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE)
+    args = parser.parse_args()
+    if args.since is not None and not supports_since(args.table):
+        parser.error(f"--since is not supported for {args.table}")
+
+    if args.output:
+        with open(args.output, "wb") as output:
+            written = await export(args.table, args.format, output, args.since, args.batch_size)
+        print(f"✅ Wrote {written} bytes to {args.output}", file=sys.stderr)
+    else:
+        await export(args.table, args.format, sys.stdout.buffer, args.since, args.batch_size)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Import winter shelter feeds into the shelters and shelter_status tables
+Streams each file, hashes every normalized record and upserts only the ones that changed
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import AsyncSessionLocal
+from app.services.ingest import INGEST_BATCH_SIZE, ingest_file
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data")
+DEFAULT_FEEDS = [
+    os.path.join(DATA_DIR, "winter_shelters.json"),
+    os.path.join(DATA_DIR, "processed_shelters.json"),
+]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="*", default=DEFAULT_FEEDS, help="JSON array or NDJSON feed files")
+    parser.add_argument("--source", help="Source name for external ids (defaults to each record's 'source')")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Diff against the database without writing")
+    args = parser.parse_args()
+
+    async with AsyncSessionLocal() as session:
+        for path in args.paths:
+            start = time.perf_counter()
+            summary = await ingest_file(
+                session,
+                path,
+                source=args.source,
+                batch_size=args.batch_size,
+                dry_run=args.dry_run,
+            )
+            elapsed = time.perf_counter() - start
+            counts = ", ".join(f"{value} {name}" for name, value in summary.items())
+            prefix = "🔎 Would import" if args.dry_run else "✅ Imported"
+            print(f"{prefix} {os.path.basename(path)} in {elapsed:.2f}s: {counts}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
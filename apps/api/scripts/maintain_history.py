@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Run one status history maintenance pass: create upcoming partitions, refresh the
+hourly/daily rollups, then archive and drop partitions past the retention window
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+import time
+from datetime import datetime, timezone
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.database import AsyncSessionLocal
+from app.services.history import (
+    HISTORY_ARCHIVE_DIR,
+    HISTORY_PARTITIONS_AHEAD,
+    HISTORY_RETENTION_MONTHS,
+    maintain_history,
+)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--months-ahead", type=int, default=HISTORY_PARTITIONS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=HISTORY_RETENTION_MONTHS)
+    parser.add_argument("--archive-dir", default=HISTORY_ARCHIVE_DIR,
+                        help="Write retired partitions here as .csv.gz (default: drop without archiving)")
+    parser.add_argument("--rollup-since", type=datetime.fromisoformat,
+                        help="Recompute rollups from this ISO timestamp, e.g. after loading older history")
+    args = parser.parse_args()
+    if args.rollup_since and args.rollup_since.tzinfo is None:
+        args.rollup_since = args.rollup_since.replace(tzinfo=timezone.utc)
+
+    start = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        result = await maintain_history(
+            session,
+            months_ahead=args.months_ahead,
+            retention_months=args.retention_months,
+            archive_dir=args.archive_dir,
+            rollup_since=args.rollup_since,
+        )
+    elapsed = time.perf_counter() - start
+
+    if result.get("skipped"):
+        print("⏭️  Another worker is running maintenance; nothing done")
+        return
+
+    rollups = result["rollups"]
+    print(f"✅ History maintained in {elapsed:.2f}s")
+    print(f"   Partitions ready: {', '.join(result['partitions'])}")
+    print(f"   Rollups refreshed: {rollups['hourly']} hourly, {rollups['daily']} daily")
+    print(f"   Partitions retired: {', '.join(result['retired']) or 'none'}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
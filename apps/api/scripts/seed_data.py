@@ -2,20 +2,25 @@
 """
 Seed script for ShelterLink database
 Populates with LA County shelters and resources
+Pass --bulk to COPY synthetic load-test fixtures instead, e.g. --bulk --shelters 100000 --status-changes 2000000
 """
 
+import argparse
 import asyncio
 import sys
 import os
 from decimal import Decimal
 from datetime import time
+from time import perf_counter
 from uuid import uuid4
 
 # Add the app directory to the path
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))
 
 from app.database import AsyncSessionLocal, engine
+from app.services.bulk_load import bulk_load
 from app.models import Shelter, ShelterStatus, Resource, Staff, TranslationString
+from app.services.snapshot import rebuild_availability_snapshot
 
 
 async def create_shelters():
@@ -113,6 +118,7 @@ async def create_shelters():
     for data in shelters_data:
         shelter = Shelter(
             id=uuid4(),
+            location=f"SRID=4326;POINT({data['lon']} {data['lat']})",
             **data
         )
         shelters.append(shelter)
@@ -257,6 +263,7 @@ async def create_resources():
     for data in resources_data:
         resource = Resource(
             id=uuid4(),
+            location=f"SRID=4326;POINT({data['lon']} {data['lat']})",
             **data
         )
         resources.append(resource)
@@ -358,6 +365,10 @@ async def main():
             session.add_all(statuses)
             await session.commit()
             
+            # Build the availability snapshot read by the public endpoints
+            print("Building availability snapshot...")
+            await rebuild_availability_snapshot(session)
+            
             # Create resources
             print("Creating resources...")
             resources = await create_resources()
@@ -385,5 +396,49 @@ async def main():
             raise
 
 
+
+async def bulk_main(args):
+    """Load synthetic fixtures at scale with COPY"""
+    
+    print(f"🌱 Bulk loading {args.shelters} synthetic shelters...")
+    start = perf_counter()
+    
+    # One transaction, so a failed load also restores the indexes dropped for the COPY
+    async with engine.begin() as conn:
+        counts = await bulk_load(
+            conn,
+            shelters=args.shelters,
+            statuses_per_shelter=args.statuses_per_shelter,
+            status_changes=args.status_changes,
+            resources=args.resources,
+            history_days=args.history_days,
+            seed=args.seed,
+            defer_indexes=not args.keep_indexes,
+        )
+    loaded = perf_counter() - start
+    
+    print("Building availability snapshot...")
+    async with AsyncSessionLocal() as session:
+        await rebuild_availability_snapshot(session)
+    
+    total = sum(counts.values())
+    print(f"✅ Loaded {total} rows in {loaded:.1f}s ({total / loaded:,.0f} rows/s)")
+    print(", ".join(f"{value} {name}" for name, value in counts.items()))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bulk", action="store_true", help="COPY synthetic fixtures instead of the sample data")
+    parser.add_argument("--shelters", type=int, default=100_000)
+    parser.add_argument("--statuses-per-shelter", type=int, default=5, help="Categories per shelter (max 5)")
+    parser.add_argument("--status-changes", type=int, default=0)
+    parser.add_argument("--resources", type=int, default=0)
+    parser.add_argument("--history-days", type=int, default=90, help="Spread status_changes over this many days")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for reproducible fixtures")
+    parser.add_argument("--keep-indexes", action="store_true", help="Maintain indexes during the COPY instead of rebuilding after")
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    asyncio.run(bulk_main(args) if args.bulk else main())
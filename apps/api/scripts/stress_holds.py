@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test for the hold reservation engine
+Fires hundreds of simultaneous holds at one shelter category against a real
+database and checks that beds are never oversold and that expiry returns them
+"""
+
+import argparse
+import asyncio
+import sys
+import os
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+# Add the app directory to the path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from sqlalchemy import delete, func, select, update
+
+from app.database import AsyncSessionLocal
+from app.models import Hold, Shelter, ShelterStatus, Staff, StatusChange
+from app.services.holds import InsufficientBedsError, create_hold, expire_holds
+
+
+async def setup(beds: int):
+    """
+    Create a throwaway shelter, status and staff member
+    """
+    async with AsyncSessionLocal() as session:
+        shelter = Shelter(
+            id=uuid4(),
+            name="Hold Stress Test Shelter",
+            address="1 Test St, Los Angeles, CA 90012",
+            lat=Decimal("34.05"),
+            lon=Decimal("-118.25"),
+            neighborhood="Downtown LA",
+        )
+        staff = Staff(id=uuid4(), email=f"stress-{uuid4().hex[:8]}@shelterlink.org", role="ADMIN")
+        session.add_all([shelter, staff])
+        await session.flush()
+        session.add(ShelterStatus(
+            shelter_id=shelter.id,
+            category="MIXED",
+            beds_total=beds,
+            beds_available=beds,
+            status="OPEN",
+        ))
+        await session.commit()
+        return shelter.id, staff
+
+
+async def attempt_hold(staff, shelter_id, qty: int) -> bool:
+    async with AsyncSessionLocal() as session:
+        try:
+            await create_hold(session, staff, shelter_id, "MIXED", qty, minutes=30)
+            return True
+        except InsufficientBedsError:
+            return False
+
+
+async def read_totals(shelter_id):
+    async with AsyncSessionLocal() as session:
+        available = await session.scalar(
+            select(ShelterStatus.beds_available).where(ShelterStatus.shelter_id == shelter_id)
+        )
+        held = await session.scalar(
+            select(func.coalesce(func.sum(Hold.qty), 0))
+            .where(Hold.shelter_id == shelter_id, Hold.status == "ACTIVE")
+        )
+        return available, held
+
+
+async def teardown(shelter_id, staff_id):
+    async with AsyncSessionLocal() as session:
+        for model in (Hold, StatusChange, ShelterStatus):
+            await session.execute(delete(model).where(model.shelter_id == shelter_id))
+        await session.execute(delete(Shelter).where(Shelter.id == shelter_id))
+        await session.execute(delete(Staff).where(Staff.id == staff_id))
+        await session.commit()
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--beds", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--qty", type=int, default=1)
+    args = parser.parse_args()
+
+    shelter_id, staff = await setup(args.beds)
+    try:
+        print(f"Firing {args.requests} concurrent holds of {args.qty} at {args.beds} beds...")
+        outcomes = await asyncio.gather(
+            *(attempt_hold(staff, shelter_id, args.qty) for _ in range(args.requests))
+        )
+        granted = sum(outcomes)
+        available, held = await read_totals(shelter_id)
+
+        print(f"Granted {granted}, rejected {len(outcomes) - granted}")
+        print(f"Beds available {available}, beds held {held}")
+
+        assert granted * args.qty <= args.beds, "Oversold beds"
+        assert held == granted * args.qty, "Active hold total does not match granted holds"
+        assert available + held == args.beds, "Available + held does not equal capacity"
+        assert granted == min(args.requests, args.beds // args.qty), "Holds were rejected while beds remained"
+
+        # Force every hold past its expiry and sweep them back
+        async with AsyncSessionLocal() as session:
+            await session.execute(
+                update(Hold)
+                .where(Hold.shelter_id == shelter_id)
+                .values(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+            )
+            await session.commit()
+
+        async with AsyncSessionLocal() as session:
+            expired = 0
+            while batch := await expire_holds(session, batch_size=50):
+                expired += batch
+
+        available, held = await read_totals(shelter_id)
+        print(f"Expired {expired}; beds available {available}, beds held {held}")
+
+        assert expired == granted, "Sweeper missed holds"
+        assert held == 0 and available == args.beds, "Expiry did not return every bed"
+
+        print("✅ Hold totals stayed consistent")
+    finally:
+        await teardown(shelter_id, staff.id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())